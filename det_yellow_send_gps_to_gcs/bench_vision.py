@@ -0,0 +1,213 @@
+# bench_vision.py
+# Offline benchmark for vision.py (no camera / drone needed)
+#
+#   python3 bench_vision.py                 -> synthetic frames
+#   python3 bench_vision.py /path/to/frames -> recorded .jpg/.png frames
+
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from vision import YellowDetector
+from tracker import YellowTracker
+
+# --- CONFIG ---
+FRAME_SIZES = [(640, 480), (1280, 720)]
+N_FRAMES = 200
+WARMUP_FRAMES = 10
+
+
+# --------------------------------------------------
+# ORIGINAL (PER-FRAME ALLOCATING) IMPLEMENTATION
+# --------------------------------------------------
+def legacy_detect(frame):
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    lower_yellow = np.array([20, 100, 100])
+    upper_yellow = np.array([35, 255, 255])
+    mask = cv2.inRange(hsv, lower_yellow, upper_yellow)
+    kernel = np.ones((5, 5), np.uint8)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+    contours, _ = cv2.findContours(
+        mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+    )
+    if not contours:
+        return False, None, None, mask
+    largest = max(contours, key=cv2.contourArea)
+    if cv2.contourArea(largest) < 500:
+        return False, None, None, mask
+    M = cv2.moments(largest)
+    if M["m00"] == 0:
+        return False, None, None, mask
+    return True, int(M["m10"] / M["m00"]), int(M["m01"] / M["m00"]), mask
+
+
+# --------------------------------------------------
+# TEST FRAMES
+# --------------------------------------------------
+def synthetic_frames(width, height, n, seed=0):
+    """
+    Green-ish noisy field with one yellow square drifting across it.
+    Every 4th frame has no target (most survey frames are empty).
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n):
+        frame = rng.integers(0, 60, size=(height, width, 3), dtype=np.uint8)
+        frame[:, :, 1] += 60
+        if i % 4 != 3:
+            s = max(20, width // 16)
+            x = int((i * 7) % (width - s))
+            y = int((i * 3) % (height - s))
+            frame[y:y + s, x:x + s] = (0, 220, 230)   # BGR yellow
+        frames.append(frame)
+    return frames
+
+
+def tracked_frames(frames):
+    """
+    Target present in every frame (the LOCK_SPEED / ALIGN case).
+    Synthetic frames drop the target every 4th frame, skip those.
+    """
+    return [f for i, f in enumerate(frames) if i % 4 != 3] * 2
+
+
+def recorded_frames(folder, width, height):
+    paths = sorted(
+        glob.glob(os.path.join(folder, "*.jpg")) +
+        glob.glob(os.path.join(folder, "*.png"))
+    )
+    frames = []
+    for p in paths:
+        img = cv2.imread(p)
+        if img is not None:
+            frames.append(cv2.resize(img, (width, height)))
+    return frames
+
+
+# --------------------------------------------------
+# MEASUREMENT
+# --------------------------------------------------
+def run(name, detect_fn, frames):
+    for f in frames[:WARMUP_FRAMES]:
+        detect_fn(f)
+
+    t0 = time.perf_counter()
+    for f in frames:
+        detect_fn(f)
+    per_frame_ms = (time.perf_counter() - t0) * 1000.0 / len(frames)
+
+    # Bytes allocated *during* a frame, even if freed again
+    tracemalloc.start()
+    peak_total = 0
+    for f in frames:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        detect_fn(f)
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - base
+    tracemalloc.stop()
+
+    print(
+        f"   {name:<12} {per_frame_ms:7.2f} ms/frame   "
+        f"allocated {peak_total / len(frames) / 1024:8.1f} KiB/frame"
+    )
+
+
+def tracked_detect_fn():
+    """
+    detect_tracked() driven by a YellowTracker, like the survey loop.
+    """
+    detector = YellowDetector()
+    tracker = YellowTracker(stable_frames=10)
+
+    def detect_fn(frame):
+        result = detector.detect_tracked(frame, tracker.locked)
+        tracker.update(result[0])
+        return result
+
+    return detect_fn
+
+
+def max_centroid_error(detector, frames):
+    """
+    Worst |dx|, |dy| (px) of detect_pyramid() against detect(), and the
+    number of frames where the two disagree on detected / not detected.
+    """
+    reference = YellowDetector()
+    worst = 0.0
+    mismatches = 0
+    for f in frames:
+        found_ref, _, _, _ = reference.detect(f)
+        ref_centroid = reference.centroid
+        found, _, _, _ = detector.detect_pyramid(f)
+        if found != found_ref:
+            mismatches += 1
+        elif found:
+            worst = max(
+                worst,
+                abs(detector.centroid[0] - ref_centroid[0]),
+                abs(detector.centroid[1] - ref_centroid[1]),
+            )
+    return worst, mismatches
+
+
+def lut_mismatch(detector, frames):
+    """
+    Total pixels where the lookup-table mask differs from the HSV mask.
+    """
+    reference = YellowDetector()
+    total = 0
+    for f in frames:
+        _, _, _, ref_mask = reference.detect(f)
+        _, _, _, mask = detector.detect(f)
+        total += int(np.count_nonzero(mask != ref_mask))
+    return total
+
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else None
+
+    for width, height in FRAME_SIZES:
+        if folder:
+            frames = recorded_frames(folder, width, height)
+        else:
+            frames = synthetic_frames(width, height, N_FRAMES)
+
+        if not frames:
+            print(f"❌ No frames found in {folder}")
+            return
+
+        print(f"\n📐 {width}x{height}  ({len(frames)} frames)")
+
+        detector = YellowDetector()
+        run("legacy", legacy_detect, frames)
+        run("detector", detector.detect, frames)
+        run("detect_all", YellowDetector().detect_all, frames)
+        run(
+            "roi-tracked",
+            tracked_detect_fn(),
+            frames if folder else tracked_frames(frames),
+        )
+
+        lut = YellowDetector(use_lut=True)
+        run("lut", lut.detect, frames)
+        print(f"   {'':<12} mask mismatches vs HSV: {lut_mismatch(lut, frames)} px")
+
+        for scale in (4, 8):
+            pyramid = YellowDetector(pyramid_scale=scale)
+            run(f"pyramid 1/{scale}", pyramid.detect_pyramid, frames)
+            worst, mismatches = max_centroid_error(pyramid, frames)
+            print(
+                f"   {'':<12} max centroid error {worst:.2f} px, "
+                f"{mismatches} detect/no-detect mismatches"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
+import threading
+import time
+
 import cv2
 
 class Camera:
-    def __init__(self, cam_index=0, width=640, height=480):
+    def __init__(self, cam_index=0, width=640, height=480, threaded=False):
         self.cap = cv2.VideoCapture(cam_index)
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
@@ -9,6 +12,82 @@ class Camera:
         if not self.cap.isOpened():
             raise RuntimeError("❌ Cannot open USB camera")
 
+        # Latest-frame slot (threaded mode only)
+        self.lock = threading.Lock()
+        self.latest_frame = None
+        self.latest_time = None      # time.monotonic() at capture
+        self.latest_id = 0           # increments for every captured frame
+        self.last_read_id = 0
+        self.last_duplicate_id = 0
+
+        # Counters
+        self.dropped_frames = 0      # captured but overwritten before being read
+        self.duplicate_frames = 0    # frames handed out again after being read (once each)
+        self.read_failures = 0       # cap.read() returned no frame
+
+        self.running = False
+        self.thread = None
+
+        if threaded:
+            self.start()
+
+    # --------------------------------------------------
+    # BACKGROUND CAPTURE
+    # --------------------------------------------------
+    def start(self):
+        if self.running:
+            return
+
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+
+    def _capture_loop(self):
+        try:
+            while self.running:
+                ret, frame = self.cap.read()
+                capture_time = time.monotonic()
+
+                if not ret:
+                    # Driver hiccup: keep the last good frame and retry
+                    self.read_failures += 1
+                    time.sleep(0.01)
+                    continue
+
+                with self.lock:
+                    if self.latest_id > self.last_read_id:
+                        self.dropped_frames += 1
+
+                    self.latest_frame = frame
+                    self.latest_time = capture_time
+                    self.latest_id += 1
+        finally:
+            # Released here, never while cap.read() is still running
+            self.cap.release()
+
+    def read_latest(self):
+        """
+        Non-blocking. Returns (frame, capture_time) of the newest frame,
+        or (None, None) if nothing has been captured yet. The same frame is
+        returned again until a new one arrives; compare capture_time to
+        skip it.
+        capture_time is time.monotonic() taken right after the grab.
+        """
+        with self.lock:
+            if self.latest_frame is None:
+                return None, None
+
+            # Already consumed: count each repeated frame once, not per poll
+            if self.latest_id == self.last_read_id and self.latest_id != self.last_duplicate_id:
+                self.duplicate_frames += 1
+                self.last_duplicate_id = self.latest_id
+
+            self.last_read_id = self.latest_id
+            return self.latest_frame, self.latest_time
+
+    # --------------------------------------------------
+    # BLOCKING READ (original behaviour)
+    # --------------------------------------------------
     def read(self):
         ret, frame = self.cap.read()
         if not ret:
@@ -16,5 +95,14 @@ class Camera:
         return frame
 
     def release(self):
-        self.cap.release()
+        self.running = False
+        if self.thread is not None:
+            # The capture thread releases the device when it exits
+            self.thread.join(timeout=1.0)
+            if self.thread.is_alive():
+                print("⚠️ Camera thread still in cap.read(), released when it returns")
+            self.thread = None
+        else:
+            self.cap.release()
+
         cv2.destroyAllWindows()
@@ -0,0 +1,105 @@
+# color_lut.py
+import os
+
+import cv2
+import numpy as np
+
+LUT_CACHE_DIR = os.path.expanduser("~/.cache/nidar")
+
+
+class BGRLookupTable:
+    """
+    BGR -> mask lookup table built once from HSV bounds.
+
+    The table has one entry per 24-bit BGR colour (16 MB), computed with
+    the same cv2.cvtColor + cv2.inRange that the HSV path runs per frame,
+    so classify() gives exactly the same mask (tolerance: 0 pixels).
+    The table is cached on disk per set of bounds.
+
+    Per frame it costs one channel copy into a padded scratch buffer and
+    one table lookup per pixel; no colour-space conversion.
+    """
+
+    def __init__(self, lower_hsv, upper_hsv, cache_dir=LUT_CACHE_DIR):
+        self.lower_hsv = np.asarray(lower_hsv, dtype=np.uint8)
+        self.upper_hsv = np.asarray(upper_hsv, dtype=np.uint8)
+
+        name = "bgr_lut_{}-{}.npy".format(
+            "_".join(str(v) for v in self.lower_hsv),
+            "_".join(str(v) for v in self.upper_hsv),
+        )
+        self.cache_path = os.path.join(cache_dir, name) if cache_dir else None
+
+        self.table = self._load_or_build()
+
+    # --------------------------------------------------
+    # BUILD / CACHE
+    # --------------------------------------------------
+    def _build(self):
+        # table[b | g << 8 | r << 16] is the class of (b, g, r). Built one
+        # red value at a time: each is a contiguous 256x256 (g, b) slice,
+        # so the peak is the 16 MB table plus one small image, not a
+        # 16M-colour BGR + HSV copy of the whole cube.
+        table = np.empty(1 << 24, dtype=np.uint8)
+
+        values = np.arange(256, dtype=np.uint8)
+        bgr = np.empty((256, 256, 3), dtype=np.uint8)
+        bgr[:, :, 0] = values            # b along the row
+        bgr[:, :, 1] = values[:, None]   # g down the column
+
+        for r in range(256):
+            bgr[:, :, 2] = r
+            hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+            out = table[r << 16:(r + 1) << 16].reshape(256, 256)
+            out[:] = cv2.inRange(hsv, self.lower_hsv, self.upper_hsv)
+        return table
+
+    def _load_or_build(self):
+        if self.cache_path and os.path.exists(self.cache_path):
+            try:
+                table = np.load(self.cache_path)
+                if table.shape == (1 << 24,) and table.dtype == np.uint8:
+                    return table
+            except (OSError, ValueError):
+                pass
+            print("⚠️ LUT cache unreadable, rebuilding")
+
+        print("🎨 Building BGR lookup table...")
+        table = self._build()
+
+        if self.cache_path:
+            try:
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+                tmp_path = self.cache_path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, table)
+                os.replace(tmp_path, self.cache_path)
+            except OSError as e:
+                # Still usable, just rebuilt next start
+                print(f"⚠️ Could not cache LUT: {e}")
+
+        return table
+
+    # --------------------------------------------------
+    # CLASSIFY
+    # --------------------------------------------------
+    @staticmethod
+    def make_buffer(h, w):
+        """
+        Scratch buffer for classify(): BGR padded to 8 bytes per pixel so
+        it can be read as the native index type without a conversion copy.
+        Channels 3..7 must stay 0.
+        """
+        return np.zeros((h, w, 8), np.uint8)
+
+    def classify(self, frame, bgrx, mask):
+        """
+        Writes the 0/255 mask of `frame` (BGR uint8) into `mask`.
+        `bgrx` is a make_buffer() buffer (or a view of one) of the same
+        height and width. Both may be ROI views.
+        """
+        cv2.mixChannels([frame], [bgrx], [0, 0, 1, 1, 2, 2])
+        codes = bgrx.view(np.int64)[:, :, 0]   # little-endian: b | g<<8 | r<<16
+        # mode="clip" writes straight into `mask` (the default buffers a copy)
+        np.take(self.table, codes, out=mask, mode="clip")
+        return mask
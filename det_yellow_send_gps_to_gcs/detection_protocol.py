@@ -0,0 +1,66 @@
+# detection_protocol.py
+# Binary survey -> spray detection datagrams over UDP.
+#
+#   DATA: header + count * record     (survey -> spray)
+#   ACK : header, count = 0           (spray -> survey, echoes seq)
+#
+# header: magic "ND", version, type, seq (uint32), count (uint16)
+# record: id (uint64), lat, lon (float64), alt, confidence (float32),
+#         timestamp (float64, unix seconds)
+# All little-endian. UDP's checksum covers corruption.
+#
+# Same file in det_yellow_send_gps_to_gcs/ and spray_drone/ — keep in sync.
+import struct
+
+MAGIC = b"ND"
+VERSION = 1
+
+TYPE_DATA = 1
+TYPE_ACK = 2
+
+HEADER = struct.Struct("<2sBBIH")
+RECORD = struct.Struct("<Qddffd")
+
+# Keeps a full datagram (12 + 32 * 40 = 1292 bytes) under a 1500 MTU
+MAX_RECORDS = 32
+
+DEFAULT_PORT = 14600
+
+FIELDS = ("id", "lat", "lon", "alt", "confidence", "timestamp")
+
+
+def encode_data(seq, detections):
+    """
+    detections: up to MAX_RECORDS dicts with FIELDS.
+    """
+    parts = [HEADER.pack(MAGIC, VERSION, TYPE_DATA, seq, len(detections))]
+    for d in detections:
+        parts.append(RECORD.pack(
+            int(d["id"]), d["lat"], d["lon"], d["alt"], d["confidence"], d["timestamp"]
+        ))
+    return b"".join(parts)
+
+
+def encode_ack(seq):
+    return HEADER.pack(MAGIC, VERSION, TYPE_ACK, seq, 0)
+
+
+def decode(datagram):
+    """
+    Returns (type, seq, [detection dicts]) or None for anything that
+    isn't a well-formed datagram of this protocol version.
+    """
+    if len(datagram) < HEADER.size:
+        return None
+
+    magic, version, msg_type, seq, count = HEADER.unpack_from(datagram)
+    if magic != MAGIC or version != VERSION:
+        return None
+    if len(datagram) != HEADER.size + count * RECORD.size:
+        return None
+
+    detections = [
+        dict(zip(FIELDS, values))
+        for values in RECORD.iter_unpack(datagram[HEADER.size:])
+    ]
+    return msg_type, seq, detections
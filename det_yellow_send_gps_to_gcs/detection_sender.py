@@ -0,0 +1,224 @@
+# detection_sender.py
+# Survey side of the UDP detection link (see detection_protocol.py).
+import queue
+import random
+import socket
+import threading
+import time
+
+from detection_protocol import (
+    encode_data,
+    decode,
+    TYPE_ACK,
+    MAX_RECORDS,
+    DEFAULT_PORT
+)
+
+# Detections logged within this window go out in one datagram
+BATCH_WINDOW_SEC = 0.05
+
+# Resend an unacknowledged datagram after this, doubling up to the max
+RETRANSMIT_SEC = 0.5
+MAX_RETRANSMIT_SEC = 4.0
+
+# Give up on a datagram (counted as expired) after this many resends, or
+# once its oldest detection is older than the spray drone accepts
+# (spray_drone/config.py MAX_PACKET_AGE_SEC), so a dead link can't grow
+# memory and bandwidth without bound
+MAX_RETRANSMITS = 60
+MAX_DETECTION_AGE_SEC = 9999.0
+
+
+class DetectionSender:
+    """
+    Batches detections into sequence-numbered datagrams and resends each
+    one until the spray drone acknowledges it. send() only queues, the
+    socket work happens on a background thread, so the survey loop never
+    waits on the network.
+    """
+
+    def __init__(self, host, port=DEFAULT_PORT):
+        self.address = (host, port)
+        self.outbox = queue.Queue()
+
+        # Random start so a restarted survey isn't taken for duplicates
+        self.seq = random.getrandbits(32)
+        # seq -> [datagram, next_send, interval, n_records, oldest_timestamp, resends]
+        self.unacked = {}
+
+        # Detections given to send() and not yet acknowledged
+        self.outstanding = 0
+        self.lock = threading.Lock()
+
+        self.sent = 0
+        self.retransmits = 0
+        self.expired = 0             # detections given up on, never acknowledged
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(0.01)
+
+        self.running = False
+        self.thread = None
+
+    # --------------------------------------------------
+    # START / STOP
+    # --------------------------------------------------
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        self.sock.close()
+
+    # --------------------------------------------------
+    # SURVEY-SIDE API
+    # --------------------------------------------------
+    def send(self, target_id, lat, lon, alt, confidence, timestamp=None):
+        with self.lock:
+            self.outstanding += 1
+        self.outbox.put({
+            "id": target_id,
+            "lat": lat,
+            "lon": lon,
+            "alt": alt,
+            "confidence": confidence,
+            "timestamp": time.time() if timestamp is None else timestamp
+        })
+
+    def pending(self):
+        """
+        Detections not yet acknowledged (queued, batching or in flight).
+        """
+        with self.lock:
+            return self.outstanding
+
+    def flush(self, timeout=5.0):
+        """
+        Waits until everything sent so far is acknowledged.
+        Returns False if some detections are still unacked at timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while self.pending():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    # --------------------------------------------------
+    # SENDER THREAD
+    # --------------------------------------------------
+    def _loop(self):
+        batch = []
+        batch_started = None
+
+        while self.running:
+            now = time.monotonic()
+
+            # ---- Collect new detections into a batch ----
+            while len(batch) < MAX_RECORDS:
+                try:
+                    batch.append(self.outbox.get_nowait())
+                except queue.Empty:
+                    break
+                if batch_started is None:
+                    batch_started = now
+
+            if batch and (len(batch) >= MAX_RECORDS or now - batch_started >= BATCH_WINDOW_SEC):
+                self._send_new(batch, now)
+                batch = []
+                batch_started = None
+
+            # ---- Retransmit whatever is overdue ----
+            for seq, entry in list(self.unacked.items()):
+                datagram, next_send, interval, n_records, oldest, resends = entry
+                if now < next_send:
+                    continue
+
+                if resends >= MAX_RETRANSMITS or time.time() - oldest > MAX_DETECTION_AGE_SEC:
+                    self._expire(seq, entry)
+                    continue
+
+                self._transmit(datagram)
+                self.retransmits += 1
+                interval = min(interval * 2, MAX_RETRANSMIT_SEC)
+                entry[1] = now + interval
+                entry[2] = interval
+                entry[5] = resends + 1
+
+            # ---- Acks (also the loop's pacing: socket timeout) ----
+            self._receive_acks()
+
+    def _send_new(self, batch, now):
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        datagram = encode_data(self.seq, batch)
+        oldest = min(record["timestamp"] for record in batch)
+        self.unacked[self.seq] = [
+            datagram, now + RETRANSMIT_SEC, RETRANSMIT_SEC, len(batch), oldest, 0
+        ]
+        self._transmit(datagram)
+        self.sent += 1
+
+    def _expire(self, seq, entry):
+        del self.unacked[seq]
+        self.expired += entry[3]
+        with self.lock:
+            self.outstanding -= entry[3]
+        print(f"⚠️ Detection datagram {seq} never acknowledged, dropped "
+              f"({entry[3]} detections, {self.expired} expired total)")
+
+    def _transmit(self, datagram):
+        try:
+            self.sock.sendto(datagram, self.address)
+        except OSError as e:
+            # No route yet (link down) -> the retransmit timer tries again
+            print(f"⚠️ Detection link send failed: {e}")
+
+    def _receive_acks(self):
+        try:
+            datagram, _addr = self.sock.recvfrom(2048)
+        except (socket.timeout, BlockingIOError):
+            return
+        except OSError:
+            # ICMP port unreachable from an earlier send (receiver not up)
+            time.sleep(0.01)
+            return
+
+        msg = decode(datagram)
+        if msg is None or msg[0] != TYPE_ACK:
+            return
+        entry = self.unacked.pop(msg[1], None)
+        if entry is not None:
+            with self.lock:
+                self.outstanding -= entry[3]
+
+
+# --------------------------------------------------
+# LOCALHOST TEST: python detection_sender.py [HOST] [COUNT]
+# (run "python -m comms.udp_receiver" in spray_drone/ first)
+# --------------------------------------------------
+if __name__ == "__main__":
+    import sys
+
+    host = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1"
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    sender = DetectionSender(host)
+    sender.start()
+
+    for i in range(1, count + 1):
+        sender.send(i, 12.9716 + i * 1e-5, 77.5946, 4.0, 1.0)
+        time.sleep(0.02)
+
+    sender.flush(timeout=10.0)
+
+    print(f"📤 {count} detections, {sender.sent} datagrams, "
+          f"{sender.retransmits} retransmits, {sender.expired} expired, "
+          f"{sender.pending()} unacked")
+    sender.stop()
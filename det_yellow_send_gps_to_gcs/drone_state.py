@@ -21,3 +21,7 @@ class DroneState:
         roll = math.degrees(self.vehicle.attitude.roll)
         pitch = math.degrees(self.vehicle.attitude.pitch)
         return roll, pitch
+
+    def get_attitude_rad(self):
+        att = self.vehicle.attitude
+        return att.roll, att.pitch, att.yaw
@@ -0,0 +1,179 @@
+# flight_recorder.py
+# Binary per-tick flight recorder.
+#
+# The caller defines a NumPy structured dtype for one main-loop tick and
+# fills one preallocated record per tick (a few field assignments, no
+# formatting, no I/O). Full chunks are saved as .npy files by a writer
+# thread, one file per chunk:
+#
+#   <directory>/<name>_<YYYYmmdd_HHMMSS>_<chunk:05d>.npy
+#
+#   python flight_recorder.py DIRECTORY [SESSION]   -> summary of a flight
+#
+# Same file in det_yellow_send_gps_to_gcs/ and spray_drone/ — keep in sync.
+import atexit
+import glob
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+CHUNK_RECORDS = 1024
+
+# Fields every record starts with, filled by next_record()
+BASE_FIELDS = [
+    ("tick", "<u4"),
+    ("t", "<f8"),          # time.monotonic()
+    ("wall", "<f8"),       # time.time()
+]
+
+
+def make_dtype(fields):
+    return np.dtype(BASE_FIELDS + list(fields))
+
+
+class FlightRecorder:
+    """
+    rec = recorder.next_record()      # zeroed slot, tick/t/wall filled
+    rec["alt"] = ...                  # writes straight into the buffer
+
+    max_chunks keeps only the newest chunk files of this session
+    (None = keep all). close() (also run at exit) saves the partial chunk.
+    """
+
+    def __init__(self, directory, dtype, name="flight",
+                 chunk_records=CHUNK_RECORDS, max_chunks=None):
+        self.directory = directory
+        self.dtype = dtype
+        self.chunk_records = chunk_records
+        self.max_chunks = max_chunks
+
+        os.makedirs(directory, exist_ok=True)
+        self.prefix = os.path.join(directory, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}")
+
+        self.buffer = np.zeros(chunk_records, dtype=dtype)
+        self.spare = queue.Queue()    # buffers handed back by the writer
+        self.index = 0
+        self.tick = 0
+        self.chunk = 0
+        self.saved_files = []
+
+        self.outbox = queue.Queue()
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+        self.closed = False
+        atexit.register(self.close)
+
+    # --------------------------------------------------
+    # HOT PATH
+    # --------------------------------------------------
+    def next_record(self):
+        if self.index == self.chunk_records:
+            self._rotate()
+
+        rec = self.buffer[self.index]
+        self.index += 1
+        self.tick += 1
+
+        rec["tick"] = self.tick
+        rec["t"] = time.monotonic()
+        rec["wall"] = time.time()
+        return rec
+
+    def _rotate(self):
+        self.outbox.put((self.chunk, self.buffer, self.index))
+        self.chunk += 1
+        self.index = 0
+
+        try:
+            self.buffer = self.spare.get_nowait()
+        except queue.Empty:
+            self.buffer = np.zeros(self.chunk_records, dtype=self.dtype)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+
+        if self.index:
+            self.outbox.put((self.chunk, self.buffer, self.index))
+        self.outbox.put(None)
+        self.thread.join(timeout=5.0)
+
+    # --------------------------------------------------
+    # WRITER THREAD
+    # --------------------------------------------------
+    def _writer(self):
+        while True:
+            item = self.outbox.get()
+            if item is None:
+                return
+
+            chunk, buffer, count = item
+            path = f"{self.prefix}_{chunk:05d}.npy"
+            tmp = path + ".tmp"
+
+            try:
+                with open(tmp, "wb") as f:
+                    np.save(f, buffer[:count])
+                os.replace(tmp, path)    # loaders never see half a chunk
+                self.saved_files.append(path)
+            except OSError as e:
+                print(f"⚠️ Flight recorder write failed: {e}")
+
+            buffer[:] = 0
+            self.spare.put(buffer)
+
+            if self.max_chunks and len(self.saved_files) > self.max_chunks:
+                try:
+                    os.remove(self.saved_files.pop(0))
+                except OSError:
+                    pass
+
+
+# --------------------------------------------------
+# OFFLINE LOADER
+# --------------------------------------------------
+def list_sessions(directory, name="flight"):
+    sessions = set()
+    for path in glob.glob(os.path.join(directory, f"{name}_*_*.npy")):
+        stem = os.path.basename(path)[len(name) + 1:-len(".npy")]
+        sessions.add(stem.rsplit("_", 1)[0])
+    return sorted(sessions)
+
+
+def load_flight(directory, session=None, name="flight"):
+    """
+    All chunks of one session (default: the latest) as one structured
+    array, in tick order.
+    """
+    if session is None:
+        sessions = list_sessions(directory, name)
+        if not sessions:
+            raise FileNotFoundError(f"No flight recordings in {directory}")
+        session = sessions[-1]
+
+    paths = sorted(glob.glob(os.path.join(directory, f"{name}_{session}_*.npy")))
+    return np.concatenate([np.load(p) for p in paths])
+
+
+def summarize(records):
+    duration = records["t"][-1] - records["t"][0] if len(records) else 0.0
+    print(f"🗂️  {len(records)} ticks over {duration:.1f}s")
+
+    for field in records.dtype.names:
+        if field.endswith("_ms"):
+            values = records[field]
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            print(f"   {field:<16} p50 {p50:7.2f}  p95 {p95:7.2f}  p99 {p99:7.2f}  max {values.max():7.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python flight_recorder.py DIRECTORY [SESSION]")
+        sys.exit(1)
+
+    summarize(load_flight(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None))
@@ -0,0 +1,113 @@
+# frame_trace.py
+# End-to-end latency tracing for the survey loop.
+#
+# Every processed frame gets a trace id and keeps its camera capture time
+# (time.monotonic() right after the grab, see camera.py). The loop marks
+# the trace as the frame passes each step; marks are stored as ms since
+# capture ("glass"), so the "command" mark is the glass-to-command latency
+# of the velocity command computed from that frame.
+#
+# Per-mark distributions go to StageStats as glass_to_<mark>, one row per
+# frame to a CSV (blank = step not reached for that frame):
+#
+#   trace_id, capture_time, target_id, detect_ms, track_ms, ...
+#
+#   python frame_trace.py TRACE.csv    -> latency distribution per mark
+import csv
+import sys
+import time
+
+import numpy as np
+
+from log_writer import LogWriter
+
+# In pipeline order
+TRACE_MARKS = (
+    "detect",        # detector.detect_tracked / blobs done
+    "track",         # YellowTracker.update done
+    "align",         # compute_alignment_velocity done
+    "command",       # set_position_target_local_ned sent
+    "gps",           # position for the frame looked up
+    "survey_log",    # SurveyLogger.log_target returned
+)
+
+
+class FrameTrace:
+    __slots__ = ("trace_id", "capture_time", "target_id", "marks")
+
+    def __init__(self, trace_id, capture_time):
+        self.trace_id = trace_id
+        self.capture_time = capture_time
+        self.target_id = None
+        self.marks = {}
+
+    def mark(self, name):
+        self.marks[name] = (time.monotonic() - self.capture_time) * 1000
+
+
+class FrameTracer:
+    def __init__(self, stats=None, csv_path=None):
+        self.stats = stats
+        self.next_id = 1
+
+        self.writer = None
+        if csv_path:
+            self.writer = LogWriter(
+                csv_path,
+                header=["trace_id", "capture_time", "target_id"]
+                + [f"{name}_ms" for name in TRACE_MARKS]
+            )
+
+    def begin(self, capture_time):
+        trace = FrameTrace(self.next_id, capture_time)
+        self.next_id += 1
+        return trace
+
+    def end(self, trace):
+        if self.stats:
+            for name, ms in trace.marks.items():
+                self.stats.record(f"glass_to_{name}", ms)
+
+        if self.writer:
+            self.writer.write_row(
+                [
+                    trace.trace_id,
+                    f"{trace.capture_time:.6f}",
+                    "" if trace.target_id is None else trace.target_id,
+                ]
+                + [
+                    f"{trace.marks[name]:.2f}" if name in trace.marks else ""
+                    for name in TRACE_MARKS
+                ]
+            )
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+
+# --------------------------------------------------
+# OFFLINE REPORT
+# --------------------------------------------------
+def summarize(csv_path):
+    with open(csv_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    print(f"🗂️  {len(rows)} traced frames")
+    for name in TRACE_MARKS:
+        values = np.array([float(r[f"{name}_ms"]) for r in rows if r.get(f"{name}_ms")])
+        if not len(values):
+            continue
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        print(
+            f"   glass_to_{name:<12} n {len(values):6d}  p50 {p50:7.2f}  "
+            f"p95 {p95:7.2f}  p99 {p99:7.2f}  max {values.max():7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python frame_trace.py TRACE.csv")
+        sys.exit(1)
+
+    summarize(sys.argv[1])
@@ -0,0 +1,129 @@
+# geodesy.py
+# Distances, bearings and offsets on the spherical earth, plus a local
+# east/north tangent plane. Everything takes scalars or NumPy arrays and
+# broadcasts, so one call covers one-to-one, one-to-many and (with
+# distance_matrix_m) many-to-many. Plain float inputs take a math-module
+# path (NumPy's per-call overhead dominates for single points) and give
+# plain floats.
+#
+# Same file in det_yellow_send_gps_to_gcs/ and spray_drone/ — keep in sync.
+import math
+
+import numpy as np
+
+# Mean earth radius. Used for distances AND offsets, so offsetting a point
+# by d meters and measuring it back gives d.
+EARTH_RADIUS_M = 6371008.8
+
+
+def _scalar(*values):
+    return all(isinstance(v, (float, int)) for v in values)
+
+
+def _out(x):
+    return float(x) if np.ndim(x) == 0 else x
+
+
+# --------------------------------------------------
+# DISTANCE / BEARING
+# --------------------------------------------------
+def distance_m(lat1, lon1, lat2, lon2):
+    """
+    Great-circle (haversine) distance in meters.
+    """
+    if _scalar(lat1, lon1, lat2, lon2):
+        phi1 = math.radians(lat1)
+        phi2 = math.radians(lat2)
+        a = (
+            math.sin((phi2 - phi1) / 2) ** 2
+            + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(a, 1.0)))
+
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = np.radians(np.subtract(lon2, lon1))
+
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return _out(2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0))))
+
+
+def distance_matrix_m(lats1, lons1, lats2, lons2):
+    """
+    (len(lats1), len(lats2)) matrix of distances in meters.
+    """
+    lats1 = np.asarray(lats1, dtype=np.float64)[:, None]
+    lons1 = np.asarray(lons1, dtype=np.float64)[:, None]
+    return distance_m(lats1, lons1, np.asarray(lats2, dtype=np.float64), np.asarray(lons2, dtype=np.float64))
+
+
+def bearing_deg(lat1, lon1, lat2, lon2):
+    """
+    Initial bearing from point 1 to point 2, degrees clockwise from north
+    in [0, 360).
+    """
+    if _scalar(lat1, lon1, lat2, lon2):
+        phi1 = math.radians(lat1)
+        phi2 = math.radians(lat2)
+        dlambda = math.radians(lon2 - lon1)
+        y = math.sin(dlambda) * math.cos(phi2)
+        x = math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(dlambda)
+        return math.degrees(math.atan2(y, x)) % 360.0
+
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    dlambda = np.radians(np.subtract(lon2, lon1))
+
+    y = np.sin(dlambda) * np.cos(phi2)
+    x = np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(dlambda)
+    return _out(np.degrees(np.arctan2(y, x)) % 360.0)
+
+
+# --------------------------------------------------
+# OFFSET
+# --------------------------------------------------
+def offset(lat, lon, d_north, d_east):
+    """
+    (lat, lon) moved by d_north / d_east meters. Flat-earth step, fine
+    for the few hundred meters of a field.
+    """
+    if _scalar(lat, lon, d_north, d_east):
+        return (
+            lat + math.degrees(d_north / EARTH_RADIUS_M),
+            lon + math.degrees(d_east / (EARTH_RADIUS_M * math.cos(math.radians(lat))))
+        )
+
+    new_lat = np.add(lat, np.degrees(np.divide(d_north, EARTH_RADIUS_M)))
+    new_lon = np.add(lon, np.degrees(
+        np.divide(d_east, EARTH_RADIUS_M * np.cos(np.radians(lat)))
+    ))
+    return _out(new_lat), _out(new_lon)
+
+
+# --------------------------------------------------
+# LOCAL TANGENT PLANE
+# --------------------------------------------------
+class LocalFrame:
+    """
+    Equirectangular east/north projection (meters) around a reference
+    point, typically home. Scale factors are computed once.
+    """
+
+    def __init__(self, ref_lat, ref_lon):
+        self.ref_lat = float(ref_lat)
+        self.ref_lon = float(ref_lon)
+        self.m_per_deg_lat = math.radians(1.0) * EARTH_RADIUS_M
+        self.m_per_deg_lon = self.m_per_deg_lat * math.cos(math.radians(self.ref_lat))
+
+    # Plain arithmetic: works on floats and arrays alike
+
+    def to_en(self, lat, lon):
+        east = (lon - self.ref_lon) * self.m_per_deg_lon
+        north = (lat - self.ref_lat) * self.m_per_deg_lat
+        return east, north
+
+    def to_latlon(self, east, north):
+        lat = self.ref_lat + north / self.m_per_deg_lat
+        lon = self.ref_lon + east / self.m_per_deg_lon
+        return lat, lon
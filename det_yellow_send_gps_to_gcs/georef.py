@@ -0,0 +1,89 @@
+# georef.py
+# Pixel -> ground lat/lon for a down-looking camera
+#
+# Assumes the camera looks straight down with the top of the image towards
+# the nose (same convention as compute_alignment_velocity) and flat ground
+# at the home altitude.
+
+import math
+
+import numpy as np
+
+from geodesy import offset
+
+# Field of view of the survey camera (replace with calibrated values)
+CAMERA_HFOV_DEG = 62.2
+CAMERA_VFOV_DEG = 48.8
+
+# Rays flatter than this never hit the ground in a useful place
+MIN_RAY_DOWN = 0.1
+
+
+class CameraModel:
+    """
+    Pinhole intrinsics in pixels. Built from the field of view unless
+    calibrated fx/fy/cx/cy are given.
+    """
+
+    def __init__(self, width=640, height=480,
+                 hfov_deg=CAMERA_HFOV_DEG, vfov_deg=CAMERA_VFOV_DEG,
+                 fx=None, fy=None, cx=None, cy=None):
+        self.width = width
+        self.height = height
+        self.fx = fx if fx is not None else (width / 2) / math.tan(math.radians(hfov_deg) / 2)
+        self.fy = fy if fy is not None else (height / 2) / math.tan(math.radians(vfov_deg) / 2)
+        self.cx = cx if cx is not None else width / 2
+        self.cy = cy if cy is not None else height / 2
+
+
+def rotation_body_to_ned(roll, pitch, yaw):
+    """
+    ZYX (yaw, pitch, roll) rotation matrix, angles in radians as DroneKit
+    reports them in vehicle.attitude.
+    """
+    cr, sr = math.cos(roll), math.sin(roll)
+    cp, sp = math.cos(pitch), math.sin(pitch)
+    cy, sy = math.cos(yaw), math.sin(yaw)
+
+    return np.array([
+        [cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
+        [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+        [-sp, cp * sr, cp * cr],
+    ])
+
+
+def pixel_to_ground_offset(u, v, alt_m, roll, pitch, yaw, camera):
+    """
+    Ground offset (north_m, east_m) from the point under the drone to the
+    pixel(s) (u, v). u, v may be scalars or arrays. alt_m is the height
+    above ground. Offsets are NaN for rays that don't point down enough.
+    """
+    u = np.asarray(u, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+
+    # Camera ray in body FRD: image up = forward, image right = right
+    ray = np.stack([
+        -(v - camera.cy) / camera.fy,
+        (u - camera.cx) / camera.fx,
+        np.ones_like(u),
+    ])
+
+    ned = rotation_body_to_ned(roll, pitch, yaw) @ ray.reshape(3, -1)
+    down = ned[2]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(down > MIN_RAY_DOWN, alt_m / down, np.nan)
+
+    north = (ned[0] * scale).reshape(u.shape)
+    east = (ned[1] * scale).reshape(u.shape)
+
+    return north, east
+
+
+def pixel_to_latlon(u, v, lat, lon, alt_m, roll, pitch, yaw, camera):
+    """
+    Lat/lon of the ground point seen at pixel(s) (u, v) from a drone at
+    (lat, lon), alt_m above ground, with the given attitude (radians).
+    """
+    north, east = pixel_to_ground_offset(u, v, alt_m, roll, pitch, yaw, camera)
+    return offset(lat, lon, north, east)
@@ -1,33 +1,115 @@
 import math
+import os
+
+from geodesy import distance_m, LocalFrame
+from log_writer import LogWriter
 
 
 class GPSDistanceFilter:
-    def __init__(self, min_distance_m=1.0):
+    """
+    Rejects targets within min_distance_m of an already logged one.
+
+    Logged points are hashed into a grid of local east/north cells, so a
+    check only runs haversine against the neighbouring cells. With
+    state_path set, every registered point is also appended to that file
+    (by a background LogWriter, not on the control loop) and reloaded at
+    startup, so a restarted survey doesn't log re-flown targets again.
+    Delete the file to start a fresh field. close() writes out the rest.
+    """
+
+    def __init__(self, min_distance_m=1.0, state_path=None):
         self.min_distance = min_distance_m
         self.logged_points = []  # [(lat, lon)]
 
-    def haversine_distance(self, lat1, lon1, lat2, lon2):
-        R = 6371000.0  # Earth radius in meters
+        # Slightly larger than min_distance so the 3x3 neighbourhood still
+        # covers it despite the flat projection used for the cell keys
+        self.cell_size = min_distance_m * 1.01
+        self.frame = None        # local projection anchoring the cell grid
+        self.cells = {}          # (ix, iy) -> [(lat, lon), ...]
+
+        self.state_path = state_path
+        self.writer = None
+        if state_path:
+            self._load_state()
+            self.writer = LogWriter(state_path)
+
+    # --------------------------------------------------
+    # CELL GRID
+    # --------------------------------------------------
+    def _cell(self, lat, lon):
+        if self.frame is None:
+            self.frame = LocalFrame(lat, lon)
+
+        x, y = self.frame.to_en(lat, lon)
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def _neighbours(self, lat, lon):
+        cx, cy = self._cell(lat, lon)
+        for ix in (cx - 1, cx, cx + 1):
+            for iy in (cy - 1, cy, cy + 1):
+                yield from self.cells.get((ix, iy), ())
+
+    def _add(self, lat, lon):
+        self.cells.setdefault(self._cell(lat, lon), []).append((lat, lon))
+        self.logged_points.append((lat, lon))
 
-        phi1 = math.radians(lat1)
-        phi2 = math.radians(lat2)
-        dphi = math.radians(lat2 - lat1)
-        dlambda = math.radians(lon2 - lon1)
+    # --------------------------------------------------
+    # ON-DISK STATE
+    # --------------------------------------------------
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return
 
-        a = (
-            math.sin(dphi / 2) ** 2
-            + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
-        )
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+        with open(self.state_path) as f:
+            for line in f:
+                try:
+                    lat, lon = (float(v) for v in line.split(","))
+                except ValueError:
+                    continue     # half-written last line after a power cut
+                self._add(lat, lon)
 
-        return R * c
+        print(f"📂 GPS filter: {len(self.logged_points)} points reloaded from {self.state_path}")
 
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+    # --------------------------------------------------
+    # FILTER
+    # --------------------------------------------------
     def is_new_target(self, lat, lon):
-        for old_lat, old_lon in self.logged_points:
-            dist = self.haversine_distance(lat, lon, old_lat, old_lon)
+        for old_lat, old_lon in self._neighbours(lat, lon):
+            dist = distance_m(lat, lon, old_lat, old_lon)
             if dist < self.min_distance:
                 return False
         return True
 
     def register_target(self, lat, lon):
-        self.logged_points.append((lat, lon))
+        self._add(lat, lon)
+        if self.writer:
+            self.writer.write_row([f"{lat:.8f}", f"{lon:.8f}"])
+
+    def filter_new_targets(self, points):
+        """
+        Batch version of is_new_target for several targets seen at once.
+        points: [(lat, lon, ...)]. Keeps the points that are new against
+        the logged points and against each other (first one wins).
+        Nothing is registered.
+        """
+        new_points = []
+
+        for point in points:
+            lat, lon = point[0], point[1]
+
+            if not self.is_new_target(lat, lon):
+                continue
+
+            if any(
+                distance_m(lat, lon, p[0], p[1]) < self.min_distance
+                for p in new_points
+            ):
+                continue
+
+            new_points.append(point)
+
+        return new_points
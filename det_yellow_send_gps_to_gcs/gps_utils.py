@@ -14,3 +14,7 @@ class GPSUtils:
     def get_position(self):
         loc = self.vehicle.location.global_frame
         return loc.lat, loc.lon, loc.alt
+
+    def get_relative_alt(self):
+        # Height above home, used as height above ground (flat field)
+        return self.vehicle.location.global_relative_frame.alt
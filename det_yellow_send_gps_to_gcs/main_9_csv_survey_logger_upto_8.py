@@ -1,344 +1,746 @@
 
-from dronekit import VehicleMode
-from mission_step1_polygon import upload_rectangle_mission, start_step1_mission
-
+from startup import Startup
 from visual_alignment import compute_alignment_velocity
 
 
 from gps_distance_filter import GPSDistanceFilter
 
 from survey_logger import SurveyLogger
+from detection_sender import DetectionSender
+
+from georef import CameraModel, pixel_to_latlon
+from telemetry_recorder import TelemetryRecorder
+from flight_recorder import FlightRecorder, make_dtype
+from stage_stats import StageStats
+from frame_trace import FrameTracer
 
 
-import cv2
-from dronekit import connect
-from pymavlink import mavutil
+import math
+import time
 
-from camera import Camera
-from vision import detect_yellow_and_centroid
+# cv2 / dronekit / pymavlink are imported by the startup components
+# below, in parallel, instead of here
 from tracker import YellowTracker
 from drone_state import DroneState
 from gps_utils import GPSUtils
 
 
-def main():
-    # --------------------------------------------------
-    # CAMERA + TRACKER
-    # --------------------------------------------------
-    cam = Camera(cam_index=0)
-    tracker = YellowTracker(stable_frames=10)
-
-    frame_center_tolerance = 20  # pixels (blue box half size)
+# --------------------------------------------------
+# FLIGHT RECORDER: one record per processed frame
+# --------------------------------------------------
+FLIGHT_RECORDER_DIR = "/home/pi/logs/flight"
+
+# Per-stage latency stats on http://127.0.0.1:<port>/ (None = off)
+STATS_HTTP_PORT = 8766
+
+# One row per frame: ms from capture to detect/track/align/command/GPS/log
+# (python frame_trace.py /home/pi/logs/frame_trace.csv)
+FRAME_TRACE_PATH = "/home/pi/logs/frame_trace.csv"
+
+TICK_DTYPE = make_dtype([
+    ("capture_time", "<f8"),     # camera monotonic timestamp
+    ("trace_id", "<u4"),         # row in the frame trace CSV
+    ("detected", "u1"),
+    ("locked", "u1"),
+    ("inside_box", "u1"),
+    ("level", "u1"),
+    ("cx", "<f4"),               # NaN when nothing detected
+    ("cy", "<f4"),
+    ("n_blobs", "<u2"),
+    ("lat", "<f8"),
+    ("lon", "<f8"),
+    ("rel_alt", "<f4"),
+    ("roll", "<f4"),
+    ("pitch", "<f4"),
+    ("yaw", "<f4"),
+    ("groundspeed", "<f4"),
+    ("speed_cmd", "<f4"),        # commanded groundspeed (changes logged)
+    ("vx_cmd", "<f4"),           # alignment command, NaN if none
+    ("vy_cmd", "<f4"),
+    ("detection_count", "<u2"),
+    ("frame_age_ms", "<f4"),     # capture -> processing start
+    ("detect_ms", "<f4"),
+    ("control_ms", "<f4"),
+    ("draw_ms", "<f4"),
+    ("loop_ms", "<f4"),
+])
+
+
+def _f(value):
+    # DroneKit attributes are None until the first message arrives
+    return float("nan") if value is None else value
+
+
+# --------------------------------------------------
+# STARTUP COMPONENTS (run in parallel, see startup.py)
+# --------------------------------------------------
+CAMERA_WARMUP_TIMEOUT_SEC = 10.0
+
+# No new frame for this long -> warn (once per interval, keeps the window
+# and 'q' responsive); for CAMERA_STALE_EXIT_SEC -> leave the loop
+CAMERA_STALE_WARN_SEC = 1.0
+CAMERA_STALE_EXIT_SEC = 10.0
+
+
+def _start_camera():
+    from camera import Camera
+    from vision import YellowDetector
+
+    cam = Camera(cam_index=0, threaded=True)   # background capture, newest frame only
+    # ROI-tracked once locked, coarse-to-fine search otherwise
+    detector = YellowDetector(pyramid_search=True)
+
+    # Usable once the first frame has arrived (driver / exposure warm-up)
+    deadline = time.monotonic() + CAMERA_WARMUP_TIMEOUT_SEC
+    while cam.latest_id == 0:
+        if time.monotonic() > deadline:
+            cam.release()
+            raise RuntimeError("no frame from camera")
+        time.sleep(0.01)
+
+    return cam, detector
+
+
+def _connect():
+    from vehicle_connect import connect_vehicle, READY_ATTRS
 
-    # --------------------------------------------------
     # DRONEKIT CONNECTION (SITL or REAL DRONE)
-    # --------------------------------------------------
-    vehicle = connect("/dev/ttyAMA0", baud=57600, wait_ready=True)
+    # Waits for what this loop uses, not the full parameter download
+    return connect_vehicle(
+        "/dev/ttyAMA0", baud=57600,
+        ready_attrs=READY_ATTRS + ("location.global_relative_frame",)
+    )
 
-    drone_state = DroneState(vehicle)
-    gps_utils = GPSUtils(vehicle)
 
-    # --------------------------------------------------
+def _upload_mission(vehicle):
+    from mission_step1_polygon import upload_rectangle_mission
+
     # STEP 1 — POLYGON MISSION (REAL DRONE)
-    # --------------------------------------------------
     upload_rectangle_mission(vehicle, altitude=4.0)
-    start_step1_mission(vehicle, speed=1.0)
 
 
-    # --------------------------------------------------
-    # GPS CAPTURE STATE
-    # --------------------------------------------------
-    gps_captured = False
-    detected_points = []   # list of (lat, lon, alt)
+def main():
+    # Anything that fails before or during the mission (vehicle link,
+    # camera, mission upload) still releases what was already opened
+    startup = None
+    vehicle = cam = cv2 = None
+    telemetry = recorder = perf = tracer = None
+    survey_logger = detection_link = gps_filter = None
+
+    try:
+        # --------------------------------------------------
+        # PARALLEL STARTUP: camera warm-up | connect -> mission upload
+        # --------------------------------------------------
+        startup = Startup()
+        startup.add("camera", _start_camera)
+        startup.add("vehicle", _connect)
+        startup.add("mission_upload", _upload_mission, after=("vehicle",))
+
+        tracker = YellowTracker(stable_frames=10)
+        frame_center_tolerance = 20  # pixels (blue box half size)
+
+        vehicle = startup.wait("vehicle")
+        from dronekit import VehicleMode
+        from pymavlink import mavutil
+
+        drone_state = DroneState(vehicle)
+        gps_utils = GPSUtils(vehicle)
 
-    detection_count = 0
+        # Vehicle state history, so frames are geotagged at their capture time
+        telemetry = TelemetryRecorder(vehicle)
+        telemetry.start()
 
-    print("✅ System started, waiting for yellow detection...")
+        # Per-frame binary log (python flight_recorder.py /home/pi/logs/flight)
+        recorder = FlightRecorder(FLIGHT_RECORDER_DIR, TICK_DTYPE, name="survey")
 
+        # Live per-stage latency (curl http://127.0.0.1:8766/text)
+        perf = StageStats()
+        lap = perf.lap()
+        if STATS_HTTP_PORT:
+            perf.serve(STATS_HTTP_PORT)
+        tracer = FrameTracer(perf, FRAME_TRACE_PATH)
+
+
+        # --------------------------------------------------
+        # GPS CAPTURE STATE
+        # --------------------------------------------------
+        gps_captured = False
+        detected_points = []   # list of (lat, lon, alt)
 
+        detection_count = 0
 
-    target_confirmed = False     # STEP 3: duplicate filter
-    yellow_visible = False      # helper state
+        print("✅ System started, waiting for yellow detection...")
+
+
+
+        target_confirmed = False     # STEP 3: duplicate filter
+        yellow_visible = False      # helper state
     
     
-    # --------------------------------------------------
-    # STEP 5A — GPS DISTANCE FILTER (FINAL)
-    # --------------------------------------------------
-    gps_filter = GPSDistanceFilter(min_distance_m=1.0)
+        # --------------------------------------------------
+        # STEP 5A — GPS DISTANCE FILTER (FINAL)
+        # --------------------------------------------------
+        # Logged points persist across restarts (delete the file for a new field)
+        gps_filter = GPSDistanceFilter(
+            min_distance_m=1.0,
+            state_path="/home/pi/logs/survey_filter_points.csv"
+        )
     
     
-    # --------------------------------------------------
-    # SURVEY CSV LOGGER
-    # --------------------------------------------------
-    survey_logger = SurveyLogger("/home/pi/logs/survey_targets.csv")
+        # --------------------------------------------------
+        # SURVEY CSV LOGGER
+        # --------------------------------------------------
+        survey_logger = SurveyLogger(
+            "/home/pi/logs/survey_targets.csv",
+            journal_path="/home/pi/logs/survey_targets.jrn"
+        )
+
+
+        # --------------------------------------------------
+        # UDP DETECTION LINK TO SPRAY DRONE
+        # --------------------------------------------------
+        ENABLE_DETECTION_LINK = False       # 🔴 SET SPRAY DRONE IP FIRST
+        SPRAY_DRONE_HOST = "192.168.1.20"
+
+        detection_link = None
+        if ENABLE_DETECTION_LINK:
+            detection_link = DetectionSender(SPRAY_DRONE_HOST)
+            detection_link.start()
 
     
     
-    # --------------------------------------------------
-    # STEP 5B — VISUAL ALIGNMENT CONTROL
-    # --------------------------------------------------
-    ENABLE_ALIGNMENT = False   # 🔴 KEEP FALSE UNTIL TESTED
+        # --------------------------------------------------
+        # STEP 5B — VISUAL ALIGNMENT CONTROL
+        # --------------------------------------------------
+        ENABLE_ALIGNMENT = False   # 🔴 KEEP FALSE UNTIL TESTED
+
+
+        # --------------------------------------------------
+        # STEP 6 — GEOREFERENCED LOGGING (NO CENTERING)
+        # --------------------------------------------------
+        # Log every target from its pixel position while cruising at
+        # SEARCH_SPEED, instead of slowing down and centering on each one.
+        ENABLE_GEOREF_LOGGING = False   # 🔴 KEEP FALSE UNTIL CAMERA FOV CHECKED
+        camera_model = None             # built from the first frame size
+        EDGE_MARGIN_PX = 5              # skip targets cut off by the frame edge
 
 
     
     
-    # --------------------------------------------------
-    # STEP 4 — SPEED CONTROL VALUES
-    # --------------------------------------------------
-    SEARCH_SPEED = 1.0     # normal scan speed
-    DETECT_SPEED = 0.5     # yellow seen
-    LOCK_SPEED   = 0.2     # yellow locked (stable)
+        # --------------------------------------------------
+        # STEP 4 — SPEED CONTROL VALUES
+        # --------------------------------------------------
+        SEARCH_SPEED = 1.0     # normal scan speed
+        DETECT_SPEED = 0.5     # yellow seen
+        LOCK_SPEED   = 0.2     # yellow locked (stable)
 
-    current_speed = SEARCH_SPEED
+        current_speed = SEARCH_SPEED
 
 
+        # --------------------------------------------------
+        # STEP 1 — START MISSION once camera and mission are ready
+        # --------------------------------------------------
+        cam, detector = startup.wait("camera")
+        import cv2
+        from mission_step1_polygon import start_step1_mission
 
+        startup.wait("mission_upload")
+        start_step1_mission(vehicle, speed=1.0)
+        startup.mark("auto")
+        startup.report()
 
-    # --------------------------------------------------
-    # MAIN LOOP
-    # --------------------------------------------------
-    while True:
-        frame = cam.read()
-        if frame is None:
-            break
-
-        # -------------------------------
-        # FRAME CENTER
-        # -------------------------------
-        h, w, _ = frame.shape
-        center_x = w // 2
-        center_y = h // 2
-
-        # -------------------------------
-        # YELLOW DETECTION + CENTROID
-        # -------------------------------
-        detected, cx, cy, mask = detect_yellow_and_centroid(frame)
-
-        # -------------------------------
-        # TEMPORAL STABILITY (LOCK)
-        # -------------------------------
-        locked = tracker.update(detected)
-
-        # -------------------------------
-        # BLUE BOX (SPATIAL ALIGNMENT)
-        # -------------------------------
-        inside_box = False
-        if detected:
-            inside_box = (
-                abs(cx - center_x) <= frame_center_tolerance and
-                abs(cy - center_y) <= frame_center_tolerance
-            )
 
-        # -------------------------------
-        # ATTITUDE CHECK (ROLL & PITCH)
-        # -------------------------------
-        level = drone_state.is_level()
+        # --------------------------------------------------
+        # MAIN LOOP
+        # --------------------------------------------------
+        last_capture_time = None
+        last_new_frame = time.monotonic()
+        last_stale_warn = last_new_frame
+
+        while True:
+            frame, capture_time = cam.read_latest()
+
+            # No new frame yet (startup or camera hiccup) -> don't reprocess old one
+            if frame is None or capture_time == last_capture_time:
+                now = time.monotonic()
+                stale_sec = now - last_new_frame
+
+                if stale_sec >= CAMERA_STALE_EXIT_SEC:
+                    print(f"❌ No camera frame for {stale_sec:.0f}s "
+                          f"({cam.read_failures} read failures) — stopping")
+                    break
+
+                if stale_sec >= CAMERA_STALE_WARN_SEC:
+                    if now - last_stale_warn >= CAMERA_STALE_WARN_SEC:
+                        last_stale_warn = now
+                        print(f"⚠️ No camera frame for {stale_sec:.1f}s "
+                              f"({cam.read_failures} read failures)")
+                    # Keep the windows alive and 'q' working while stalled
+                    if cv2.waitKey(1) & 0xFF == ord("q"):
+                        break
+                else:
+                    time.sleep(0.002)
+                continue
+            last_capture_time = capture_time
+            last_new_frame = time.monotonic()
+            t_start = time.perf_counter()
+            frame_age_ms = (time.monotonic() - capture_time) * 1000
+            lap("capture")                      # waiting for a new frame
+            perf.record("frame_age", frame_age_ms)
+            trace = tracer.begin(capture_time)
+
+            # -------------------------------
+            # FRAME CENTER
+            # -------------------------------
+            h, w, _ = frame.shape
+            center_x = w // 2
+            center_y = h // 2
+
+            if camera_model is None:
+                camera_model = CameraModel(width=w, height=h)
+
+            # -------------------------------
+            # YELLOW DETECTION + CENTROID
+            # -------------------------------
+            if ENABLE_GEOREF_LOGGING:
+                # Georef logs targets anywhere in the frame: one full-frame
+                # pass, the largest blob drives the tracker / alignment
+                blobs = detector.detect_all(frame)
+                detected = len(blobs) > 0
+                cx = int(blobs[0]["cx"]) if detected else None
+                cy = int(blobs[0]["cy"]) if detected else None
+                mask = detector.mask
+            else:
+                detected, cx, cy, mask = detector.detect_tracked(frame, tracker.locked)
+
+                # Targets found by that pass (largest first). NOT every target
+                # in view: while tracking, only the ROI window was segmented
+                # (plus a full scan every FULL_SCAN_EVERY frames), so this is
+                # usually just the tracked blob. Use detector.detect_all(frame)
+                # where every target in the frame is needed.
+                blobs = detector.blobs() if detected else []
+            t_detect = time.perf_counter()
+            lap("detect")
+            trace.mark("detect")
+
+            # -------------------------------
+            # TEMPORAL STABILITY (LOCK)
+            # -------------------------------
+            locked = tracker.update(detected)
+            lap("track")
+            trace.mark("track")
+
+            # -------------------------------
+            # BLUE BOX (SPATIAL ALIGNMENT)
+            # -------------------------------
+            inside_box = False
+            if detected:
+                inside_box = (
+                    abs(cx - center_x) <= frame_center_tolerance and
+                    abs(cy - center_y) <= frame_center_tolerance
+                )
+
+            # -------------------------------
+            # ATTITUDE CHECK (ROLL & PITCH)
+            # -------------------------------
+            level = drone_state.is_level()
 
-        # -------------------------------
-        # FINAL DECISION FLAG
-        # -------------------------------
-        ready_for_gps = locked and inside_box and level
+            # -------------------------------
+            # FINAL DECISION FLAG
+            # -------------------------------
+            ready_for_gps = locked and inside_box and level
         
         
-        # --------------------------------------------------
-        # STEP 4 — ADAPTIVE SPEED CONTROL
-        # --------------------------------------------------
-        if not detected:
-            desired_speed = SEARCH_SPEED
+            # --------------------------------------------------
+            # STEP 4 — ADAPTIVE SPEED CONTROL
+            # --------------------------------------------------
+            if not detected or ENABLE_GEOREF_LOGGING:
+                desired_speed = SEARCH_SPEED
 
-        elif detected and not locked:
-            desired_speed = DETECT_SPEED
+            elif detected and not locked:
+                desired_speed = DETECT_SPEED
 
-        elif locked:
-            desired_speed = LOCK_SPEED
+            elif locked:
+                desired_speed = LOCK_SPEED
 
-        else:
-            desired_speed = SEARCH_SPEED
+            else:
+                desired_speed = SEARCH_SPEED
 
+            lap("decision")
 
-        # Apply speed only if it changed
-        if abs(current_speed - desired_speed) > 0.05:
-            vehicle.groundspeed = desired_speed
-            current_speed = desired_speed
-            print(f"🐢 Speed changed to {current_speed} m/s")
+            # Apply speed only if it changed
+            if abs(current_speed - desired_speed) > 0.05:
+                vehicle.groundspeed = desired_speed
+                current_speed = desired_speed
+                print(f"🐢 Speed changed to {current_speed} m/s")
             
             
-        # --------------------------------------------------
-        # STEP 5B — VISUAL ALIGNMENT (PASSIVE / ACTIVE)
-        # --------------------------------------------------
-        if locked and detected and not inside_box:
-
-            vx, vy = compute_alignment_velocity(
-                cx, cy, center_x, center_y, max_vel=0.2
-            )
-
-            # Debug output (always safe)
-            print(f"🧭 Alignment cmd vx={vx:.2f}, vy={vy:.2f}")
-
-            if ENABLE_ALIGNMENT:
-                # Body-frame velocity command
-                vehicle.send_mavlink(
-                    vehicle.message_factory.set_position_target_local_ned_encode(
-                        0,
-                        0, 0,
-                        mavutil.mavlink.MAV_FRAME_BODY_NED,
-                        0b0000111111000111,
-                        0, 0, 0,
-                        vx, vy, 0,
-                        0, 0, 0,
-                        0, 0
-                    )
+            # --------------------------------------------------
+            # STEP 5B — VISUAL ALIGNMENT (PASSIVE / ACTIVE)
+            # --------------------------------------------------
+            vx = vy = float("nan")
+            if locked and detected and not inside_box and not ENABLE_GEOREF_LOGGING:
+
+                vx, vy = compute_alignment_velocity(
+                    cx, cy, center_x, center_y, max_vel=0.2
                 )
+                trace.mark("align")
+
+                # Debug output (always safe)
+                print(f"🧭 Alignment cmd vx={vx:.2f}, vy={vy:.2f}")
+
+                if ENABLE_ALIGNMENT:
+                    # Body-frame velocity command
+                    vehicle.send_mavlink(
+                        vehicle.message_factory.set_position_target_local_ned_encode(
+                            0,
+                            0, 0,
+                            mavutil.mavlink.MAV_FRAME_BODY_NED,
+                            0b0000111111000111,
+                            0, 0, 0,
+                            vx, vy, 0,
+                            0, 0, 0,
+                            0, 0
+                        )
+                    )
+                    trace.mark("command")
 
+            lap("mavlink")
 
-        # ==================================================
-        # GPS CAPTURE LOGIC (HERE3+ SAFE) — STEP 5A FINAL
-        # ==================================================
-        if ready_for_gps and not gps_captured:
-            if gps_utils.position_ok():
+            # ==================================================
+            # GPS CAPTURE LOGIC (HERE3+ SAFE) — STEP 5A FINAL
+            # ==================================================
+            if ready_for_gps and not gps_captured and not ENABLE_GEOREF_LOGGING:
+                if gps_utils.position_ok():
 
-                lat, lon, alt = gps_utils.get_position()
+                    if telemetry.ready():
+                        state = telemetry.at(capture_time)
+                        lat, lon, alt = state.lat, state.lon, state.alt
+                    else:
+                        lat, lon, alt = gps_utils.get_position()
+                    trace.mark("gps")
 
-                # STEP 3 + STEP 5A CHECK
-                if (not target_confirmed) and gps_filter.is_new_target(lat, lon):
+                    # STEP 3 + STEP 5A CHECK
+                    if (not target_confirmed) and gps_filter.is_new_target(lat, lon):
 
-                    gps_filter.register_target(lat, lon)
+                        gps_filter.register_target(lat, lon)
 
-                    detected_points.append((lat, lon, alt))
+                        detected_points.append((lat, lon, alt))
                     
-                    # --------------------------------------------------
-                    # LOG TO SURVEY CSV (FINAL, COMPETITION-GRADE)
-                    # --------------------------------------------------
-                    survey_logger.log_target(
-                        lat,
-                        lon,
-                        alt,
-                        confidence=1.0  # placeholder; will align confidence later
-                    )
+                        # --------------------------------------------------
+                        # LOG TO SURVEY CSV (FINAL, COMPETITION-GRADE)
+                        # --------------------------------------------------
+                        target_id = survey_logger.log_target(
+                            lat,
+                            lon,
+                            alt,
+                            confidence=1.0  # placeholder; will align confidence later
+                        )
+                        trace.target_id = target_id
+                        trace.mark("survey_log")
+
+                        if detection_link:
+                            detection_link.send(target_id, lat, lon, alt, 1.0)
 
                     
                     
-                    gps_captured = True
-                    target_confirmed = True
+                        gps_captured = True
+                        target_confirmed = True
 
-                    detection_count += 1
-                    print(f"\n🎯 Detection count = {detection_count}")
+                        detection_count += 1
+                        print(f"\n🎯 Detection count = {detection_count}")
                     
 
-                    print("✅ NEW YELLOW TARGET CONFIRMED")
-                    print(f"Latitude : {lat:.7f}")
-                    print(f"Longitude: {lon:.7f}")
-                    print(f"Altitude : {alt:.2f}")
-                    print("----------------------------------")
+                        print("✅ NEW YELLOW TARGET CONFIRMED")
+                        print(f"Latitude : {lat:.7f}")
+                        print(f"Longitude: {lon:.7f}")
+                        print(f"Altitude : {alt:.2f}")
+                        print("----------------------------------")
 
-                    msg = f"YELLOW @ {lat:.6f}, {lon:.6f}"
-                    vehicle._master.mav.statustext_send(
-                        mavutil.mavlink.MAV_SEVERITY_INFO,
-                        msg.encode()
-                    )
-
-                    if detection_count >= 2:
-                        print("🛬 Required detections reached — RTL triggered")
-                        vehicle.mode = VehicleMode("RTL")
-
-                else:
-                    print("⚠️ Duplicate target ignored (vision/GPS filter)")
+                        msg = f"YELLOW @ {lat:.6f}, {lon:.6f}"
+                        vehicle._master.mav.statustext_send(
+                            mavutil.mavlink.MAV_SEVERITY_INFO,
+                            msg.encode()
+                        )
 
-            else:
-                print("⚠️ GPS/EKF not ready — skipping capture")
+                        if detection_count >= 2:
+                            print("🛬 Required detections reached — RTL triggered")
+                            vehicle.mode = VehicleMode("RTL")
 
+                    else:
+                        print("⚠️ Duplicate target ignored (vision/GPS filter)")
 
-        # --------------------------------------------------
-        # RESET WHEN YELLOW DISAPPEARS
-        # --------------------------------------------------
-        if not detected:
-            gps_captured = False
-            yellow_visible = False
-            target_confirmed = False
-
-
-        # ==================================================
-        # VISUAL DEBUG (FOR VNC / MONITOR USE)
-        # ==================================================
-        # Blue box
-        cv2.rectangle(
-            frame,
-            (center_x - frame_center_tolerance, center_y - frame_center_tolerance),
-            (center_x + frame_center_tolerance, center_y + frame_center_tolerance),
-            (255, 0, 0),
-            2,
-        )
+                else:
+                    print("⚠️ GPS/EKF not ready — skipping capture")
+
+
+            # ==================================================
+            # STEP 6 — GEOREFERENCED CAPTURE (ALL TARGETS IN VIEW)
+            # ==================================================
+            # No lock required: the tracker follows one target, georef logs all
+            # of them (repeats are removed by the GPS distance filter)
+            if ENABLE_GEOREF_LOGGING and len(blobs) and gps_utils.position_ok():
+                if telemetry.ready():
+                    # Vehicle state at the moment the frame was captured
+                    state = telemetry.at(capture_time)
+                    lat, lon, alt = state.lat, state.lon, state.alt
+                    rel_alt = state.rel_alt
+                    roll, pitch, yaw = state.roll, state.pitch, state.yaw
+                else:
+                    lat, lon, alt = gps_utils.get_position()
+                    rel_alt = gps_utils.get_relative_alt()
+                    roll, pitch, yaw = drone_state.get_attitude_rad()
+                trace.mark("gps")
+
+                # No attitude / position yet (first ATTITUDE not received):
+                # skip georef for this frame
+                if None not in (lat, lon, rel_alt, roll, pitch, yaw):
+                    # Only targets fully inside the frame (partial blob = shifted centroid)
+                    whole = blobs[
+                        (blobs["x"] >= EDGE_MARGIN_PX) &
+                        (blobs["y"] >= EDGE_MARGIN_PX) &
+                        (blobs["x"] + blobs["w"] <= w - EDGE_MARGIN_PX) &
+                        (blobs["y"] + blobs["h"] <= h - EDGE_MARGIN_PX)
+                    ]
+
+                    target_lats, target_lons = pixel_to_latlon(
+                        whole["cx"], whole["cy"],
+                        lat, lon, rel_alt,
+                        roll, pitch, yaw,
+                        camera_model
+                    )
 
-        if detected:
-            # Red centroid dot
-            cv2.circle(frame, (cx, cy), 7, (0, 0, 255), -1)
+                    points = [
+                        (float(t_lat), float(t_lon))
+                        for t_lat, t_lon in zip(target_lats, target_lons)
+                        if not math.isnan(t_lat)
+                    ]
+
+                    for t_lat, t_lon in gps_filter.filter_new_targets(points):
+                        gps_filter.register_target(t_lat, t_lon)
+                        detected_points.append((t_lat, t_lon, alt))
+
+                        target_id = survey_logger.log_target(t_lat, t_lon, alt, confidence=1.0)
+                        if trace.target_id is None:
+                            trace.target_id = target_id
+                            trace.mark("survey_log")
+                        if detection_link:
+                            detection_link.send(target_id, t_lat, t_lon, alt, 1.0)
+                        gps_captured = True
+
+                        detection_count += 1
+                        print(f"\n🎯 Detection count = {detection_count}")
+                        print(f"✅ NEW YELLOW TARGET (GEOREF) {t_lat:.7f}, {t_lon:.7f}")
+
+                        msg = f"YELLOW @ {t_lat:.6f}, {t_lon:.6f}"
+                        vehicle._master.mav.statustext_send(
+                            mavutil.mavlink.MAV_SEVERITY_INFO,
+                            msg.encode()
+                        )
+
+                if detection_count >= 2 and vehicle.mode.name != "RTL":
+                    print("🛬 Required detections reached — RTL triggered")
+                    vehicle.mode = VehicleMode("RTL")
+
+
+            # --------------------------------------------------
+            # RESET WHEN YELLOW DISAPPEARS
+            # --------------------------------------------------
+            if not detected:
+                gps_captured = False
+                yellow_visible = False
+                target_confirmed = False
+
+
+            t_control = time.perf_counter()
+            lap("logging")                      # GPS capture / georef / survey log
+
+            # ==================================================
+            # VISUAL DEBUG (FOR VNC / MONITOR USE)
+            # ==================================================
+            # Blue box
+            cv2.rectangle(
+                frame,
+                (center_x - frame_center_tolerance, center_y - frame_center_tolerance),
+                (center_x + frame_center_tolerance, center_y + frame_center_tolerance),
+                (255, 0, 0),
+                2,
+            )
 
-            if locked:
-                cv2.putText(
+            # Yellow box around every target in view
+            for blob in blobs:
+                cv2.rectangle(
                     frame,
-                    "YELLOW LOCKED",
-                    (10, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX,
+                    (int(blob["x"]), int(blob["y"])),
+                    (int(blob["x"] + blob["w"]), int(blob["y"] + blob["h"])),
+                    (0, 255, 255),
                     1,
-                    (0, 255, 0),
-                    2,
                 )
 
-        roll_deg, pitch_deg = drone_state.get_attitude_deg()
+            if detected:
+                # Red centroid dot
+                cv2.circle(frame, (cx, cy), 7, (0, 0, 255), -1)
+
+                if locked:
+                    cv2.putText(
+                        frame,
+                        "YELLOW LOCKED",
+                        (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        1,
+                        (0, 255, 0),
+                        2,
+                    )
 
-        cv2.putText(
-            frame,
-            f"INSIDE BOX: {inside_box}",
-            (10, 70),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.7,
-            (255, 255, 0),
-            2,
-        )
+            roll_deg, pitch_deg = drone_state.get_attitude_deg()
 
-        cv2.putText(
-            frame,
-            f"ROLL: {roll_deg:.1f}  PITCH: {pitch_deg:.1f}",
-            (10, 110),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.7,
-            (0, 255, 255),
-            2,
-        )
+            cv2.putText(
+                frame,
+                f"INSIDE BOX: {inside_box}",
+                (10, 70),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.7,
+                (255, 255, 0),
+                2,
+            )
 
-        cv2.putText(
-            frame,
-            f"READY GPS: {ready_for_gps}",
-            (10, 150),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.7,
-            (0, 255, 0) if ready_for_gps else (0, 0, 255),
-            2,
-        )
+            cv2.putText(
+                frame,
+                f"ROLL: {roll_deg:.1f}  PITCH: {pitch_deg:.1f}",
+                (10, 110),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.7,
+                (0, 255, 255),
+                2,
+            )
 
-        if gps_captured:
             cv2.putText(
                 frame,
-                "GPS CAPTURED",
-                (10, 190),
+                f"READY GPS: {ready_for_gps}",
+                (10, 150),
                 cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                (0, 255, 0),
+                0.7,
+                (0, 255, 0) if ready_for_gps else (0, 0, 255),
                 2,
             )
 
-        cv2.imshow("Camera Feed", frame)
-        cv2.imshow("Yellow Mask", mask)
+            cv2.putText(
+                frame,
+                f"TARGETS IN VIEW: {len(blobs)}",
+                (10, 230),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.7,
+                (0, 255, 255),
+                2,
+            )
 
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
+            if gps_captured:
+                cv2.putText(
+                    frame,
+                    "GPS CAPTURED",
+                    (10, 190),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.8,
+                    (0, 255, 0),
+                    2,
+                )
+
+            cv2.imshow("Camera Feed", frame)
+            cv2.imshow("Yellow Mask", mask)
+
+            key = cv2.waitKey(1) & 0xFF
+            t_end = time.perf_counter()
+            lap("hud")
+
+            # -------------------------------
+            # FLIGHT RECORDER
+            # -------------------------------
+            rec = recorder.next_record()
+            loc = vehicle.location.global_relative_frame
+            att = vehicle.attitude
+            rec["capture_time"] = capture_time
+            rec["trace_id"] = trace.trace_id
+            rec["detected"] = detected
+            rec["locked"] = locked
+            rec["inside_box"] = inside_box
+            rec["level"] = level
+            rec["cx"] = cx if detected else float("nan")
+            rec["cy"] = cy if detected else float("nan")
+            rec["n_blobs"] = len(blobs)
+            rec["lat"] = _f(loc.lat)
+            rec["lon"] = _f(loc.lon)
+            rec["rel_alt"] = _f(loc.alt)
+            rec["roll"] = _f(att.roll)
+            rec["pitch"] = _f(att.pitch)
+            rec["yaw"] = _f(att.yaw)
+            rec["groundspeed"] = _f(vehicle.groundspeed)
+            rec["speed_cmd"] = current_speed
+            rec["vx_cmd"] = vx
+            rec["vy_cmd"] = vy
+            rec["detection_count"] = detection_count
+            rec["frame_age_ms"] = frame_age_ms
+            rec["detect_ms"] = (t_detect - t_start) * 1000
+            rec["control_ms"] = (t_control - t_detect) * 1000
+            rec["draw_ms"] = (t_end - t_control) * 1000
+            rec["loop_ms"] = (t_end - t_start) * 1000
+            lap("recorder")
+            perf.record("loop", (t_end - t_start) * 1000)
+            tracer.end(trace)
+
+            if key == ord("q"):
+                break
+
+    except KeyboardInterrupt:
+        print("\n🛑 Survey interrupted by user")
 
     # --------------------------------------------------
     # CLEANUP
     # --------------------------------------------------
-    cam.release()
-    vehicle.close()
-    cv2.destroyAllWindows()
+    finally:
+        print("🧹 Cleaning up before exit...")
+
+        # Vehicle link failed while the camera was still warming up
+        if cam is None and startup is not None:
+            try:
+                cam, _ = startup.wait("camera", timeout=CAMERA_WARMUP_TIMEOUT_SEC)
+            except Exception:
+                pass
+
+        if cam is not None:
+            print(
+                f"📷 Frames dropped: {cam.dropped_frames}, "
+                f"duplicates skipped: {cam.duplicate_frames}, "
+                f"read failures: {cam.read_failures}"
+            )
+            cam.release()
+        if telemetry is not None:
+            telemetry.stop()
+        if recorder is not None:
+            recorder.close()
+        if tracer is not None:
+            tracer.close()
+        if perf is not None:
+            perf.stop()
+            print(perf.text())
+
+        if detection_link:
+            if not detection_link.flush(timeout=5.0):
+                print(f"⚠️ {detection_link.pending()} detections not acknowledged by spray drone")
+            detection_link.stop()
+
+        if survey_logger is not None:
+            survey_logger.close()
+        if gps_filter is not None:
+            gps_filter.close()
+
+        try:
+            if vehicle:
+                vehicle.close()
+        except Exception:
+            pass
+
+        if cv2 is not None:
+            cv2.destroyAllWindows()
 
 
 if __name__ == "__main__":
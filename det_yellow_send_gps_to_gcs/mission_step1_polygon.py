@@ -1,21 +1,17 @@
 from dronekit import Command, VehicleMode
 from pymavlink import mavutil
-import time
-import math
+
+from vehicle_wait import wait_for
+from geodesy import offset
+
+UPLOAD_TIMEOUT_SEC = 30
 
 
 def get_location_offset_meters(origin, dNorth, dEast, alt):
     """
     Returns new (lat, lon, alt) offset from origin by meters
     """
-    earth_radius = 6378137.0
-
-    dLat = dNorth / earth_radius
-    dLon = dEast / (earth_radius * math.cos(math.pi * origin.lat / 180))
-
-    new_lat = origin.lat + (dLat * 180 / math.pi)
-    new_lon = origin.lon + (dLon * 180 / math.pi)
-
+    new_lat, new_lon = offset(origin.lat, origin.lon, dNorth, dEast)
     return new_lat, new_lon, alt
 
 
@@ -25,7 +21,6 @@ def upload_rectangle_mission(vehicle, altitude=4.0):
     """
     cmds = vehicle.commands
     cmds.clear()
-    time.sleep(1)
 
     home = vehicle.location.global_relative_frame
 
@@ -65,8 +60,8 @@ def upload_rectangle_mission(vehicle, altitude=4.0):
             )
         )
 
-    cmds.upload()
-    time.sleep(2)
+    # Blocks until the autopilot has requested every item
+    cmds.upload(timeout=UPLOAD_TIMEOUT_SEC)
 
     print("✅ Rectangle mission uploaded")
 
@@ -75,8 +70,8 @@ def start_step1_mission(vehicle, speed=1.0):
     """
     Sets speed and starts AUTO mission
     """
+    # Same link as the mode change below, so it arrives first anyway
     vehicle.groundspeed = speed
-    time.sleep(1)
 
     print(f"🐢 Ground speed set to {speed} m/s")
     print("🚀 Switching to AUTO mode")
@@ -84,7 +79,6 @@ def start_step1_mission(vehicle, speed=1.0):
     vehicle.mode = VehicleMode("AUTO")  #vehicle.commands.next = 0
 					#vehicle.mode = VehicleMode("AUTO")
 
-    while vehicle.mode.name != "AUTO":
-        time.sleep(0.5)
+    wait_for(vehicle, ["mode"], lambda: vehicle.mode.name == "AUTO")
 
     print("✅ STEP-1 mission started")
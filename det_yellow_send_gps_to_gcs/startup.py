@@ -0,0 +1,118 @@
+# startup.py
+# Parallel startup with a readiness timeline.
+#
+# Independent subsystems (camera, vehicle link, GPIO, ...) come up on
+# their own threads. A component can depend on others and is called with
+# their results once they are ready. Heavy imports (cv2, dronekit,
+# gpiozero) go inside the component functions so they load in parallel
+# too instead of before anything can start.
+#
+#   startup = Startup()
+#   startup.add("vehicle", connect)
+#   startup.add("mission", upload, after=("vehicle",))   # upload(vehicle)
+#   vehicle = startup.wait("vehicle")
+#   startup.mark("auto")          # a sequential step, on the timeline too
+#   startup.report()
+#
+# Same file in det_yellow_send_gps_to_gcs/ and spray_drone/ — keep in sync.
+import threading
+import time
+
+
+def _uptime():
+    # Seconds since the kernel booted (~ power-on), None off Linux
+    try:
+        with open("/proc/uptime") as f:
+            return float(f.read().split()[0])
+    except (OSError, ValueError):
+        return None
+
+
+class Startup:
+    def __init__(self):
+        self.t0 = time.monotonic()
+        self.boot_sec = _uptime()     # power-on -> Startup()
+        self.components = {}
+
+    def add(self, name, fn, after=()):
+        deps = [self.components[d] for d in after]
+        comp = self.components[name] = _Component(name, fn, deps, self.t0)
+        comp.thread = threading.Thread(target=comp.run, name=f"startup-{name}", daemon=True)
+        comp.thread.start()
+        return comp
+
+    def wait(self, name, timeout=None):
+        """
+        Result of component `name`. Re-raises its exception if it failed.
+        """
+        comp = self.components[name]
+        if not comp.done.wait(timeout):
+            raise TimeoutError(f"{name} not ready after {timeout}s")
+        if comp.error is not None:
+            raise comp.error
+        return comp.result
+
+    def mark(self, name):
+        comp = self.components[name] = _Component(name, None, [], self.t0)
+        comp.started = comp.ready = time.monotonic()
+        comp.done.set()
+        print(f"✅ {name} (+{comp.ready - self.t0:.2f}s)")
+
+    # --------------------------------------------------
+    # READINESS TIMELINE
+    # --------------------------------------------------
+    def report(self):
+        print("⏱️ Startup timeline (s since start)")
+        last = self.t0
+        for comp in sorted(self.components.values(), key=lambda c: c.ready or float("inf")):
+            if comp.error is not None:
+                status = f"❌ {comp.error}"
+            elif comp.ready is None:
+                status = "… not ready"
+            else:
+                status = ""
+                last = max(last, comp.ready)
+
+            started = "" if comp.started is None else f"{comp.started - self.t0:6.2f}"
+            ready = "" if comp.ready is None else f"{comp.ready - self.t0:6.2f}"
+            print(f"   {comp.name:<14}{started:>7} → {ready:>6}  {status}")
+
+        total = last - self.t0
+        if self.boot_sec is None:
+            print(f"   ready after {total:.2f}s")
+        else:
+            print(f"   ready after {total:.2f}s ({self.boot_sec + total:.1f}s since power-on)")
+
+
+class _Component:
+    def __init__(self, name, fn, deps, t0):
+        self.name = name
+        self.fn = fn
+        self.deps = deps
+        self.t0 = t0
+        self.thread = None
+
+        self.started = None
+        self.ready = None
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    def run(self):
+        try:
+            args = []
+            for dep in self.deps:
+                dep.done.wait()
+                if dep.error is not None:
+                    raise RuntimeError(f"needs {dep.name}, which failed")
+                args.append(dep.result)
+
+            self.started = time.monotonic()
+            self.result = self.fn(*args)
+            self.ready = time.monotonic()
+            print(f"✅ {self.name} ready (+{self.ready - self.t0:.2f}s)")
+        except Exception as e:
+            self.error = e
+            print(f"❌ {self.name} failed: {e}")
+        finally:
+            self.done.set()
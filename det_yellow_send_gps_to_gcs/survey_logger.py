@@ -1,41 +1,53 @@
 # survey_logger.py
-import csv
-import os
-from datetime import datetime
+import time
+
+from target_journal import TargetJournal
+from log_writer import LogWriter, FLUSH_EVERY_ROWS, FLUSH_INTERVAL_SEC
 
 
 class SurveyLogger:
-    def __init__(self, csv_path="/home/pi/logs/survey_targets.csv"):
+    def __init__(self, csv_path="/home/pi/logs/survey_targets.csv", journal_path=None,
+                 flush_every=FLUSH_EVERY_ROWS, flush_interval_sec=FLUSH_INTERVAL_SEC,
+                 fsync=False):
         self.csv_path = csv_path
         self.next_id = 1
 
-        os.makedirs(os.path.dirname(self.csv_path), exist_ok=True)
+        # Binary journal: ids keep increasing across restarts. The id is
+        # allocated here, the write happens on the journal's own thread.
+        self.journal = None
+        if journal_path:
+            self.journal = TargetJournal(journal_path, fsync=fsync, background=True)
 
-        if not os.path.exists(self.csv_path):
-            with open(self.csv_path, "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    "id",
-                    "lat",
-                    "lon",
-                    "alt",
-                    "confidence",
-                    "timestamp"
-                ])
+        # CSV rows are written by a background thread (never blocks the loop)
+        self.writer = LogWriter(
+            csv_path,
+            header=["id", "lat", "lon", "alt", "confidence", "timestamp"],
+            flush_every=flush_every,
+            flush_interval_sec=flush_interval_sec,
+            fsync=fsync
+        )
 
     def log_target(self, lat, lon, alt, confidence):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        with open(self.csv_path, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                self.next_id,
-                f"{lat:.7f}",
-                f"{lon:.7f}",
-                f"{alt:.2f}",
-                f"{confidence:.2f}",
-                timestamp
-            ])
+        # Unix seconds: PacketHandler on the spray drone parses a float
+        timestamp = time.time()
+
+        if self.journal:
+            self.next_id = self.journal.append(lat, lon, alt, confidence, timestamp)
+
+        self.writer.write_row([
+            self.next_id,
+            f"{lat:.7f}",
+            f"{lon:.7f}",
+            f"{alt:.2f}",
+            f"{confidence:.2f}",
+            f"{timestamp:.3f}"
+        ])
 
         print(f"📁 Survey CSV logged ID={self.next_id}")
         self.next_id += 1
+        return self.next_id - 1
+
+    def close(self):
+        self.writer.close()
+        if self.journal:
+            self.journal.close()
@@ -0,0 +1,276 @@
+# target_journal.py
+# Append-only binary journal of survey targets.
+#
+# File = 16-byte header + fixed 48-byte records, so the record area can be
+# memory-mapped straight into a NumPy structured array. Each record
+# carries a CRC32 of its payload; a record torn by a power cut fails the
+# check and is skipped (readers) or cut off (writer, on reopen) instead of
+# breaking ingestion. Ids increase monotonically across restarts.
+#
+#   python target_journal.py JOURNAL [OUT.csv]     -> CSV export
+#
+# Same file in det_yellow_send_gps_to_gcs/ and spray_drone/ — keep in sync.
+import atexit
+import csv
+import os
+import queue
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+
+FILE_MAGIC = b"NIDARTJ1"
+HEADER_SIZE = 16
+
+RECORD_DTYPE = np.dtype([
+    ("id", "<u8"),
+    ("timestamp", "<f8"),      # unix seconds
+    ("lat", "<f8"),
+    ("lon", "<f8"),
+    ("alt", "<f4"),
+    ("confidence", "<f4"),
+    ("crc", "<u4"),            # CRC32 of the 40 payload bytes above
+    ("reserved", "<u4"),
+])
+RECORD_SIZE = RECORD_DTYPE.itemsize       # 48
+PAYLOAD_SIZE = RECORD_DTYPE.fields["crc"][1]   # 40
+
+FIELDS = ("id", "lat", "lon", "alt", "confidence", "timestamp")
+
+
+def _header():
+    return FILE_MAGIC + np.array([RECORD_SIZE, 0], dtype="<u4").tobytes()
+
+
+def _crc_ok(records):
+    """
+    Boolean mask of records whose CRC matches.
+    """
+    raw = records.view(np.uint8).reshape(len(records), RECORD_SIZE)
+    crcs = np.fromiter(
+        (zlib.crc32(row[:PAYLOAD_SIZE]) for row in raw),
+        dtype=np.uint32, count=len(records)
+    )
+    return crcs == records["crc"]
+
+
+# --------------------------------------------------
+# WRITER
+# --------------------------------------------------
+class TargetJournal:
+    """
+    Appends targets. Reopening an existing journal drops a torn tail and
+    continues the id sequence after the last valid record.
+
+    background=True: append() allocates the id and queues the record, a
+    writer thread does the write (and fsync), so an SD card stall never
+    blocks the caller. close() (also run at exit) writes what is queued.
+    """
+
+    def __init__(self, path, fsync=False, background=False):
+        self.path = path
+        self.fsync = fsync
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.next_id = 1
+        self._recover()
+        self.f = open(path, "ab", buffering=0)
+
+        self.outbox = None
+        self.thread = None
+        if background:
+            self.outbox = queue.Queue()
+            self.thread = threading.Thread(target=self._writer, daemon=True)
+            self.thread.start()
+            atexit.register(self.close)
+
+    def _recover(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER_SIZE:
+            with open(self.path, "wb") as f:
+                f.write(_header())
+            return
+
+        with open(self.path, "rb") as f:
+            if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+                raise ValueError(f"{self.path} is not a target journal")
+
+        records = read_journal(self.path, verify=False)
+        valid = len(records)
+
+        # Only the tail can be torn (append-only); drop it
+        ok = _crc_ok(records) if valid else np.zeros(0, dtype=bool)
+        while valid and not ok[valid - 1]:
+            valid -= 1
+
+        if valid:
+            self.next_id = int(records["id"][:valid].max()) + 1
+
+        size = HEADER_SIZE + valid * RECORD_SIZE
+        del records
+        if os.path.getsize(self.path) != size:
+            print(f"⚠️ Target journal: dropping torn tail of {self.path}")
+            os.truncate(self.path, size)
+
+    def append(self, lat, lon, alt, confidence, timestamp=None):
+        """
+        Writes one record, returns its id.
+        """
+        record = np.zeros(1, dtype=RECORD_DTYPE)
+        record["id"] = self.next_id
+        record["timestamp"] = time.time() if timestamp is None else timestamp
+        record["lat"] = lat
+        record["lon"] = lon
+        record["alt"] = alt
+        record["confidence"] = confidence
+        record["crc"] = zlib.crc32(record.tobytes()[:PAYLOAD_SIZE])
+
+        if self.outbox is not None:
+            self.outbox.put(record.tobytes())
+        else:
+            self._write(record.tobytes())
+
+        self.next_id += 1
+        return self.next_id - 1
+
+    def _write(self, data):
+        # One write() per record: either all 48 bytes land or the CRC says not
+        self.f.write(data)
+        if self.fsync:
+            os.fsync(self.f.fileno())
+
+    def _writer(self):
+        while True:
+            data = self.outbox.get()
+            if data is None:
+                return
+            try:
+                self._write(data)
+            except OSError as e:
+                print(f"⚠️ Target journal write failed: {e}")
+
+    def close(self):
+        if self.f.closed:
+            return
+        if self.thread is not None:
+            self.outbox.put(None)
+            self.thread.join(timeout=5.0)
+        self.f.close()
+
+
+# --------------------------------------------------
+# READERS
+# --------------------------------------------------
+def read_journal(path, verify=True):
+    """
+    Memory-mapped structured array of the whole records (zero-copy).
+    verify=True drops records failing the CRC (that returns a copy).
+    """
+    n = (os.path.getsize(path) - HEADER_SIZE) // RECORD_SIZE
+    if n <= 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(n,))
+    if verify:
+        return records[_crc_ok(records)]
+    return records
+
+
+class JournalTail:
+    """
+    Returns records appended since the previous read_new(). A bad record
+    at the end may still be being written, so it is retried next time;
+    bad records followed by good ones are torn for good and skipped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file_id = None
+        self.next_index = 0
+        self.torn = 0
+
+    def read_new(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+
+        # New journal file (or recovered shorter) -> start over
+        if (st.st_dev, st.st_ino) != self.file_id:
+            self.file_id = (st.st_dev, st.st_ino)
+            self.next_index = 0
+
+        n = max(0, (st.st_size - HEADER_SIZE) // RECORD_SIZE)
+        if n < self.next_index:
+            self.next_index = n
+        if n == self.next_index:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+
+        records = np.memmap(
+            self.path, dtype=RECORD_DTYPE, mode="r",
+            offset=HEADER_SIZE + self.next_index * RECORD_SIZE,
+            shape=(n - self.next_index,)
+        )
+        ok = _crc_ok(records)
+
+        # Hold back a bad tail, it may be a write in progress
+        end = len(ok)
+        while end and not ok[end - 1]:
+            end -= 1
+
+        torn = int(end - ok[:end].sum())
+        if torn:
+            self.torn += torn
+            print(f"⚠️ Target journal: skipped {torn} torn record(s)")
+
+        new = np.array(records[:end][ok[:end]])
+        self.next_index += end
+        return new
+
+
+def to_packets(records):
+    """
+    Structured records -> packet dicts (PacketHandler input).
+    """
+    return [
+        {name: record[name].item() for name in FIELDS}
+        for record in records
+    ]
+
+
+# --------------------------------------------------
+# CSV EXPORT
+# --------------------------------------------------
+def export_csv(journal_path, csv_path):
+    records = read_journal(journal_path)
+
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for r in records:
+            writer.writerow([
+                int(r["id"]),
+                f"{r['lat']:.7f}",
+                f"{r['lon']:.7f}",
+                f"{r['alt']:.2f}",
+                f"{r['confidence']:.2f}",
+                f"{r['timestamp']:.3f}"
+            ])
+
+    return len(records)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python target_journal.py JOURNAL [OUT.csv]")
+        sys.exit(1)
+
+    journal_path = sys.argv[1]
+    csv_path = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(journal_path)[0] + ".csv"
+
+    count = export_csv(journal_path, csv_path)
+    print(f"📁 Exported {count} targets to {csv_path}")
@@ -0,0 +1,284 @@
+# telemetry_recorder.py
+# Time-indexed vehicle state for geotagging frames at their capture time
+import math
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from geodesy import distance_m, offset
+
+BUFFER_SECONDS = 10.0
+MAX_RATE_HZ = 50          # DroneKit streams are usually 4-10 Hz
+
+# A frame is usually processed after the newest telemetry sample (4-10 Hz
+# streams): past the newest sample the state is extrapolated with the
+# velocity / body rates, at most this far
+EXTRAPOLATE_MAX_SEC = 0.5
+
+# Autopilot clock vs time.monotonic() drift allowance (s per s)
+CLOCK_DRIFT = 0.001
+
+UNKNOWN_HEADING = 65535   # GLOBAL_POSITION_INT.hdg when not available
+
+TelemetrySample = namedtuple("TelemetrySample", [
+    "time",                   # time.monotonic() the sample was evaluated at
+    "lat", "lon", "alt",      # global_frame (alt AMSL)
+    "rel_alt",                # global_relative_frame.alt
+    "roll", "pitch", "yaw",   # radians
+    "vn", "ve", "vd",         # m/s NED
+    "heading",                # degrees
+])
+
+
+class _Ring:
+    """
+    Fixed-size ring of (time, values) rows. Every row is written twice,
+    at i and i + size, so the last `size` rows are always one contiguous,
+    time-ordered slice and can be searched without copying.
+    """
+
+    def __init__(self, size, width, angle_cols=()):
+        self.size = size
+        self.times = np.zeros(2 * size)
+        self.values = np.zeros((2 * size, width))
+        self.angle_cols = angle_cols
+        self.count = 0
+        self.head = 0                  # next write position (0..size-1)
+        self.lock = threading.Lock()
+
+    def push(self, t, row):
+        with self.lock:
+            i = self.head
+            # Keep the ring time-ordered (messages can arrive out of order)
+            if self.count and t < self.times[(i - 1) % self.size]:
+                return
+            self.times[i] = self.times[i + self.size] = t
+            self.values[i] = self.values[i + self.size] = row
+            self.head = (i + 1) % self.size
+            self.count = min(self.count + 1, self.size)
+
+    def at(self, t):
+        """
+        (row, ahead): linear interpolation at time t, clamped to the
+        oldest / newest sample outside the buffered span, and how far t
+        is past the newest sample (0 inside the span). None if empty.
+        """
+        with self.lock:
+            if self.count == 0:
+                return None
+
+            start = self.head + self.size - self.count
+            times = self.times[start:self.head + self.size]
+            values = self.values[start:self.head + self.size]
+
+            j = int(np.searchsorted(times, t))
+
+            if j <= 0:
+                return values[0].copy(), 0.0
+            if j >= len(times):
+                return values[-1].copy(), max(0.0, t - times[-1])
+
+            # Copies: push() may overwrite these rows once the lock is released
+            t0, t1 = times[j - 1], times[j]
+            v0, v1 = values[j - 1].copy(), values[j].copy()
+
+        a = 0.0 if t1 <= t0 else (t - t0) / (t1 - t0)
+        delta = v1 - v0
+
+        # Angles: interpolate across the +-pi / 0-360 wrap the short way
+        for col, period in self.angle_cols:
+            delta[col] = (delta[col] + period / 2) % period - period / 2
+
+        return v0 + a * delta, 0.0
+
+
+class _BootClock:
+    """
+    Maps the autopilot's time_boot_ms to time.monotonic(), so samples are
+    stamped when they were measured, not when the message got through
+    the serial link. The offset follows the smallest link delay seen,
+    relaxed by CLOCK_DRIFT so clock drift can't pin it.
+    """
+
+    def __init__(self):
+        self.offset = None
+        self.last_boot = None
+        self.last_arrival = None
+        self.lock = threading.Lock()
+
+    def to_monotonic(self, time_boot_ms):
+        now = time.monotonic()
+        boot = time_boot_ms / 1000.0
+        sample = now - boot
+
+        with self.lock:
+            # First message, or the autopilot rebooted
+            if self.offset is None or boot < self.last_boot - 1.0:
+                self.offset = sample
+            else:
+                relaxed = self.offset + CLOCK_DRIFT * (now - self.last_arrival)
+                self.offset = min(sample, relaxed)
+            self.last_boot = boot
+            self.last_arrival = now
+            return boot + self.offset
+
+
+class TelemetryRecorder:
+    """
+    Records vehicle state from the GLOBAL_POSITION_INT and ATTITUDE
+    messages into preallocated ring buffers keyed by the time the
+    autopilot measured them (time_boot_ms mapped to time.monotonic()), so
+    the state at a frame's capture time can be looked up later with at(t).
+    """
+
+    def __init__(self, vehicle, buffer_seconds=BUFFER_SECONDS, max_rate_hz=MAX_RATE_HZ):
+        self.vehicle = vehicle
+        size = int(buffer_seconds * max_rate_hz)
+
+        # lat, lon, alt, rel_alt, vn, ve, vd, heading
+        self.position = _Ring(size, 8, angle_cols=[(7, 360.0)])
+        # roll, pitch, yaw, rollspeed, pitchspeed, yawspeed
+        self.attitude = _Ring(size, 6, angle_cols=[(2, 2 * math.pi)])
+        self.clock = _BootClock()
+
+        self.started = False
+
+    # --------------------------------------------------
+    # DRONEKIT LISTENERS
+    # --------------------------------------------------
+    def start(self):
+        if self.started:
+            return
+
+        self.vehicle.add_message_listener("GLOBAL_POSITION_INT", self._on_position)
+        self.vehicle.add_message_listener("ATTITUDE", self._on_attitude)
+        self.started = True
+
+    def stop(self):
+        if not self.started:
+            return
+
+        self.vehicle.remove_message_listener("GLOBAL_POSITION_INT", self._on_position)
+        self.vehicle.remove_message_listener("ATTITUDE", self._on_attitude)
+        self.started = False
+
+    def _on_position(self, _vehicle, _name, msg):
+        # No fix yet: the autopilot sends 0, 0
+        if msg.lat == 0 and msg.lon == 0:
+            return
+        t = self.clock.to_monotonic(msg.time_boot_ms)
+
+        # Unknown heading: hold the last one (0 before the first)
+        heading = msg.hdg / 100.0 if msg.hdg != UNKNOWN_HEADING else None
+        if heading is None:
+            last = self.position.at(t)
+            heading = last[0][7] if last is not None else 0.0
+
+        self.position.push(t, (
+            msg.lat / 1e7, msg.lon / 1e7, msg.alt / 1000.0,
+            msg.relative_alt / 1000.0,
+            msg.vx / 100.0, msg.vy / 100.0, msg.vz / 100.0,
+            heading,
+        ))
+
+    def _on_attitude(self, _vehicle, _name, msg):
+        t = self.clock.to_monotonic(msg.time_boot_ms)
+        self.attitude.push(t, (
+            msg.roll, msg.pitch, msg.yaw,
+            msg.rollspeed, msg.pitchspeed, msg.yawspeed,
+        ))
+
+    # --------------------------------------------------
+    # QUERY
+    # --------------------------------------------------
+    def at(self, t):
+        """
+        Vehicle state at monotonic time t (e.g. a frame's capture time):
+        interpolated between samples, extrapolated (up to
+        EXTRAPOLATE_MAX_SEC) past the newest one. Fields with no data
+        yet are None.
+        """
+        lat = lon = alt = rel_alt = vn = ve = vd = hdg = None
+        roll = pitch = yaw = None
+
+        att = self.attitude.at(t)
+        yaw_rate = 0.0
+        if att is not None:
+            row, ahead = att
+            dt = min(ahead, EXTRAPOLATE_MAX_SEC)
+            roll, pitch, yaw = row[:3] + row[3:] * dt
+            yaw_rate = row[5]
+            yaw = (yaw + math.pi) % (2 * math.pi) - math.pi
+
+        pos = self.position.at(t)
+        if pos is not None:
+            row, ahead = pos
+            dt = min(ahead, EXTRAPOLATE_MAX_SEC)
+            lat, lon, alt, rel_alt, vn, ve, vd, hdg = row
+            if dt > 0:
+                lat, lon = offset(lat, lon, vn * dt, ve * dt)
+                alt -= vd * dt
+                rel_alt -= vd * dt
+                hdg += math.degrees(yaw_rate) * dt
+            hdg = hdg % 360.0
+
+        return TelemetrySample(
+            t,
+            lat, lon, alt,
+            rel_alt,
+            roll, pitch, yaw,
+            vn, ve, vd,
+            hdg,
+        )
+
+    def ready(self):
+        return self.position.count > 0 and self.attitude.count > 0
+
+
+# --------------------------------------------------
+# SELF CHECK (python telemetry_recorder.py)
+# --------------------------------------------------
+def self_check():
+    """
+    Synthetic 5 Hz stream flying north-east at 2 m/s and turning: the
+    state 0.2 s past the newest sample must have moved on, and not past
+    EXTRAPOLATE_MAX_SEC.
+    """
+    from types import SimpleNamespace
+
+    rec = TelemetryRecorder(vehicle=None)
+    boot_ms = 100000
+    lat0, lon0 = 12.9716, 77.5946
+
+    for k in range(5):
+        ms = boot_ms + k * 200
+        lat, lon = offset(lat0, lon0, 0.4 * k, 0.4 * k)
+        rec._on_position(None, "GLOBAL_POSITION_INT", SimpleNamespace(
+            time_boot_ms=ms, lat=int(lat * 1e7), lon=int(lon * 1e7),
+            alt=920000, relative_alt=10000, vx=200, vy=200, vz=-50, hdg=4500,
+        ))
+        rec._on_attitude(None, "ATTITUDE", SimpleNamespace(
+            time_boot_ms=ms, roll=0.0, pitch=-0.1, yaw=0.785,
+            rollspeed=0.0, pitchspeed=0.0, yawspeed=0.1,
+        ))
+
+    t_last = rec.position.times[(rec.position.head - 1) % rec.position.size]
+    last = rec.at(t_last)
+    ahead = rec.at(t_last + 0.2)
+    far = rec.at(t_last + 10.0)
+
+    moved = distance_m(last.lat, last.lon, ahead.lat, ahead.lon)
+    capped = distance_m(last.lat, last.lon, far.lat, far.lon)
+    speed = math.hypot(2.0, 2.0)
+
+    assert abs(moved - speed * 0.2) < 0.01, moved
+    assert abs(capped - speed * EXTRAPOLATE_MAX_SEC) < 0.01, capped
+    assert ahead.rel_alt > last.rel_alt          # climbing (vd < 0)
+    assert ahead.yaw > last.yaw and ahead.heading > last.heading
+    print(f"✅ Extrapolation: {moved:.3f} m in 0.2 s, capped at {capped:.3f} m")
+
+
+if __name__ == "__main__":
+    self_check()
@@ -0,0 +1,50 @@
+# vehicle_wait.py
+import threading
+import time
+
+# Fallback wake-up so abort predicates that don't depend on a vehicle
+# attribute (and attributes DroneKit never notifies) are still seen
+WAIT_POLL_SEC = 0.5
+
+
+def wait_for(vehicle, attributes, condition, timeout=None, abort=None,
+             poll_interval=WAIT_POLL_SEC):
+    """
+    Blocks until condition() is True, waking as soon as any of the DroneKit
+    `attributes` (e.g. "location.global_relative_frame", "mode", "armed")
+    changes instead of sleep-polling.
+
+    Returns True when the condition is met, False on timeout (seconds) or
+    when abort() returns True.
+    """
+    changed = threading.Condition()
+
+    def _on_change(_vehicle, _name, _value):
+        with changed:
+            changed.notify_all()
+
+    for name in attributes:
+        vehicle.add_attribute_listener(name, _on_change)
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    try:
+        with changed:
+            while True:
+                if condition():
+                    return True
+
+                if abort is not None and abort():
+                    return False
+
+                wait_sec = poll_interval
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait_sec = min(wait_sec, remaining)
+
+                changed.wait(wait_sec)
+    finally:
+        for name in attributes:
+            vehicle.remove_attribute_listener(name, _on_change)
@@ -1,39 +1,412 @@
 import cv2
 import numpy as np
 
-def detect_yellow_and_centroid(frame):
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+from color_lut import BGRLookupTable
+
+# HSV range for yellow (field-tested range)
+LOWER_YELLOW = np.array([20, 100, 100], dtype=np.uint8)
+UPPER_YELLOW = np.array([35, 255, 255], dtype=np.uint8)
+
+MIN_AREA_PX = 500
+
+# ROI tracking (used by detect_tracked once the tracker is locked)
+ROI_HALF_SIZE_PX = 80        # window half size with a stationary target
+ROI_VELOCITY_GAIN = 3.0      # extra half size per px/frame of target motion
+FULL_SCAN_EVERY = 15         # force a full-frame scan every N tracked frames
+
+# Coarse-to-fine search (used by detect_pyramid)
+PYRAMID_SCALE = 4            # coarse pass runs at 1/4 (or 8) resolution
+MAX_CANDIDATES = 8           # more coarse blobs than this -> plain full frame
+
+# One row per target returned by blobs() / detect_all()
+BLOB_DTYPE = np.dtype([
+    ("cx", np.float32),          # sub-pixel centroid
+    ("cy", np.float32),
+    ("x", np.int32),             # bounding box
+    ("y", np.int32),
+    ("w", np.int32),
+    ("h", np.int32),
+    ("area", np.int32),          # pixel count
+    ("fill", np.float32),        # area / bbox area
+])
+
+
+class YellowDetector:
+    """
+    Stateful yellow detector. All intermediate images are allocated once
+    per frame shape and reused, so the steady-state loop does not allocate
+    (only findContours still returns fresh contour arrays).
+
+    The returned mask is an internal buffer: it is overwritten by the next
+    call, copy it if you need to keep it.
+    """
+
+    def __init__(self,
+                 min_area=MIN_AREA_PX,
+                 roi_half_size=ROI_HALF_SIZE_PX,
+                 roi_velocity_gain=ROI_VELOCITY_GAIN,
+                 full_scan_every=FULL_SCAN_EVERY,
+                 pyramid_scale=PYRAMID_SCALE,
+                 pyramid_search=False,
+                 use_lut=False):
+        self.min_area = min_area
+        self.pyramid_scale = pyramid_scale
+        self.pyramid_search = pyramid_search   # detect_tracked searches coarse-to-fine
+        self.roi_half_size = roi_half_size
+        self.roi_velocity_gain = roi_velocity_gain
+        self.full_scan_every = full_scan_every
+
+        self.lower_yellow = LOWER_YELLOW
+        self.upper_yellow = UPPER_YELLOW
+        self.kernel = np.ones((5, 5), np.uint8)
+
+        # Optional: classify BGR directly through a lookup table
+        self.lut = None
+        if use_lut:
+            self.lut = BGRLookupTable(self.lower_yellow, self.upper_yellow)
+
+        self.shape = None
+        self.hsv = None
+        self.mask = None
+        self.tmp = None
+        self.labels = None
+        self.small_bgr = None
+        self.small_hsv = None
+        self.small_mask = None
+        self.small_labels = None
+
+        self.centroid = None         # sub-pixel (x, y) of the last detection
+        self.candidates = []         # full-res windows of the last coarse pass
+
+        self.reset_tracking()
+
+    def _allocate(self, shape):
+        h, w = shape[:2]
+        if self.lut is not None:
+            self.hsv = BGRLookupTable.make_buffer(h, w)   # padded BGR scratch
+        else:
+            self.hsv = np.empty((h, w, 3), np.uint8)
+        self.mask = np.empty((h, w), np.uint8)
+        self.tmp = np.empty((h, w), np.uint8)
+        self.labels = np.empty((h, w), np.int32)
+
+        sh = max(1, h // self.pyramid_scale)
+        sw = max(1, w // self.pyramid_scale)
+        self.small_bgr = np.empty((sh, sw, 3), np.uint8)
+        if self.lut is not None:
+            self.small_hsv = BGRLookupTable.make_buffer(sh, sw)
+        else:
+            self.small_hsv = np.empty((sh, sw, 3), np.uint8)
+        self.small_mask = np.empty((sh, sw), np.uint8)
+        self.small_labels = np.empty((sh, sw), np.int32)
+
+        self.shape = shape
+
+    # --------------------------------------------------
+    # PIPELINE STAGES
+    # --------------------------------------------------
+    def _threshold(self, src, hsv, mask):
+        """
+        BGR -> raw yellow mask. `hsv` is the colour scratch buffer (padded
+        BGR instead of HSV when the lookup table is used).
+        """
+        if self.lut is not None:
+            self.lut.classify(src, hsv, mask)
+            return
+
+        cv2.cvtColor(src, cv2.COLOR_BGR2HSV, dst=hsv)
+        cv2.inRange(hsv, self.lower_yellow, self.upper_yellow, dst=mask)
+
+    def _segment(self, src, hsv, mask, tmp):
+        """
+        BGR -> binary yellow mask, written into `mask`.
+        All arguments may be views into the preallocated buffers.
+        """
+        self._threshold(src, hsv, mask)
+
+        # Remove noise
+        cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel, dst=tmp)
+        cv2.morphologyEx(tmp, cv2.MORPH_CLOSE, self.kernel, dst=mask)
+
+    def _largest_blob(self, mask, x0=0, y0=0):
+        """
+        Largest external contour in `mask` as (area, moments, x0, y0),
+        or None.
+        (x0, y0) is the offset of `mask` inside the full frame.
+        """
+        contours, _ = cv2.findContours(
+            mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+        )
+
+        if not contours:
+            return None
+
+        # Largest yellow area
+        largest = max(contours, key=cv2.contourArea)
+
+        return cv2.contourArea(largest), cv2.moments(largest), x0, y0
+
+    def _centroid(self, blob):
+        self.centroid = None
+
+        if blob is None:
+            return False, None, None
+
+        area, M, x0, y0 = blob
+
+        if area < self.min_area:
+            return False, None, None
+
+        if M["m00"] == 0:
+            return False, None, None
+
+        fx = M["m10"] / M["m00"] + x0
+        fy = M["m01"] / M["m00"] + y0
+        self.centroid = (fx, fy)
+
+        return True, int(fx), int(fy)
+
+    def _largest_centroid(self, mask, x0=0, y0=0):
+        return self._centroid(self._largest_blob(mask, x0, y0))
+
+    # --------------------------------------------------
+    # FULL-FRAME DETECTION
+    # --------------------------------------------------
+    def detect(self, frame):
+        if frame.shape != self.shape:
+            self._allocate(frame.shape)
 
-    # HSV range for yellow (field-tested range)
-    lower_yellow = np.array([20, 100, 100])
-    upper_yellow = np.array([35, 255, 255])
+        self._segment(frame, self.hsv, self.mask, self.tmp)
+        detected, cx, cy = self._largest_centroid(self.mask)
 
-    mask = cv2.inRange(hsv, lower_yellow, upper_yellow)
+        return detected, cx, cy, self.mask
 
-    # Remove noise
-    kernel = np.ones((5, 5), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+    # --------------------------------------------------
+    # MULTI-TARGET
+    # --------------------------------------------------
+    def blobs(self):
+        """
+        Every blob of at least min_area pixels in the mask from the last
+        detect*() call, as a BLOB_DTYPE array sorted by area (largest
+        first). No re-segmentation, so it is only full-frame after
+        detect() / detect_all(): after a detect_tracked() ROI pass only the
+        window is covered (typically just the tracked target), after a
+        pyramid pass only the candidate windows.
+        """
+        # Label only the box around the yellow pixels; much cheaper than
+        # labelling the whole frame when the targets are small
+        bx, by, bw, bh = cv2.boundingRect(self.mask)
+        if bw == 0 or bh == 0:
+            return np.empty(0, dtype=BLOB_DTYPE)
 
-    contours, _ = cv2.findContours(
-        mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
-    )
+        n, _, stats, centroids = cv2.connectedComponentsWithStats(
+            self.mask[by:by + bh, bx:bx + bw],
+            labels=self.labels[by:by + bh, bx:bx + bw],
+            connectivity=8,
+        )
 
-    if not contours:
-        return False, None, None, mask
+        stats = stats[1:]
+        centroids = centroids[1:]
+        keep = stats[:, cv2.CC_STAT_AREA] >= self.min_area
+        stats = stats[keep]
+        centroids = centroids[keep]
 
-    # Largest yellow area
-    largest = max(contours, key=cv2.contourArea)
+        out = np.empty(len(stats), dtype=BLOB_DTYPE)
+        out["cx"] = centroids[:, 0] + bx
+        out["cy"] = centroids[:, 1] + by
+        out["x"] = stats[:, cv2.CC_STAT_LEFT] + bx
+        out["y"] = stats[:, cv2.CC_STAT_TOP] + by
+        out["w"] = stats[:, cv2.CC_STAT_WIDTH]
+        out["h"] = stats[:, cv2.CC_STAT_HEIGHT]
+        out["area"] = stats[:, cv2.CC_STAT_AREA]
+        out["fill"] = out["area"] / (out["w"] * out["h"])
 
-    if cv2.contourArea(largest) < 500:
-        return False, None, None, mask
+        return out[np.argsort(-out["area"], kind="stable")]
 
-    M = cv2.moments(largest)
+    def detect_all(self, frame):
+        """
+        Full-frame segmentation, every target at once (see blobs()).
+        """
+        self.detect(frame)
+        return self.blobs()
 
-    if M["m00"] == 0:
-        return False, None, None, mask
+    # --------------------------------------------------
+    # ROI TRACKING
+    # --------------------------------------------------
+    def reset_tracking(self):
+        self.last_cx = None
+        self.last_cy = None
+        self.vel_x = 0.0             # px/frame, smoothed
+        self.vel_y = 0.0
+        self.frames_since_full = 0
+        self.roi = None              # (x0, y0, x1, y1) of the last ROI pass
 
-    cx = int(M["m10"] / M["m00"])
-    cy = int(M["m01"] / M["m00"])
+    def _roi_window(self, w, h):
+        pred_x = self.last_cx + self.vel_x
+        pred_y = self.last_cy + self.vel_y
 
-    return True, cx, cy, mask
+        half_x = self.roi_half_size + self.roi_velocity_gain * abs(self.vel_x)
+        half_y = self.roi_half_size + self.roi_velocity_gain * abs(self.vel_y)
+
+        x0 = max(0, int(pred_x - half_x))
+        y0 = max(0, int(pred_y - half_y))
+        x1 = min(w, int(pred_x + half_x) + 1)
+        y1 = min(h, int(pred_y + half_y) + 1)
+
+        return x0, y0, x1, y1
+
+    def _update_track(self, detected, cx, cy):
+        if not detected:
+            self.reset_tracking()
+            return
+
+        if self.last_cx is not None:
+            # Light smoothing so one noisy centroid doesn't blow up the window
+            self.vel_x = 0.5 * self.vel_x + 0.5 * (cx - self.last_cx)
+            self.vel_y = 0.5 * self.vel_y + 0.5 * (cy - self.last_cy)
+
+        self.last_cx = cx
+        self.last_cy = cy
+
+    def detect_tracked(self, frame, locked):
+        """
+        Same return value as detect().
+
+        While `locked` (pass the tracker's lock from the previous frame),
+        only a window around the predicted centroid is processed. The
+        window grows with the measured target velocity. A miss inside the
+        window falls back to a full-frame search on the same frame, and
+        every `full_scan_every` tracked frames a full scan is forced so new
+        targets are not missed. Outside the window the mask is zero, so a
+        following blobs() only sees targets inside the window.
+        With pyramid_search the full-frame searches use detect_pyramid().
+        """
+        if frame.shape != self.shape:
+            self._allocate(frame.shape)
+            self.reset_tracking()
+
+        use_roi = (
+            locked and
+            self.last_cx is not None and
+            self.frames_since_full < self.full_scan_every
+        )
+
+        if use_roi:
+            h, w = frame.shape[:2]
+            x0, y0, x1, y1 = self._roi_window(w, h)
+            self.roi = (x0, y0, x1, y1)
+
+            self.mask.fill(0)
+            self._segment(
+                frame[y0:y1, x0:x1],
+                self.hsv[y0:y1, x0:x1],
+                self.mask[y0:y1, x0:x1],
+                self.tmp[y0:y1, x0:x1],
+            )
+            detected, cx, cy = self._largest_centroid(
+                self.mask[y0:y1, x0:x1], x0, y0
+            )
+            self.frames_since_full += 1
+
+            if detected:
+                self._update_track(detected, cx, cy)
+                return True, cx, cy, self.mask
+
+            # Lost inside the window -> search the whole frame right away
+
+        if self.pyramid_search:
+            detected, cx, cy, mask = self.detect_pyramid(frame)
+        else:
+            detected, cx, cy, mask = self.detect(frame)
+        self.frames_since_full = 0
+        self.roi = None
+        self._update_track(detected, cx, cy)
+
+        return detected, cx, cy, mask
+
+    # --------------------------------------------------
+    # COARSE-TO-FINE (PYRAMID) DETECTION
+    # --------------------------------------------------
+    def detect_pyramid(self, frame):
+        """
+        Same return value as detect().
+
+        Thresholds a 1/pyramid_scale copy of the frame to find candidate
+        blobs, then runs the full-resolution pipeline only inside a padded
+        window around each candidate. Frames with no yellow stop after the
+        cheap coarse pass. Windows are padded so the morphology sees the
+        same neighbourhood as a full-frame pass; the centroid matches
+        detect() to within a pixel. Outside the windows the mask is zero.
+        """
+        if frame.shape != self.shape:
+            self._allocate(frame.shape)
+
+        h, w = frame.shape[:2]
+        s = self.pyramid_scale
+        sh, sw = self.small_mask.shape
+
+        # ---- Coarse pass ----
+        # Nearest-neighbour subsampling: INTER_AREA would cost about as much
+        # as the full-resolution HSV conversion we are trying to skip
+        cv2.resize(frame, (sw, sh), dst=self.small_bgr,
+                   interpolation=cv2.INTER_NEAREST)
+        self._threshold(self.small_bgr, self.small_hsv, self.small_mask)
+
+        self.mask.fill(0)
+        self.candidates = []
+
+        if cv2.countNonZero(self.small_mask) == 0:
+            return False, None, None, self.mask
+
+        n, _, stats, _ = cv2.connectedComponentsWithStats(
+            self.small_mask, labels=self.small_labels, connectivity=8
+        )
+
+        # Half the scaled-down area, as slack for subsampling the blob edges
+        min_small_area = 0.5 * self.min_area / (s * s)
+        stats = stats[1:]
+        stats = stats[stats[:, cv2.CC_STAT_AREA] >= min_small_area]
+
+        if len(stats) == 0:
+            return False, None, None, self.mask
+
+        if len(stats) > MAX_CANDIDATES:
+            # Cluttered frame, windows would cost more than they save
+            return self.detect(frame)
+
+        # ---- Fine pass ----
+        margin = 2 * s + self.kernel.shape[0]
+        best = None
+
+        for x, y, bw, bh, _ in stats:
+            x0 = max(0, x * s - margin)
+            y0 = max(0, y * s - margin)
+            x1 = min(w, (x + bw) * s + margin)
+            y1 = min(h, (y + bh) * s + margin)
+            self.candidates.append((x0, y0, x1, y1))
+
+            self._segment(
+                frame[y0:y1, x0:x1],
+                self.hsv[y0:y1, x0:x1],
+                self.mask[y0:y1, x0:x1],
+                self.tmp[y0:y1, x0:x1],
+            )
+            blob = self._largest_blob(self.mask[y0:y1, x0:x1], x0, y0)
+
+            if blob is not None and (best is None or blob[0] > best[0]):
+                best = blob
+
+        detected, cx, cy = self._centroid(best)
+
+        return detected, cx, cy, self.mask
+
+
+_default_detector = YellowDetector()
+
+
+def detect_yellow_and_centroid(frame):
+    """
+    Function-style API, kept for the existing main_* scripts.
+    Uses a shared YellowDetector, so the returned mask is reused too.
+    """
+    return _default_detector.detect(frame)
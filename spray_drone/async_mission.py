@@ -0,0 +1,308 @@
+# async_mission.py
+# asyncio runtime for MissionManager: the flight phases are coroutines, and
+# target ingestion, safety monitoring and telemetry run as concurrent tasks
+# on the same event loop, so they keep running during a navigation leg.
+import asyncio
+import time
+
+from dronekit import VehicleMode
+
+from spray_logger import log_spray
+from state_machine import DroneState
+from async_navigation import smart_takeoff, navigate_to_target, change_altitude
+from mission_manager import SAFE_TRAVEL_ALT, SPRAY_WORK_ALT
+
+from config import (
+    USE_VISION_ALIGN,
+    SPRAY_DURATION_SEC,
+    SPRAY_STABILIZE_SEC,
+    SPRAY_DRIP_SEC,
+    VISION_TIMEOUT_SEC,
+    FLIGHT_RECORDER_PERIOD_SEC
+)
+
+INGEST_PERIOD_SEC = 0.05
+SAFETY_PERIOD_SEC = 0.2
+TELEMETRY_PERIOD_SEC = 3.0
+RECORD_PERIOD_SEC = FLIGHT_RECORDER_PERIOD_SEC
+
+
+class AsyncMissionRuntime:
+    """
+    Runs a MissionManager's state machine on an asyncio event loop.
+    Reuses the manager's components and state (queue, StateMachine,
+    SprayController, SafetyChecks, CSV ingest, current_target), so the
+    transitions are exactly those of MissionManager.step().
+    """
+
+    def __init__(self, mission_manager):
+        self.mm = mission_manager
+        self.vehicle = mission_manager.vehicle
+        self.mission_task = None
+
+    # ==================================================
+    # ENTRY POINT
+    # ==================================================
+    async def run(self):
+        self.mm.safety_monitor.start()
+        self.mission_task = asyncio.create_task(self._mission())
+        side_tasks = [
+            asyncio.create_task(self._ingest()),
+            asyncio.create_task(self._safety()),
+            asyncio.create_task(self._telemetry()),
+            asyncio.create_task(self._record()),
+        ]
+
+        try:
+            try:
+                await self.mission_task
+            except asyncio.CancelledError:
+                # Cancelled by the safety task -> RTL below
+                pass
+
+            await self._rtl()
+        finally:
+            for task in side_tasks:
+                task.cancel()
+            await asyncio.gather(*side_tasks, return_exceptions=True)
+
+    # ==================================================
+    # CONCURRENT TASKS
+    # ==================================================
+    async def _ingest(self):
+        while True:
+            packets = None
+            if self.mm.csv_receiver:
+                # File I/O off the loop so a slow SD card can't stall the
+                # others; the queue itself is only touched on the loop
+                packets = await asyncio.to_thread(self.mm.csv_receiver.read_packets)
+
+            # Background sources: only a drain, their threads do the I/O
+            self.mm.ingest(packets)
+            await asyncio.sleep(INGEST_PERIOD_SEC)
+
+    async def _safety(self):
+        # SafetyMonitor does the checks on its own thread; this task only
+        # turns its fault into a cancellation of the mission task
+        while True:
+            if self.mm.safety_monitor.has_fault():
+                self._abort(self.mm.safety_monitor.fault)
+                return
+            await asyncio.sleep(SAFETY_PERIOD_SEC)
+
+    async def _telemetry(self):
+        while True:
+            alt = self.vehicle.location.global_relative_frame.alt
+            print(
+                f"📡 {self.mm.sm.get_state().name} | "
+                f"alt {alt if alt is not None else float('nan'):.1f}m | "
+                f"queue {self.mm.queue.size()} | "
+                f"mode {self.vehicle.mode.name}"
+            )
+            await asyncio.sleep(TELEMETRY_PERIOD_SEC)
+
+    async def _record(self):
+        # No step() here: sample at a fixed rate instead. step_ms / the
+        # loop_lag stage hold the event loop's lag (how late this task woke)
+        lag_ms = 0.0
+        while True:
+            self.mm.stats.record("loop_lag", lag_ms)
+            if self.mm.recorder:
+                try:
+                    self.mm.record_tick(self.mm.sm.get_state(), lag_ms)
+                except Exception as e:
+                    # Keep sampling: a dead task would stop recording for the flight
+                    print(f"⚠️ Flight recorder sample error: {e}")
+            wake = time.monotonic() + RECORD_PERIOD_SEC
+            await asyncio.sleep(RECORD_PERIOD_SEC)
+            lag_ms = (time.monotonic() - wake) * 1000
+
+    def _abort(self, reason):
+        self.mm._go_rtl(reason)
+        if self.mission_task is not None and not self.mission_task.done():
+            self.mission_task.cancel()
+
+    # ==================================================
+    # MISSION (STATE MACHINE)
+    # ==================================================
+    async def _mission(self):
+        mm = self.mm
+
+        while True:
+            state = mm.sm.get_state()
+
+            if state == DroneState.RTL:
+                return
+
+            # --- INIT ---
+            if state == DroneState.INIT:
+                mm.spray.setup()
+                if USE_VISION_ALIGN and mm.vision:
+                    await asyncio.to_thread(mm.vision.start)
+                mm.safety_monitor.start()
+                for source in mm.packet_sources:
+                    source.start()
+                mm.sm.set_state(DroneState.IDLE)
+
+            # --- IDLE ---
+            elif state == DroneState.IDLE:
+                if mm.queue.ready_for_mission():
+                    mm.sm.set_state(DroneState.ARM_TAKEOFF)
+                else:
+                    await asyncio.sleep(0.1)
+
+            # --- ARM & TAKEOFF ---
+            elif state == DroneState.ARM_TAKEOFF:
+                if not mm.takeoff_done:
+                    if not await smart_takeoff(self.vehicle, SAFE_TRAVEL_ALT):
+                        mm._go_rtl("Takeoff timed out")
+                        return
+                    mm.takeoff_done = True
+                    print("⏳ Stabilizing after takeoff...")
+                    await asyncio.sleep(2)
+                mm.sm.set_state(DroneState.NAVIGATE)
+
+            # --- NAVIGATE (High -> Low Logic) ---
+            elif state == DroneState.NAVIGATE:
+                await self._navigate()
+
+            # --- ALIGN ---
+            elif state == DroneState.ALIGN:
+                await self._align()
+
+            # --- SPRAY ---
+            elif state == DroneState.SPRAY:
+                await self._spray(SPRAY_DURATION_SEC)
+                mm.sm.set_state(DroneState.POST_SPRAY)
+
+            # --- POST SPRAY (Ascend Logic) ---
+            elif state == DroneState.POST_SPRAY:
+                if not await change_altitude(self.vehicle, SAFE_TRAVEL_ALT):
+                    mm._go_rtl("Climb after spray timed out")
+                    return
+
+                finished_target = mm.queue.mark_current_done("sprayed")
+                if finished_target:
+                    # Only queues the row, the log writer thread does the I/O
+                    log_spray(finished_target, SPRAY_DURATION_SEC, "sprayed")
+
+                mm.current_target = None
+                mm.sm.set_state(DroneState.NAVIGATE)
+
+    async def _navigate(self):
+        mm = self.mm
+
+        if mm.current_target is None:
+            mm.current_target = mm.queue.pop_next_target(
+                self.vehicle.location.global_relative_frame
+            )
+
+            if mm.current_target is None:
+                mm._handle_no_targets()
+                await asyncio.sleep(0.1)
+                return
+
+        arrived = await navigate_to_target(
+            self.vehicle,
+            mm.current_target["lat"],
+            mm.current_target["lon"],
+            SAFE_TRAVEL_ALT
+        )
+
+        if not arrived:
+            mm.current_target = None
+            return
+
+        if not await change_altitude(self.vehicle, SPRAY_WORK_ALT):
+            mm._go_rtl("Descent to spray altitude timed out")
+            return
+
+        if USE_VISION_ALIGN and mm.vision:
+            mm.vision.reset()
+            mm.safety_monitor.require_vision(True)
+            mm.sm.set_state(DroneState.ALIGN)
+        else:
+            mm.sm.set_state(DroneState.SPRAY)
+
+    async def _align(self):
+        mm = self.mm
+
+        if not (USE_VISION_ALIGN and mm.vision):
+            mm.safety_monitor.require_vision(False)
+            mm.sm.set_state(DroneState.SPRAY)
+            return
+
+        # Camera read + processing blocks, keep it off the loop
+        t_frame = time.perf_counter()
+        aligned, err_x, err_y = await asyncio.to_thread(mm.vision.process_frame)
+        mm.safety.update_vision_heartbeat()
+
+        time_since_sight = time.time() - mm.vision.last_seen_time
+        if time_since_sight > VISION_TIMEOUT_SEC:
+            print(f"⚠️ Target lost for {int(time_since_sight)}s. Giving up and Spraying.")
+            mm._send_velocity(0, 0)
+            mm.safety_monitor.require_vision(False)
+            mm.sm.set_state(DroneState.SPRAY)
+            return
+
+        if aligned:
+            print("✅ Target Aligned! Stopping and Spraying.")
+            mm._send_velocity(0, 0)
+            mm.safety_monitor.require_vision(False)
+            mm.sm.set_state(DroneState.SPRAY)
+
+        elif err_x is not None and err_y is not None:
+            K_p = 0.002
+            MAX_SPEED = 0.3
+
+            vel_x = max(min(-err_y * K_p, MAX_SPEED), -MAX_SPEED)
+            vel_y = max(min(err_x * K_p, MAX_SPEED), -MAX_SPEED)
+
+            print(f"   🎯 Aligning... Err: {err_x},{err_y}")
+            mm._send_velocity(vel_x, vel_y)
+            mm._record_align_latency(t_frame)
+
+        else:
+            mm._send_velocity(0, 0)
+            await asyncio.sleep(0.1)
+
+    async def _spray(self, duration_sec):
+        """
+        SprayController.spray_for without blocking the loop. Cancelling
+        the task always leaves the spray OFF.
+        """
+        spray = self.mm.spray
+
+        try:
+            print(f"⚖️  Stabilizing drone for {SPRAY_STABILIZE_SEC}s before spray...")
+            await asyncio.sleep(SPRAY_STABILIZE_SEC)
+
+            print("🏁 Stabilization complete. Starting spray.")
+            spray.spray_on()
+            await asyncio.sleep(duration_sec)
+        finally:
+            if spray.spraying:
+                spray.spray_off()
+
+        print(f"⏳ Waiting {SPRAY_DRIP_SEC}s for drips to clear...")
+        await asyncio.sleep(SPRAY_DRIP_SEC)
+        print("✅ Spray sequence complete. Ready to move.")
+
+    # ==================================================
+    # RTL
+    # ==================================================
+    async def _rtl(self):
+        if self.mm.sm.get_state() != DroneState.RTL:
+            self.mm._go_rtl("Mission ended")
+
+        if self.vehicle.mode.name != "RTL":
+            self.vehicle.mode = VehicleMode("RTL")
+
+        if self.mm.spray.spraying:
+            self.mm.spray.spray_off()
+
+        # Keep ingest/safety/telemetry running until the drone has landed
+        while self.vehicle.armed:
+            await asyncio.sleep(0.5)
+
+        print("✅ Drone has landed safely (RTL Complete).")
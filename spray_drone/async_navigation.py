@@ -0,0 +1,180 @@
+# async_navigation.py
+# Coroutine versions of navigation.py for the asyncio mission runtime.
+# They never block the event loop, and are aborted by cancelling the task.
+import asyncio
+import time
+
+from dronekit import VehicleMode, LocationGlobalRelative
+
+from navigation import distance_to_target_meters
+from vehicle_wait import WAIT_POLL_SEC
+from config import (
+    MODE_CHANGE_TIMEOUT_SEC,
+    TAKEOFF_TIMEOUT_SEC,
+    ALTITUDE_CHANGE_TIMEOUT_SEC
+)
+
+
+async def wait_for_async(vehicle, attributes, condition, timeout=None,
+                         poll_interval=WAIT_POLL_SEC):
+    """
+    Awaits condition() becoming True, woken by DroneKit attribute listeners
+    (which run on DroneKit's thread) through the event loop.
+    Returns True when met, False on timeout.
+    """
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+
+    def _on_change(_vehicle, _name, _value):
+        loop.call_soon_threadsafe(changed.set)
+
+    for name in attributes:
+        vehicle.add_attribute_listener(name, _on_change)
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    try:
+        while True:
+            changed.clear()
+
+            if condition():
+                return True
+
+            wait_sec = poll_interval
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait_sec = min(wait_sec, remaining)
+
+            try:
+                await asyncio.wait_for(changed.wait(), wait_sec)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        for name in attributes:
+            vehicle.remove_attribute_listener(name, _on_change)
+
+
+# --------------------------------------------------
+# SMART TAKEOFF (Handles Ground & Mid-Air)
+# --------------------------------------------------
+async def smart_takeoff(vehicle, target_altitude, timeout=TAKEOFF_TIMEOUT_SEC):
+    """
+    Returns False if GUIDED, arming or the climb timed out.
+    Waiting to become armable (on the ground) has no timeout.
+    """
+    if not vehicle.armed:
+        print("⏳ Waiting for vehicle to become armable...")
+        await wait_for_async(vehicle, ["gps_0", "ekf_ok", "system_status", "mode"],
+                             lambda: vehicle.is_armable)
+
+        vehicle.mode = VehicleMode("GUIDED")
+        print("⏳ Waiting for GUIDED mode...")
+        if not await wait_for_async(vehicle, ["mode"], lambda: vehicle.mode.name == "GUIDED",
+                                    timeout=MODE_CHANGE_TIMEOUT_SEC):
+            print("❌ GUIDED mode not confirmed")
+            return False
+
+        vehicle.armed = True
+        print("⏳ Arming...")
+        if not await wait_for_async(vehicle, ["armed"], lambda: vehicle.armed,
+                                    timeout=MODE_CHANGE_TIMEOUT_SEC):
+            print("❌ Arming not confirmed")
+            return False
+
+    print("🐌 Setting safe groundspeed to 1.0 m/s...")
+    vehicle.groundspeed = 1.0
+
+    current_alt = vehicle.location.global_relative_frame.alt
+
+    if current_alt < 1.0:
+        print(f"🚀 Taking off to {target_altitude}m...")
+        vehicle.simple_takeoff(target_altitude)
+    else:
+        print(f"🚀 Already airborne ({current_alt:.1f}m). Adjusting to {target_altitude}m...")
+        current_loc = vehicle.location.global_relative_frame
+        vehicle.simple_goto(
+            LocationGlobalRelative(current_loc.lat, current_loc.lon, target_altitude)
+        )
+
+    reached = await wait_for_async(
+        vehicle, ["location.global_relative_frame"],
+        lambda: vehicle.location.global_relative_frame.alt >= target_altitude * 0.95,
+        timeout=timeout
+    )
+    if reached:
+        print(f"✅ Reached Safe Altitude: {vehicle.location.global_relative_frame.alt:.1f}m")
+    else:
+        print(f"❌ Takeoff to {target_altitude}m timed out after {timeout:.0f}s")
+    return reached
+
+
+# --------------------------------------------------
+# NAVIGATION (Slow & Safe)
+# --------------------------------------------------
+async def navigate_to_target(vehicle, lat, lon, alt):
+    """
+    Same behaviour as navigate_to_target_blocking.
+    Returns False on manual takeover.
+    """
+    print(f"🧭 NAVIGATING to target at {alt}m altitude...")
+
+    vehicle.groundspeed = 1.0
+    target_loc = LocationGlobalRelative(float(lat), float(lon), float(alt))
+    vehicle.simple_goto(target_loc)
+
+    def arrived():
+        dist = distance_to_target_meters(vehicle.location.global_relative_frame, target_loc)
+        return dist < 1.0 and vehicle.groundspeed < 0.2
+
+    def arrived_or_manual():
+        return arrived() or vehicle.mode.name not in ['GUIDED', 'AUTO']
+
+    while True:
+        await wait_for_async(
+            vehicle, ["location.global_relative_frame", "groundspeed", "mode"],
+            arrived_or_manual, timeout=3.0
+        )
+
+        if vehicle.mode.name not in ['GUIDED', 'AUTO']:
+            print("⚠️ Manual Control Detected! Stopping Navigation.")
+            return False
+
+        if arrived():
+            print(f"✅ Arrived at Target: {lat}, {lon} (Speed: {vehicle.groundspeed:.2f} m/s)")
+            return True
+
+        dist = distance_to_target_meters(vehicle.location.global_relative_frame, target_loc)
+        print(f"   ... Distance to target: {dist:.1f}m")
+
+        # Resend command to correct drift & enforce speed
+        vehicle.groundspeed = 1.0
+        vehicle.simple_goto(target_loc)
+
+
+# --------------------------------------------------
+# CHANGE ALTITUDE (Vertical Only)
+# --------------------------------------------------
+async def change_altitude(vehicle, new_alt, timeout=ALTITUDE_CHANGE_TIMEOUT_SEC):
+    """
+    Returns False if the altitude wasn't reached within timeout.
+    """
+    current_loc = vehicle.location.global_relative_frame
+    direction = "Ascending" if new_alt > current_loc.alt else "Descending"
+    print(f"↕️  {direction} to {new_alt}m...")
+
+    vehicle.simple_goto(
+        LocationGlobalRelative(current_loc.lat, current_loc.lon, float(new_alt))
+    )
+
+    reached = await wait_for_async(
+        vehicle, ["location.global_relative_frame"],
+        lambda: abs(vehicle.location.global_relative_frame.alt - new_alt) < 0.3,
+        timeout=timeout
+    )
+    if reached:
+        print(f"✅ Reached Altitude: {new_alt}m")
+    else:
+        print(f"❌ Altitude change to {new_alt}m timed out after {timeout:.0f}s")
+    return reached
@@ -0,0 +1,103 @@
+# bench_queue.py
+# Startup ingestion benchmark for QueueManager.add_packet (no drone needed).
+# Usage: python bench_queue.py [N_TARGETS]
+import contextlib
+import math
+import os
+import random
+import sys
+import time
+
+from geodesy import LocalFrame, offset
+from queue_manager import QueueManager
+from config import MIN_DISTANCE_BETWEEN_TARGETS_M
+
+FIELD_LAT = 12.9716
+FIELD_LON = 77.5946
+FIELD_SIZE_M = 2000.0
+
+# Fraction of points that are a re-detection of an earlier one
+# (multi-pass surveys), scattered within the duplicate radius
+DUPLICATE_FRACTION = 0.3
+
+# Linear-scan reference is O(n^2), only run it on a prefix
+LEGACY_MAX_N = 5000
+
+
+def synthetic_packets(n, seed=0):
+    rng = random.Random(seed)
+    frame = LocalFrame(FIELD_LAT, FIELD_LON)
+
+    packets = []
+    for i in range(n):
+        if packets and rng.random() < DUPLICATE_FRACTION:
+            base = rng.choice(packets)
+            r = rng.random() * MIN_DISTANCE_BETWEEN_TARGETS_M * 0.9
+            a = rng.random() * 2 * math.pi
+            lat, lon = offset(base["lat"], base["lon"], r * math.sin(a), r * math.cos(a))
+        else:
+            lat, lon = frame.to_latlon(rng.random() * FIELD_SIZE_M, rng.random() * FIELD_SIZE_M)
+
+        packets.append({
+            "id": i, "lat": lat, "lon": lon, "alt": 0.0,
+            "confidence": 1.0, "timestamp": time.time()
+        })
+
+    return packets
+
+
+class LegacyQueueManager(QueueManager):
+    """
+    Previous add_packet: linear distance scan over the pending queue.
+    """
+
+    def add_packet(self, packet):
+        if packet["id"] in self.seen_ids:
+            return False
+
+        for existing in self.queue:
+            # Old flat-scale distance, as add_packet computed it then
+            dlat = existing["lat"] - packet["lat"]
+            dlon = existing["lon"] - packet["lon"]
+            dist = math.sqrt((dlat * 1.113195e5) ** 2 + (dlon * 1.113195e5) ** 2)
+            if dist < MIN_DISTANCE_BETWEEN_TARGETS_M:
+                return False
+
+        self.queue.append(packet)
+        self.seen_ids.add(packet["id"])
+        return True
+
+
+def ingest(manager, packets):
+    accepted = 0
+    t0 = time.perf_counter()
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for i, packet in enumerate(packets, 1):
+            if manager.add_packet(dict(packet)):
+                accepted += 1
+            if i % (len(packets) // 4 or 1) == 0:
+                elapsed = time.perf_counter() - t0
+                print(f"   {i:>7} packets  {elapsed:7.2f}s", file=sys.stderr)
+
+    return accepted, time.perf_counter() - t0
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    packets = synthetic_packets(n)
+
+    print(f"📦 {n} synthetic targets, {DUPLICATE_FRACTION:.0%} near-duplicates")
+
+    print("🔹 Spatial grid")
+    accepted, elapsed = ingest(QueueManager(), packets)
+    print(f"   accepted {accepted}  |  {elapsed:.2f}s  |  {elapsed / n * 1e6:.1f} us/packet")
+
+    legacy_n = min(n, LEGACY_MAX_N)
+    print(f"🔸 Linear scan (first {legacy_n})")
+    accepted, elapsed = ingest(LegacyQueueManager(), packets[:legacy_n])
+    print(f"   accepted {accepted}  |  {elapsed:.2f}s  |  {elapsed / legacy_n * 1e6:.1f} us/packet")
+
+
+if __name__ == "__main__":
+    main()
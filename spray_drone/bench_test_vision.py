@@ -3,7 +3,8 @@
 
 import dronekit_py311_fix
 import time
-from dronekit import connect, VehicleMode
+from dronekit import VehicleMode
+from vehicle_connect import connect_vehicle
 from vision_align import VisionAlign
 from navigation import send_body_velocity
 
@@ -14,8 +15,7 @@ BAUD = 57600
 def bench_test():
     print("🔌 Connecting to vehicle (BENCH MODE)...")
     try:
-        vehicle = connect(CONNECTION_STRING, baud=BAUD, wait_ready=True)
-        print("✅ Vehicle connected")
+        vehicle = connect_vehicle(CONNECTION_STRING, baud=BAUD, ready_attrs=("mode",))
     except:
         print("❌ Could not connect! Check USB cable.")
         return
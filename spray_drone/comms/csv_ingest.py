@@ -0,0 +1,167 @@
+# comms/csv_ingest.py
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import threading
+import time
+
+from csv_tail import CSVTail
+
+# inotify event mask for the CSV's directory: appends, and the file being
+# created / replaced / removed
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# Re-check the file at least this often even with inotify (missed events,
+# directory created later). Also the stat poll period without inotify.
+RESCAN_SEC = 1.0
+STAT_POLL_SEC = 0.1
+
+
+def _open_inotify(directory):
+    """
+    inotify fd watching directory, or None when inotify isn't available
+    (non-Linux, no libc symbol, directory missing).
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+class CSVIngestService:
+    """
+    Watches the survey CSV on a background thread (inotify, or a stat()
+    poll where inotify isn't available), parses and validates new rows
+    there, and hands the clean packets over through a thread-safe queue.
+
+    The mission loop only calls drain_into(queue_manager), so no file I/O
+    or parsing happens on the flight-control path, and QueueManager is
+    still only touched from the mission thread.
+    """
+
+    def __init__(self, csv_path, packet_handler, read_existing=True):
+        self.csv_path = csv_path
+        self.packet_handler = packet_handler
+
+        self.tail = CSVTail(csv_path)
+        if not read_existing:
+            # Ignore existing rows, read only future rows
+            self.tail.skip_existing()
+
+        self.ready = queue.Queue()   # validated packets
+        self.running = False
+        self.thread = None
+
+    # --------------------------------------------------
+    # START / STOP
+    # --------------------------------------------------
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=RESCAN_SEC + 1.0)
+            self.thread = None
+
+    # --------------------------------------------------
+    # MISSION-SIDE HANDOFF
+    # --------------------------------------------------
+    def drain_into(self, queue_manager):
+        """
+        Adds every packet validated so far to queue_manager.
+        Returns how many were taken. Never blocks.
+        """
+        count = 0
+        while True:
+            try:
+                packet = self.ready.get_nowait()
+            except queue.Empty:
+                return count
+            queue_manager.add_packet(packet)
+            count += 1
+
+    # --------------------------------------------------
+    # WATCHER THREAD
+    # --------------------------------------------------
+    def _loop(self):
+        fd = _open_inotify(os.path.dirname(self.csv_path) or ".")
+        if fd is None:
+            print("⚠️ inotify unavailable, polling CSV with stat()")
+        else:
+            print(f"👀 Watching {self.csv_path} (inotify)")
+
+        try:
+            while self.running:
+                self._read_new_rows()
+
+                if fd is None:
+                    time.sleep(STAT_POLL_SEC)
+                    continue
+
+                readable, _, _ = select.select([fd], [], [], RESCAN_SEC)
+                if readable:
+                    # Contents don't matter, CSVTail works out what changed
+                    try:
+                        while os.read(fd, 4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def _read_new_rows(self):
+        try:
+            for row in self.tail.read_rows():
+                raw_packet = _row_to_packet(row)
+                if raw_packet is None:
+                    continue
+
+                clean_packet = self.packet_handler.validate(raw_packet)
+                if clean_packet:
+                    self.ready.put(clean_packet)
+
+        except Exception as e:
+            # Never kill the watcher due to CSV issues
+            print(f"⚠️ CSV read error: {e}")
+
+
+def _row_to_packet(row):
+    """
+    CSV row dict -> raw packet dict (PacketHandler does the type checks).
+    Returns None if row is malformed.
+    """
+    try:
+        return {
+            "id": row["id"],
+            "lat": row["lat"],
+            "lon": row["lon"],
+            "alt": row["alt"],
+            "confidence": row["confidence"],
+            "timestamp": row["timestamp"]
+        }
+    except KeyError:
+        return None
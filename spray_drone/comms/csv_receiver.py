@@ -1,6 +1,5 @@
 # comms/csv_receiver.py
-import csv
-import os
+from csv_tail import CSVTail
 
 
 class CSVReceiver:
@@ -9,7 +8,8 @@ class CSVReceiver:
         self.packet_handler = packet_handler
         self.queue_manager = queue_manager
 
-        self.last_line_read = 0
+        # Reads only what was appended since the previous poll
+        self.tail = CSVTail(csv_path)
 
     # --------------------------------------------------
     # POLL CSV FOR NEW ENTRIES (NON-BLOCKING)
@@ -19,35 +19,35 @@ class CSVReceiver:
         Reads new rows from CSV file and pushes valid packets into queue.
         This function is SAFE to call repeatedly in main loop.
         """
+        for clean_packet in self.read_packets():
+            self.queue_manager.add_packet(clean_packet)
 
-        if not os.path.exists(self.csv_path):
-            return  # CSV not yet created
+    def read_packets(self):
+        """
+        Reads and validates new rows without touching the queue, so it can
+        run on a worker thread (the caller adds the packets on its own).
+        """
+        packets = []
 
         try:
-            with open(self.csv_path, newline='') as csvfile:
-                reader = csv.DictReader(csvfile)
-                rows = list(reader)
-
-                # Process only new rows
-                new_rows = rows[self.last_line_read:]
+            # [] when the CSV doesn't exist yet or nothing was appended
+            for row in self.tail.read_rows():
+                raw_packet = self._row_to_packet(row)
 
-                for row in new_rows:
-                    raw_packet = self._row_to_packet(row)
+                if raw_packet is None:
+                    continue
 
-                    if raw_packet is None:
-                        continue
+                clean_packet = self.packet_handler.validate(raw_packet)
 
-                    clean_packet = self.packet_handler.validate(raw_packet)
-
-                    if clean_packet:
-                        self.queue_manager.add_packet(clean_packet)
-
-                self.last_line_read = len(rows)
+                if clean_packet:
+                    packets.append(clean_packet)
 
         except Exception as e:
             # Never crash mission due to CSV issues
             print(f"⚠️ CSV read error: {e}")
 
+        return packets
+
     # --------------------------------------------------
     # CONVERT CSV ROW TO RAW PACKET
     # --------------------------------------------------
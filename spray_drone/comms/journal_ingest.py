@@ -0,0 +1,78 @@
+# comms/journal_ingest.py
+import queue
+import threading
+import time
+
+from target_journal import JournalTail, to_packets
+
+POLL_SEC = 0.1
+
+
+class JournalIngestService:
+    """
+    Follows the survey's binary target journal (target_journal.py) on a
+    background thread. New records are memory-mapped, CRC-checked and
+    validated there; nothing is parsed from text. Clean packets are handed
+    over through a queue that the mission loop drains, like
+    CSVIngestService.
+    """
+
+    def __init__(self, journal_path, packet_handler):
+        self.journal_path = journal_path
+        self.packet_handler = packet_handler
+
+        self.tail = JournalTail(journal_path)
+        self.ready = queue.Queue()   # validated packets
+
+        self.running = False
+        self.thread = None
+
+    # --------------------------------------------------
+    # START / STOP
+    # --------------------------------------------------
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    # --------------------------------------------------
+    # MISSION-SIDE HANDOFF
+    # --------------------------------------------------
+    def drain_into(self, queue_manager):
+        """
+        Adds every packet validated so far to queue_manager.
+        Returns how many were taken. Never blocks.
+        """
+        count = 0
+        while True:
+            try:
+                packet = self.ready.get_nowait()
+            except queue.Empty:
+                return count
+            queue_manager.add_packet(packet)
+            count += 1
+
+    # --------------------------------------------------
+    # WATCHER THREAD
+    # --------------------------------------------------
+    def _loop(self):
+        while self.running:
+            try:
+                # Only a stat() when nothing was appended
+                for raw_packet in to_packets(self.tail.read_new()):
+                    clean_packet = self.packet_handler.validate(raw_packet)
+                    if clean_packet:
+                        self.ready.put(clean_packet)
+            except Exception as e:
+                # Never kill the watcher due to journal issues
+                print(f"⚠️ Journal read error: {e}")
+
+            time.sleep(POLL_SEC)
@@ -0,0 +1,148 @@
+# comms/udp_receiver.py
+# Spray side of the UDP detection link (see detection_protocol.py).
+import collections
+import queue
+import socket
+import threading
+
+from detection_protocol import (
+    decode,
+    encode_ack,
+    TYPE_DATA,
+    DEFAULT_PORT
+)
+
+# Sequence numbers remembered per sender, to drop retransmitted
+# datagrams whose ack was lost
+SEEN_SEQ_HISTORY = 4096
+
+
+class DetectionReceiver:
+    """
+    Receives detection datagrams on a background thread, acknowledges
+    each one, validates the records with PacketHandler and hands clean
+    packets over through a thread-safe queue. The mission loop only calls
+    drain_into(queue_manager), same as CSVIngestService.
+    """
+
+    def __init__(self, packet_handler, port=DEFAULT_PORT, bind_host="0.0.0.0"):
+        self.packet_handler = packet_handler
+        self.address = (bind_host, port)
+
+        self.ready = queue.Queue()   # validated packets
+        self.seen = {}               # sender addr -> (set, deque) of seqs
+
+        self.sock = None
+        self.running = False
+        self.thread = None
+
+    # --------------------------------------------------
+    # START / STOP
+    # --------------------------------------------------
+    def start(self):
+        if self.running:
+            return
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(self.address)
+        self.sock.settimeout(0.5)
+
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        print(f"📡 Detection link listening on UDP {self.address[1]}")
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    # --------------------------------------------------
+    # MISSION-SIDE HANDOFF
+    # --------------------------------------------------
+    def drain_into(self, queue_manager):
+        """
+        Adds every packet validated so far to queue_manager.
+        Returns how many were taken. Never blocks.
+        """
+        count = 0
+        while True:
+            try:
+                packet = self.ready.get_nowait()
+            except queue.Empty:
+                return count
+            queue_manager.add_packet(packet)
+            count += 1
+
+    # --------------------------------------------------
+    # RECEIVER THREAD
+    # --------------------------------------------------
+    def _loop(self):
+        while self.running:
+            try:
+                datagram, addr = self.sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                print(f"⚠️ Detection link receive error: {e}")
+                continue
+
+            msg = decode(datagram)
+            if msg is None or msg[0] != TYPE_DATA:
+                continue
+            _msg_type, seq, detections = msg
+
+            # Always ack, also repeats: the previous ack may have been lost
+            try:
+                self.sock.sendto(encode_ack(seq), addr)
+            except OSError as e:
+                print(f"⚠️ Detection link ack failed: {e}")
+
+            if self._already_seen(addr, seq):
+                continue
+
+            for raw_packet in detections:
+                clean_packet = self.packet_handler.validate(raw_packet)
+                if clean_packet:
+                    self.ready.put(clean_packet)
+
+    def _already_seen(self, addr, seq):
+        seqs, order = self.seen.setdefault(addr, (set(), collections.deque()))
+        if seq in seqs:
+            return True
+
+        seqs.add(seq)
+        order.append(seq)
+        if len(order) > SEEN_SEQ_HISTORY:
+            seqs.discard(order.popleft())
+        return False
+
+
+# --------------------------------------------------
+# LOCALHOST TEST: python -m comms.udp_receiver  (from spray_drone/)
+# --------------------------------------------------
+if __name__ == "__main__":
+    import time
+
+    from packet_handler import PacketHandler
+
+    class _PrintQueue:
+        def add_packet(self, packet):
+            age_ms = (time.time() - packet["timestamp"]) * 1000
+            print(f"📥 id={packet['id']} {packet['lat']:.7f}, {packet['lon']:.7f} ({age_ms:.1f} ms old)")
+
+    receiver = DetectionReceiver(PacketHandler())
+    receiver.start()
+    sink = _PrintQueue()
+
+    try:
+        while True:
+            receiver.drain_into(sink)
+            time.sleep(0.05)
+    except KeyboardInterrupt:
+        receiver.stop()
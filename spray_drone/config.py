@@ -8,6 +8,41 @@ SPRAY_GPIO_PIN = 18
 # Spray duration per target (seconds)
 SPRAY_DURATION_SEC = 2.0
 
+# Hover before spraying (water settles) and after (nozzle stops dripping)
+SPRAY_STABILIZE_SEC = 3.0
+SPRAY_DRIP_SEC = 3.0
+
+
+# ================================
+# LOGGING
+# ================================
+
+# Log rows are written by a background thread and flushed every N rows
+# or T seconds, whichever comes first (and always on shutdown)
+LOG_FLUSH_EVERY_ROWS = 1
+LOG_FLUSH_INTERVAL_SEC = 0.5
+
+# fsync on every flush: survives power loss, costs SD card time
+# (on the writer thread, not the mission loop)
+LOG_FSYNC = True
+
+
+# ================================
+# FLIGHT RECORDER
+# ================================
+
+# Binary per-step record of vehicle state, mission state, commands and
+# timings (flight_recorder.py). Read with: python flight_recorder.py DIR
+ENABLE_FLIGHT_RECORDER = True
+FLIGHT_RECORDER_DIR = "/home/pi/logs/flight"
+
+# Records are sampled at this fixed rate (a blocking phase can take a
+# whole navigation leg, so one record per step would miss it)
+FLIGHT_RECORDER_PERIOD_SEC = 0.1
+
+# Per-stage latency stats on http://127.0.0.1:<port>/ (None = off)
+STATS_HTTP_PORT = 8765
+
 
 # ================================
 # VISION CONFIG (OPTIONAL)
@@ -36,9 +71,19 @@ MIN_BATTERY_VOLTAGE = 10.0
 MAX_ROLL_DEG = 3.0
 MAX_PITCH_DEG = 3.0
 
+# Maximum allowed tilt outside SPRAY (cruising into wind, accelerating,
+# alignment nudges)
+MAX_FLIGHT_TILT_DEG = 25.0
+
 # Maximum allowed altitude (meters)
 MAX_ALTITUDE_M = 10.0
 
+# Safety monitor thread rate (seconds between checks)
+SAFETY_MONITOR_PERIOD_SEC = 0.1
+
+# Tilt must stay over the limit this long before it is a fault (seconds)
+ATTITUDE_GRACE_SEC = 2.0
+
 
 # ================================
 # CSV INPUT
@@ -48,6 +93,23 @@ CSV_INPUT_PATH = "/home/pi/survey_outputs/yellow_targets.csv"
 # Read existing CSV rows at startup (for testing / manual GPS)
 CSV_READ_EXISTING = True
 
+# Watch the CSV on a background thread (inotify) and only hand validated
+# packets to the mission loop. False = poll the CSV from the mission loop.
+CSV_INGEST_THREAD = True
+
+# Survey's binary target journal (target_journal.py). When set, it is read
+# INSTEAD of CSV_INPUT_PATH: no text parsing, torn records skipped.
+JOURNAL_INPUT_PATH = None     # e.g. "/home/pi/survey_outputs/survey_targets.jrn"
+
+
+# ================================
+# UDP DETECTION LINK
+# ================================
+# Receive targets straight from the survey drone (detection_protocol.py),
+# in addition to the CSV
+USE_UDP_DETECTIONS = False
+UDP_DETECTION_PORT = 14600
+
 
 # ================================
 # PACKET VALIDATION
@@ -70,6 +132,10 @@ MIN_BATCH_POINTS = 1
 # Minimum distance between two spray targets (meters)
 MIN_DISTANCE_BETWEEN_TARGETS_M = 1.0
 
+# Visit pending targets in a short route from the drone's position
+# (nearest neighbour + 2-opt) instead of CSV arrival order
+ROUTE_OPTIMIZATION = True
+
 
 # ================================
 # MISSION TUNING
@@ -83,3 +149,12 @@ GPS_GRACE_SEC = 10.0
 
 # Hover time after last target before RTL (seconds)
 NO_TARGET_HOVER_SEC = 10.0
+
+# Async runtime: give up (RTL) if these phases take longer (seconds)
+MODE_CHANGE_TIMEOUT_SEC = 10.0
+TAKEOFF_TIMEOUT_SEC = 60.0
+ALTITUDE_CHANGE_TIMEOUT_SEC = 30.0
+
+# Run the mission on the asyncio runtime (async_mission.py) instead of the
+# blocking MissionManager.step() loop
+USE_ASYNC_RUNTIME = False
@@ -1,6 +1,5 @@
 # comms/csv_receiver.py
-import csv
-import os
+from csv_tail import CSVTail
 from config import CSV_READ_EXISTING
 
 
@@ -10,12 +9,12 @@ class CSVReceiver:
         self.packet_handler = packet_handler
         self.queue_manager = queue_manager
 
-        if CSV_READ_EXISTING:
-            # Read from beginning (existing + new rows)
-            self.last_line_read = 0
-        else:
+        # Reads only what was appended since the previous poll
+        self.tail = CSVTail(csv_path)
+
+        if not CSV_READ_EXISTING:
             # Ignore existing rows, read only future rows
-            self.last_line_read = self._count_existing_rows()
+            self.tail.skip_existing()
 
     # --------------------------------------------------
     # POLL CSV FOR NEW ENTRIES (NON-BLOCKING)
@@ -26,32 +25,21 @@ class CSVReceiver:
         This function is SAFE to call repeatedly in main loop.
         """
 
-        if not os.path.exists(self.csv_path):
-            return  # CSV not yet created
-
         try:
-            with open(self.csv_path, newline='') as csvfile:
-                reader = csv.DictReader(csvfile)
-                rows = list(reader)
-
-                # Process only new rows
-                new_rows = rows[self.last_line_read:]
+            # [] when the CSV doesn't exist yet or nothing was appended
+            for row in self.tail.read_rows():
+                print("📄 CSV row read:", row)
+                
+                raw_packet = self._row_to_packet(row)
 
-                for row in new_rows:
-                    print("📄 CSV row read:", row)
-                    
-                    raw_packet = self._row_to_packet(row)
+                if raw_packet is None:
+                    continue
 
-                    if raw_packet is None:
-                        continue
+                clean_packet = self.packet_handler.validate(raw_packet)
 
-                    clean_packet = self.packet_handler.validate(raw_packet)
-
-                    if clean_packet:
-                        self.queue_manager.add_packet(clean_packet)
-                        print(f"📥 CSV packet accepted: {clean_packet['id']}")
-
-                self.last_line_read = len(rows)
+                if clean_packet:
+                    self.queue_manager.add_packet(clean_packet)
+                    print(f"📥 CSV packet accepted: {clean_packet['id']}")
 
         except Exception as e:
             # Never crash mission due to CSV issues
@@ -88,22 +76,3 @@ class CSVReceiver:
             }
         except (KeyError, ValueError):
             return None
-
-
- 
- 
- 
-    # --------------------------------------------------
-    # COUNT EXISTING CSV ROWS
-    # --------------------------------------------------
-    def _count_existing_rows(self):
-        if not os.path.exists(self.csv_path):
-            return 0
-
-        try:
-            with open(self.csv_path, newline='') as csvfile:
-                reader = csv.DictReader(csvfile)
-                return len(list(reader))
-        except Exception:
-            return 0
-
@@ -0,0 +1,87 @@
+# csv_tail.py
+import csv
+import os
+
+
+class CSVTail:
+    """
+    Incremental reader for a CSV file that another process appends to.
+
+    Remembers the byte offset reached and the file's identity (device +
+    inode), so each call only reads what was appended since the last one.
+    A trailing line without its newline yet (writer mid-row) is kept
+    back until it is complete. If the file shrinks (truncated) or is
+    replaced (new inode, e.g. rotated or re-created), reading restarts
+    from the top, header included.
+
+    Rows are dicts keyed by the header, like csv.DictReader. Fields with
+    embedded newlines are not supported (the survey CSV has none).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._reset(None)
+
+    def _reset(self, file_id):
+        self.file_id = file_id
+        self.offset = 0
+        self.partial = b""
+        self.header = None
+
+    # --------------------------------------------------
+    # READ APPENDED ROWS
+    # --------------------------------------------------
+    def read_rows(self):
+        """
+        Returns the complete rows appended since the last call ([] if
+        none). Only a stat() when nothing changed.
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+
+        file_id = (st.st_dev, st.st_ino)
+
+        if file_id != self.file_id:
+            if self.file_id is not None:
+                print(f"🔄 {self.path} replaced, reading from start")
+            self._reset(file_id)
+
+        elif st.st_size < self.offset:
+            print(f"🔄 {self.path} truncated, reading from start")
+            self._reset(file_id)
+
+        if st.st_size == self.offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+
+        self.offset += len(data)
+
+        data = self.partial + data
+        end = data.rfind(b"\n") + 1
+        self.partial = data[end:]
+
+        lines = data[:end].decode("utf-8", errors="replace").splitlines()
+        return self._parse(lines)
+
+    def skip_existing(self):
+        """
+        Moves to the end of the file (keeping its header), so only rows
+        appended from now on are returned.
+        """
+        self.read_rows()
+
+    def _parse(self, lines):
+        rows = []
+
+        for fields in csv.reader(line for line in lines if line.strip()):
+            if self.header is None:
+                self.header = fields
+                continue
+            rows.append(dict(zip(self.header, fields)))
+
+        return rows
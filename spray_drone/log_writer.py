@@ -0,0 +1,140 @@
+# log_writer.py
+# Background CSV writer for the mission logs.
+#
+# Same file in det_yellow_send_gps_to_gcs/ and spray_drone/ — keep in sync.
+import atexit
+import csv
+import os
+import queue
+import threading
+import time
+
+# Default flush policy: whichever comes first
+FLUSH_EVERY_ROWS = 16
+FLUSH_INTERVAL_SEC = 0.5
+
+MAX_QUEUED_ROWS = 1024
+
+# Log file can't be opened / written (SD card gone, read-only) -> retry
+OPEN_RETRY_SEC = 1.0
+
+
+class LogWriter:
+    """
+    Appends CSV rows from a background thread through one open file
+    handle. write_row() only puts the row on a bounded queue, so an SD
+    card stall never blocks the control loop; rows are written in batches
+    and flushed every flush_every rows or flush_interval_sec, with an
+    optional fsync. close() (also run at interpreter exit) writes and
+    flushes whatever is left.
+    """
+
+    def __init__(self, path, header=None, flush_every=FLUSH_EVERY_ROWS,
+                 flush_interval_sec=FLUSH_INTERVAL_SEC, fsync=False,
+                 max_queued=MAX_QUEUED_ROWS):
+        self.path = path
+        self.header = header
+        self.flush_every = flush_every
+        self.flush_interval_sec = flush_interval_sec
+        self.fsync = fsync
+
+        self.rows = queue.Queue(maxsize=max_queued)
+        self.dropped = 0
+
+        # Rows taken off the queue but not flushed yet (writer thread only):
+        # rewritten after a reopen so a failed write/flush doesn't lose them
+        self.pending = []
+
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    # --------------------------------------------------
+    # CONTROL-THREAD API
+    # --------------------------------------------------
+    def write_row(self, row):
+        """
+        Never blocks. Returns False (row dropped) if the writer has fallen
+        MAX_QUEUED_ROWS behind.
+        """
+        try:
+            self.rows.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            print(f"⚠️ Log queue full, dropped row for {self.path} ({self.dropped} total)")
+            return False
+
+    def close(self, timeout=5.0):
+        if not self.running:
+            return
+        self.running = False
+        self.thread.join(timeout=timeout)
+
+    # --------------------------------------------------
+    # WRITER THREAD
+    # --------------------------------------------------
+    def _loop(self):
+        while True:
+            try:
+                self._write_rows()
+                return
+            except OSError as e:
+                # Rows keep queueing (and are dropped once full) meanwhile
+                print(f"⚠️ Log file {self.path} unavailable: {e}")
+
+            if not self.running:
+                lost = len(self.pending) + self.rows.qsize()
+                print(f"⚠️ {lost} rows not written to {self.path}")
+                return
+            time.sleep(OPEN_RETRY_SEC)
+
+    def _write_rows(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(self.path, "a", newline="") as f:
+            writer = csv.writer(f)
+
+            if self.header and f.tell() == 0:
+                writer.writerow(self.header)
+                self._flush(f)
+
+            # Left over from a failed attempt (a row that did reach the file
+            # before the error is repeated rather than lost)
+            for row in self.pending:
+                writer.writerow(row)
+            if self.pending:
+                self._flush(f)
+
+            unflushed = 0
+            last_flush = time.monotonic()
+
+            # Keep going after close() until the queue is empty
+            while self.running or not self.rows.empty():
+                try:
+                    row = self.rows.get(timeout=self.flush_interval_sec)
+                    self.pending.append(row)
+                    writer.writerow(row)
+                    unflushed += 1
+                except queue.Empty:
+                    pass
+
+                if unflushed and (
+                    unflushed >= self.flush_every
+                    or not self.running
+                    or time.monotonic() - last_flush >= self.flush_interval_sec
+                ):
+                    self._flush(f)
+                    unflushed = 0
+                    last_flush = time.monotonic()
+
+            self._flush(f)
+
+    def _flush(self, f):
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+        self.pending.clear()
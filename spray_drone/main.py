@@ -1,18 +1,17 @@
 # main.py
 import dronekit_py311_fix
 
+import asyncio
 import time
 import sys
 
-from dronekit import connect
-
-from config import USE_VISION_ALIGN
+from config import USE_VISION_ALIGN, USE_ASYNC_RUNTIME, STATS_HTTP_PORT
 from queue_manager import QueueManager
-from mission_manager import MissionManager
+from spray_logger import close_spray_log
+from startup import Startup
 
-# Vision module is optional
-if USE_VISION_ALIGN:
-    from vision_align import VisionAlign
+# dronekit / cv2 / gpiozero are imported by the startup components below,
+# in parallel, instead of here
 
 
 # --------------------------------------------------
@@ -23,10 +22,33 @@ def connect_vehicle():
     Connects to Pixhawk via serial or UDP.
     Adjust connection string as needed.
     """
-    print("🔌 Connecting to vehicle...")
-    vehicle = connect('/dev/ttyACM0',baud=57600, wait_ready=True)
-    print("✅ Vehicle connected")
-    return vehicle
+    from vehicle_connect import connect_vehicle as connect_ready, READY_ATTRS
+
+    # Parameters keep downloading in the background (vehicle_connect.py)
+    return connect_ready(
+        '/dev/ttyACM0', baud=57600,
+        ready_attrs=READY_ATTRS + ("location.global_relative_frame",)
+    )
+
+
+# --------------------------------------------------
+# STARTUP COMPONENTS (run in parallel, see startup.py)
+# --------------------------------------------------
+def load_mission_modules():
+    # dronekit, navigation, comms: most of the import time
+    from mission_manager import MissionManager
+    from async_mission import AsyncMissionRuntime
+    return MissionManager, AsyncMissionRuntime
+
+
+def start_vision():
+    from vision_align import VisionAlign
+    return VisionAlign()
+
+
+def start_sprayer():
+    from spray_controller import SprayController
+    return SprayController()
 
 
 # --------------------------------------------------
@@ -34,28 +56,53 @@ def connect_vehicle():
 # --------------------------------------------------
 def main():
     vehicle = None
+    mission_manager = None
 
     try:
-        # ---------- CONNECT ----------
-        vehicle = connect_vehicle()
+        # ---------- PARALLEL STARTUP ----------
+        startup = Startup()
+        startup.add("vehicle", connect_vehicle)
+        startup.add("mission_modules", load_mission_modules)
+        startup.add("sprayer", start_sprayer)
+
+        # Vision module is optional
+        if USE_VISION_ALIGN:
+            startup.add("vision", start_vision)
 
         # ---------- QUEUE ----------
         queue_manager = QueueManager()
 
+        # ---------- CONNECT ----------
+        vehicle = startup.wait("vehicle")
+
         # ---------- VISION (OPTIONAL) ----------
         vision = None
         if USE_VISION_ALIGN:
-            vision = VisionAlign()
+            vision = startup.wait("vision")
 
         # ---------- MISSION MANAGER ----------
+        MissionManager, AsyncMissionRuntime = startup.wait("mission_modules")
         mission_manager = MissionManager(
             vehicle=vehicle,
             queue_manager=queue_manager,
-            vision_align=vision
+            vision_align=vision,
+            spray_controller=startup.wait("sprayer")
         )
 
+        # Live per-stage latency (curl http://127.0.0.1:8765/text)
+        if STATS_HTTP_PORT:
+            mission_manager.stats.serve(STATS_HTTP_PORT)
+
+        startup.mark("mission_manager")
+        startup.report()
+
         print("🚀 Spray Drone Mission Started")
 
+        # ---------- ASYNC RUNTIME (returns after RTL landing) ----------
+        if USE_ASYNC_RUNTIME:
+            asyncio.run(AsyncMissionRuntime(mission_manager).run())
+            return
+
         # ---------- MAIN LOOP ----------
         while True:
             mission_manager.step()
@@ -77,6 +124,13 @@ def main():
     finally:
         print("🧹 Cleaning up before exit...")
 
+        # Write out queued spray log rows
+        close_spray_log()
+
+        if mission_manager is not None:
+            mission_manager.stats.stop()
+            print(mission_manager.stats.text())
+
         try:
             if vehicle:
                 vehicle.close()
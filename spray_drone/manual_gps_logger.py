@@ -4,7 +4,7 @@ import dronekit_py311_fix
 import time
 import csv
 import os
-from dronekit import connect
+from vehicle_connect import connect_vehicle as connect_ready
 
 
 # ================================
@@ -21,10 +21,11 @@ CSV_OUTPUT_PATH = "/home/pi/survey_outputs/yellow_targets.csv"
 # CONNECT TO VEHICLE
 # ================================
 def connect_vehicle():
-    print("🔌 Connecting to Pixhawk...")
-    vehicle = connect(CONNECTION_STRING, baud=BAUD_RATE, wait_ready=True)
-    print("✅ Connected")
-    return vehicle
+    # Only position is logged, no need to wait for the parameter table
+    return connect_ready(
+        CONNECTION_STRING, baud=BAUD_RATE,
+        ready_attrs=("gps_0", "location.global_relative_frame")
+    )
 
 
 # ================================
@@ -1,4 +1,5 @@
 # mission_manager.py
+import threading
 import time
 from dronekit import VehicleMode
 
@@ -6,8 +7,14 @@ from spray_logger import log_spray
 from state_machine import StateMachine, DroneState
 from spray_controller import SprayController
 from safety_checks import SafetyChecks
+from safety_monitor import SafetyMonitor
 from packet_handler import PacketHandler
+from flight_recorder import FlightRecorder, make_dtype
+from stage_stats import StageStats
 from comms.csv_receiver import CSVReceiver
+from comms.csv_ingest import CSVIngestService
+from comms.udp_receiver import DetectionReceiver
+from comms.journal_ingest import JournalIngestService
 
 # NEW IMPORTS from updated navigation.py
 from navigation import (
@@ -19,10 +26,17 @@ from navigation import (
 
 from config import (
     CSV_INPUT_PATH,
+    CSV_READ_EXISTING,
+    CSV_INGEST_THREAD,
+    JOURNAL_INPUT_PATH,
+    USE_UDP_DETECTIONS,
+    UDP_DETECTION_PORT,
     USE_VISION_ALIGN,
     SPRAY_DURATION_SEC,
-    GPS_GRACE_SEC,
     NO_TARGET_HOVER_SEC,
+    ENABLE_FLIGHT_RECORDER,
+    FLIGHT_RECORDER_DIR,
+    FLIGHT_RECORDER_PERIOD_SEC,
     VISION_TIMEOUT_SEC # Ensure this is imported for the timeout check
 )
 
@@ -30,39 +44,113 @@ from config import (
 SAFE_TRAVEL_ALT = 3.0   # Meters (Travel height)
 SPRAY_WORK_ALT = 2.0    # Meters (Spraying height)
 
+# --- FLIGHT RECORDER: one record per step() ---
+TICK_DTYPE = make_dtype([
+    ("state", "u1"),            # DroneState value at the sample
+    ("armed", "u1"),
+    ("fault", "u1"),
+    ("lat", "<f8"),
+    ("lon", "<f8"),
+    ("rel_alt", "<f4"),
+    ("roll", "<f4"),
+    ("pitch", "<f4"),
+    ("yaw", "<f4"),
+    ("groundspeed", "<f4"),
+    ("queue_size", "<u4"),      # bench_queue.py runs 100k targets
+    ("target_id", "<i8"),       # -1 = none
+    ("vel_x_cmd", "<f4"),       # last body velocity command
+    ("vel_y_cmd", "<f4"),
+    ("ingest_ms", "<f4"),
+    ("step_ms", "<f4"),         # last completed step (async: loop lag)
+])
+
+
+def _f(value):
+    # DroneKit attributes are None until the first message arrives
+    return float("nan") if value is None else value
+
 
 class MissionManager:
-    def __init__(self, vehicle, queue_manager, vision_align=None):
+    def __init__(self, vehicle, queue_manager, vision_align=None, spray_controller=None):
         self.vehicle = vehicle
         self.sm = StateMachine()
         self.queue = queue_manager
         self.vision = vision_align
-        self.spray = SprayController()
+        # main.py builds it during the parallel startup
+        self.spray = spray_controller or SprayController()
         self.safety = SafetyChecks(vehicle)
-        self.packet_handler = PacketHandler()
-        self.csv_receiver = CSVReceiver(
-            csv_path=CSV_INPUT_PATH,
-            packet_handler=self.packet_handler,
-            queue_manager=self.queue
+        self.safety_monitor = SafetyMonitor(
+            self.safety, on_fault=self._on_safety_fault,
+            precision_phase=lambda: self.sm.get_state() == DroneState.SPRAY,
+            airborne=lambda: self.vehicle.armed and self.sm.get_state() not in (
+                DroneState.INIT, DroneState.IDLE
+            )
         )
+        self.packet_handler = PacketHandler()
+
+        # Background target sources, drained into the queue by ingest()
+        self.packet_sources = []
+        self.csv_receiver = None
+
+        if JOURNAL_INPUT_PATH:
+            self.packet_sources.append(JournalIngestService(
+                journal_path=JOURNAL_INPUT_PATH,
+                packet_handler=self.packet_handler
+            ))
+        elif CSV_INGEST_THREAD:
+            self.packet_sources.append(CSVIngestService(
+                csv_path=CSV_INPUT_PATH,
+                packet_handler=self.packet_handler,
+                read_existing=CSV_READ_EXISTING
+            ))
+        else:
+            self.csv_receiver = CSVReceiver(
+                csv_path=CSV_INPUT_PATH,
+                packet_handler=self.packet_handler,
+                queue_manager=self.queue
+            )
+
+        if USE_UDP_DETECTIONS:
+            self.packet_sources.append(DetectionReceiver(
+                packet_handler=self.packet_handler,
+                port=UDP_DETECTION_PORT
+            ))
+
         self.current_target = None
         self.takeoff_done = False
-        self.gps_bad_since = None
         self.no_target_since = None
 
+        self.recorder = None
+        if ENABLE_FLIGHT_RECORDER:
+            self.recorder = FlightRecorder(FLIGHT_RECORDER_DIR, TICK_DTYPE, name="spray")
+        self.recorder_thread = None
+        self.last_velocity_cmd = (0.0, 0.0)
+        self.ingest_ms = 0.0
+        self.step_ms = 0.0
+
+        # Latency per stage: step_<state>, ingest, mavlink, logging
+        # (served over HTTP by main.py, for both runtimes)
+        self.stats = StageStats()
+
     # ==================================================
     # MAIN STEP
     # ==================================================
     def step(self):
-        # 1. Safety
-        if not self._gps_with_grace():
-            self._go_rtl("GPS lost beyond grace period")
-            return
+        start = time.perf_counter()
+        state = self.sm.get_state()
+
+        self._step()
+
+        self.step_ms = (time.perf_counter() - start) * 1000
+        self.stats.record(f"step_{state.name.lower()}", self.step_ms)
+
+    def _step(self):
+        # 1. Safety (evaluated continuously by the monitor thread)
+        if self.safety_monitor.has_fault() and self.sm.get_state() != DroneState.RTL:
+            self._go_rtl(self.safety_monitor.fault)
 
         # 2. Ingest Data
-        self.csv_receiver.poll()
-        if self.queue.has_pending():
-            self.no_target_since = None
+        self.ingest()
 
         # 3. State Machine
         state = self.sm.get_state()
@@ -70,6 +158,10 @@ class MissionManager:
         # --- INIT ---
         if state == DroneState.INIT:
             self.spray.setup()
+            self.safety_monitor.start()
+            for source in self.packet_sources:
+                source.start()
+            self.start_recording()
             if USE_VISION_ALIGN and self.vision:
                 self.vision.start()
             self.sm.set_state(DroneState.IDLE)
@@ -83,17 +175,24 @@ class MissionManager:
         elif state == DroneState.ARM_TAKEOFF:
             if not self.takeoff_done:
                 # Use SMART TAKEOFF to Safe Travel Altitude
-                smart_takeoff(self.vehicle, SAFE_TRAVEL_ALT)
+                if not smart_takeoff(self.vehicle, SAFE_TRAVEL_ALT,
+                                     abort=self.safety_monitor.has_fault):
+                    self._fault_abort()
+                    return
                 self.takeoff_done = True
                 print("⏳ Stabilizing after takeoff...")
-                time.sleep(2)
+                if self.safety_monitor.fault_event.wait(2):
+                    self._fault_abort()
+                    return
 
             self.sm.set_state(DroneState.NAVIGATE)
 
         # --- NAVIGATE (High -> Low Logic) ---
         elif state == DroneState.NAVIGATE:
             if self.current_target is None:
-                self.current_target = self.queue.pop_next_target()
+                self.current_target = self.queue.pop_next_target(
+                    self.vehicle.location.global_relative_frame
+                )
 
                 # IF NO TARGETS: Wait here. Do not ascend/descend.
                 if self.current_target is None:
@@ -105,17 +204,25 @@ class MissionManager:
                 self.vehicle,
                 self.current_target["lat"],
                 self.current_target["lon"],
-                SAFE_TRAVEL_ALT
+                SAFE_TRAVEL_ALT,
+                abort=self.safety_monitor.has_fault
             )
 
+            if self._fault_abort():
+                return
+
             if arrived:
                 # STEP 2: Descend to SPRAY_WORK_ALT (1.5m)
-                change_altitude(self.vehicle, SPRAY_WORK_ALT)
+                if not change_altitude(self.vehicle, SPRAY_WORK_ALT,
+                                       abort=self.safety_monitor.has_fault):
+                    self._fault_abort()
+                    return
 
                 # STEP 3: Proceed to Align or Spray
                 if USE_VISION_ALIGN and self.vision:
                     # --- ADDED: RESET VISION TIMER FOR NEW TARGET ---
                     self.vision.reset()
+                    self.safety_monitor.require_vision(True)
                     self.sm.set_state(DroneState.ALIGN)
                 else:
                     self.sm.set_state(DroneState.SPRAY)
@@ -126,10 +233,12 @@ class MissionManager:
         # --- ALIGN (UPDATED: LOGIC WITH TIMEOUT) ---
         elif state == DroneState.ALIGN:
             if not (USE_VISION_ALIGN and self.vision):
+                self.safety_monitor.require_vision(False)
                 self.sm.set_state(DroneState.SPRAY)
                 return
 
             # 1. Get Error from Camera
+            t_frame = time.perf_counter()
             aligned, err_x, err_y = self.vision.process_frame()
             self.safety.update_vision_heartbeat()
 
@@ -138,7 +247,8 @@ class MissionManager:
             time_since_sight = time.time() - self.vision.last_seen_time
             if time_since_sight > VISION_TIMEOUT_SEC:
                 print(f"⚠️ Target lost for {int(time_since_sight)}s. Giving up and Spraying.")
-                send_body_velocity(self.vehicle, 0, 0, 0)
+                self._send_velocity(0, 0)
+                self.safety_monitor.require_vision(False)
                 self.sm.set_state(DroneState.SPRAY)
                 return
             # ------------------------------------------
@@ -146,7 +256,8 @@ class MissionManager:
             if aligned:
                 print("✅ Target Aligned! Stopping and Spraying.")
                 # Stop any movement before spraying
-                send_body_velocity(self.vehicle, 0, 0, 0)
+                self._send_velocity(0, 0)
+                self.safety_monitor.require_vision(False)
                 self.sm.set_state(DroneState.SPRAY)
             
             elif err_x is not None and err_y is not None:
@@ -163,28 +274,37 @@ class MissionManager:
                 
                 # Send the "Nudge" command
                 print(f"   🎯 Aligning... Err: {err_x},{err_y}")
-                send_body_velocity(self.vehicle, vel_x, vel_y, 0)
+                self._send_velocity(vel_x, vel_y)
+                self._record_align_latency(t_frame)
             
             else:
                 # Target lost temporarily? Hover in place.
                 if int(time.time()) % 2 == 0: # Print sparingly
                     print("   ⚠️ Searching...")
-                send_body_velocity(self.vehicle, 0, 0, 0)
+                self._send_velocity(0, 0)
 
         # --- SPRAY ---
         elif state == DroneState.SPRAY:
             # Delays and Logic handled inside spray_for
-            self.spray.spray_for(SPRAY_DURATION_SEC)
+            if not self.spray.spray_for(SPRAY_DURATION_SEC,
+                                        abort_event=self.safety_monitor.fault_event):
+                self._fault_abort()
+                return
             self.sm.set_state(DroneState.POST_SPRAY)
 
         # --- POST SPRAY (Ascend Logic) ---
         elif state == DroneState.POST_SPRAY:
             # STEP 4: Ascend back to SAFE_TRAVEL_ALT before moving
-            change_altitude(self.vehicle, SAFE_TRAVEL_ALT)
+            if not change_altitude(self.vehicle, SAFE_TRAVEL_ALT,
+                                   abort=self.safety_monitor.has_fault):
+                self._fault_abort()
+                return
 
             finished_target = self.queue.mark_current_done("sprayed")
             if finished_target:
+                t_log = time.perf_counter()
                 log_spray(finished_target, SPRAY_DURATION_SEC, status="sprayed")
+                self.stats.record("logging", (time.perf_counter() - t_log) * 1000)
 
             self.current_target = None
 
@@ -200,17 +320,105 @@ class MissionManager:
                 self.spray.spray_off()
 
     # Helpers
-    def _gps_with_grace(self):
-        if self.safety.gps_ok():
-            self.gps_bad_since = None
-            return True
-        if self.gps_bad_since is None:
-            self.gps_bad_since = time.time()
-            return True
-        if (time.time() - self.gps_bad_since) < GPS_GRACE_SEC:
+    def _fault_abort(self):
+        """
+        Called when a phase returns early. True (and RTL) if it was a
+        safety fault.
+        """
+        if self.safety_monitor.has_fault():
+            self._go_rtl(self.safety_monitor.fault)
             return True
         return False
 
+    def _on_safety_fault(self, reason):
+        # Runs on the monitor thread: command RTL right away instead of
+        # waiting for the blocking phase to notice and return
+        self.vehicle.mode = VehicleMode("RTL")
+        if self.spray.spraying:
+            self.spray.spray_off()
+
+    def ingest(self, csv_packets=None):
+        """
+        Moves newly received targets into the queue. For the background
+        sources this is only a drain of already validated packets.
+        csv_packets: CSV rows the caller already read (the async runtime
+        reads the file on a worker thread); None = read them here.
+        Must run on the thread that pops targets (the queue isn't locked).
+        """
+        start = time.perf_counter()
+
+        if csv_packets is None and self.csv_receiver:
+            csv_packets = self.csv_receiver.read_packets()
+        for packet in csv_packets or ():
+            self.queue.add_packet(packet)
+
+        for source in self.packet_sources:
+            source.drain_into(self.queue)
+
+        if self.queue.has_pending():
+            self.no_target_since = None
+
+        self.ingest_ms = (time.perf_counter() - start) * 1000
+        self.stats.record("ingest", self.ingest_ms)
+
+    def _record_align_latency(self, t_frame):
+        # Frame read -> velocity command sent. Starts at the camera capture
+        # time instead if the vision module reports one (last_capture_time,
+        # time.monotonic() like camera.py on the survey drone).
+        capture_time = getattr(self.vision, "last_capture_time", None)
+        if capture_time is not None:
+            self.stats.record("align_glass_to_cmd", (time.monotonic() - capture_time) * 1000)
+        self.stats.record("align_frame_to_cmd", (time.perf_counter() - t_frame) * 1000)
+
+    def _send_velocity(self, vel_x, vel_y):
+        start = time.perf_counter()
+        self.last_velocity_cmd = (vel_x, vel_y)
+        send_body_velocity(self.vehicle, vel_x, vel_y, 0)
+        self.stats.record("mavlink", (time.perf_counter() - start) * 1000)
+
+    def start_recording(self):
+        """
+        Fixed-rate sampler thread for the blocking runtime (the async
+        runtime samples from its own task instead). Only this thread
+        writes records.
+        """
+        if not self.recorder or self.recorder_thread is not None:
+            return
+        self.recorder_thread = threading.Thread(target=self._recorder_loop, daemon=True)
+        self.recorder_thread.start()
+
+    def _recorder_loop(self):
+        next_tick = time.monotonic()
+        while not self.recorder.closed:
+            try:
+                self.record_tick(self.sm.get_state(), self.step_ms)
+            except Exception as e:
+                print(f"⚠️ Flight recorder sample error: {e}")
+
+            next_tick += FLIGHT_RECORDER_PERIOD_SEC
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+
+    def record_tick(self, state, step_ms):
+        rec = self.recorder.next_record()
+        loc = self.vehicle.location.global_relative_frame
+        att = self.vehicle.attitude
+
+        rec["state"] = state.value
+        rec["armed"] = bool(self.vehicle.armed)
+        rec["fault"] = self.safety_monitor.has_fault()
+        rec["lat"] = _f(loc.lat)
+        rec["lon"] = _f(loc.lon)
+        rec["rel_alt"] = _f(loc.alt)
+        rec["roll"] = _f(att.roll)
+        rec["pitch"] = _f(att.pitch)
+        rec["yaw"] = _f(att.yaw)
+        rec["groundspeed"] = _f(self.vehicle.groundspeed)
+        rec["queue_size"] = self.queue.size()
+        rec["target_id"] = self.current_target["id"] if self.current_target else -1
+        rec["vel_x_cmd"], rec["vel_y_cmd"] = self.last_velocity_cmd
+        rec["ingest_ms"] = self.ingest_ms
+        rec["step_ms"] = step_ms
+
     def _handle_no_targets(self):
         if self.no_target_since is None:
             self.no_target_since = time.time()
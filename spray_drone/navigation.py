@@ -1,41 +1,49 @@
 # navigation.py
-from dronekit import connect, VehicleMode, LocationGlobalRelative
+from dronekit import VehicleMode, LocationGlobalRelative
 from pymavlink import mavutil # Needed for velocity commands
 import time
-import math
+
+from vehicle_wait import wait_for
+from geodesy import distance_m
+import vehicle_connect
 
 # --------------------------------------------------
 # CONNECT TO VEHICLE
 # --------------------------------------------------
 def connect_vehicle(connection_string, baudrate=57600):
-    print("🔌 Connecting to vehicle...")
-    vehicle = connect(connection_string, baud=baudrate, wait_ready=True)
-    print("✅ Vehicle connected")
-    return vehicle
+    return vehicle_connect.connect_vehicle(
+        connection_string, baud=baudrate,
+        ready_attrs=vehicle_connect.READY_ATTRS + ("location.global_relative_frame",)
+    )
 
 
 # --------------------------------------------------
 # SMART TAKEOFF (Handles Ground & Mid-Air)
 # --------------------------------------------------
-def smart_takeoff(vehicle, target_altitude):
+def smart_takeoff(vehicle, target_altitude, abort=None):
     """
     Arms and takes off. Sets SAFE SPEED immediately.
+    Returns False if abort() became True before reaching altitude.
     """
     # 1. Arm if not armed
     if not vehicle.armed:
-        while not vehicle.is_armable:
-            print("⏳ Waiting for vehicle to become armable...")
-            time.sleep(1)
+        print("⏳ Waiting for vehicle to become armable...")
+        # is_armable is derived from these, DroneKit doesn't notify it directly
+        if not wait_for(vehicle, ["gps_0", "ekf_ok", "system_status", "mode"],
+                        lambda: vehicle.is_armable, abort=abort):
+            return False
 
         vehicle.mode = VehicleMode("GUIDED")
-        while vehicle.mode.name != "GUIDED":
-            print("⏳ Waiting for GUIDED mode...")
-            time.sleep(0.5)
+        print("⏳ Waiting for GUIDED mode...")
+        if not wait_for(vehicle, ["mode"],
+                        lambda: vehicle.mode.name == "GUIDED", abort=abort):
+            return False
 
         vehicle.armed = True
-        while not vehicle.armed:
-            print("⏳ Arming...")
-            time.sleep(0.5)
+        print("⏳ Arming...")
+        if not wait_for(vehicle, ["armed"],
+                        lambda: vehicle.armed, abort=abort):
+            return False
 
     # --- CRITICAL FIX: Set speed BEFORE moving ---
     print("🐌 Setting safe groundspeed to 1.0 m/s...")
@@ -55,21 +63,24 @@ def smart_takeoff(vehicle, target_altitude):
         vehicle.simple_goto(target_loc)
 
     # 3. Wait for Altitude
-    while True:
-        current_alt = vehicle.location.global_relative_frame.alt
-        if current_alt >= target_altitude * 0.95:
-            print(f"✅ Reached Safe Altitude: {current_alt:.1f}m")
-            break
-        time.sleep(1)
+    reached = wait_for(
+        vehicle, ["location.global_relative_frame"],
+        lambda: vehicle.location.global_relative_frame.alt >= target_altitude * 0.95,
+        abort=abort
+    )
+    if reached:
+        print(f"✅ Reached Safe Altitude: {vehicle.location.global_relative_frame.alt:.1f}m")
+    return reached
 
 
 # --------------------------------------------------
 # BLOCKING NAVIGATION (Slow & Safe)
 # --------------------------------------------------
-def navigate_to_target_blocking(vehicle, lat, lon, alt):
+def navigate_to_target_blocking(vehicle, lat, lon, alt, abort=None):
     """
     Flies to lat/lon at fixed 'alt'. Blocks until arrival.
     Enforces 1.0 m/s speed for heavy payload safety.
+    Returns False on manual takeover or when abort() becomes True.
     """
     print(f"🧭 NAVIGATING to target at {alt}m altitude...")
 
@@ -80,56 +91,50 @@ def navigate_to_target_blocking(vehicle, lat, lon, alt):
     target_loc = LocationGlobalRelative(float(lat), float(lon), float(alt))
     vehicle.simple_goto(target_loc)
 
-    last_log_time = time.time()
+    def arrived():
+        # Close (< 1.0m) AND actually stopped (< 0.2 m/s)
+        dist = distance_to_target_meters(vehicle.location.global_relative_frame, target_loc)
+        return dist < 1.0 and vehicle.groundspeed < 0.2
 
-    while True:
-        current_loc = vehicle.location.global_relative_frame
-        dist = distance_to_target_meters(current_loc, target_loc)
+    def manual_control():
+        return vehicle.mode.name not in ['GUIDED', 'AUTO']
 
-        # Log every 3 seconds
-        if time.time() - last_log_time > 3.0:
-            print(f"   ... Distance to target: {dist:.1f}m")
-            last_log_time = time.time()
+    def stop():
+        return manual_control() or (abort is not None and abort())
 
-            # Resend command to correct drift & enforce speed
-            vehicle.groundspeed = 1.0
-            vehicle.simple_goto(target_loc)
+    while True:
+        # Wakes on every position / speed / mode update; returns every 3s
+        # so we can log and resend the goto
+        if wait_for(vehicle,
+                    ["location.global_relative_frame", "groundspeed", "mode"],
+                    arrived, timeout=3.0, abort=stop):
+            print(f"✅ Arrived at Target: {lat}, {lon} (Speed: {vehicle.groundspeed:.2f} m/s)")
+            return True
 
         # Safety Exit
-        if vehicle.mode.name not in ['GUIDED', 'AUTO']:
+        if manual_control():
             print("⚠️ Manual Control Detected! Stopping Navigation.")
             return False
 
-        # Arrival Check (within 1.0m)
-#        if dist < 1.0:
-#            print(f"✅ Arrived at Target: {lat}, {lon}")
-#            return True
-#
-#        time.sleep(0.2)
-
-        # 1. Check Distance (Are we close?)
-        if dist < 1.0:  # Stricter: 0.5m instead of 1.0m
+        if abort is not None and abort():
+            print("⚠️ Navigation aborted.")
+            return False
 
-            # 2. Check Speed (Have we actually stopped?)
-            current_speed = vehicle.groundspeed
-            if current_speed < 0.2:  # Wait until almost motionless (0.2 m/s)
-                print(f"✅ Arrived at Target: {lat}, {lon} (Speed: {current_speed:.2f} m/s)")
-                return True
-            else:
-                # We are close, but moving too fast. Wait a tiny bit more.
-                # (Optional: print debug to see it braking)
-                # print(f"   ... Braking ... Speed: {current_speed:.2f} m/s")
-                pass
+        dist = distance_to_target_meters(vehicle.location.global_relative_frame, target_loc)
+        print(f"   ... Distance to target: {dist:.1f}m")
 
-        time.sleep(0.2)
+        # Resend command to correct drift & enforce speed
+        vehicle.groundspeed = 1.0
+        vehicle.simple_goto(target_loc)
 
 
 # --------------------------------------------------
 # CHANGE ALTITUDE (Vertical Only)
 # --------------------------------------------------
-def change_altitude(vehicle, new_alt):
+def change_altitude(vehicle, new_alt, abort=None):
     """
     Changes altitude IN PLACE (without moving lat/lon).
+    Returns False if abort() became True first.
     """
     current_alt = vehicle.location.global_relative_frame.alt
     direction = "Ascending" if new_alt > current_alt else "Descending"
@@ -140,14 +145,14 @@ def change_altitude(vehicle, new_alt):
 
     vehicle.simple_goto(target_loc)
 
-    while True:
-        current_alt = vehicle.location.global_relative_frame.alt
-        diff = abs(current_alt - new_alt)
-
-        if diff < 0.3: # Within 30cm
-            print(f"✅ Reached Altitude: {new_alt}m")
-            break
-        time.sleep(0.5)
+    reached = wait_for(
+        vehicle, ["location.global_relative_frame"],
+        lambda: abs(vehicle.location.global_relative_frame.alt - new_alt) < 0.3,  # Within 30cm
+        abort=abort
+    )
+    if reached:
+        print(f"✅ Reached Altitude: {new_alt}m")
+    return reached
         
 
 # --------------------------------------------------
@@ -187,6 +192,4 @@ def distance_to_target_meters(loc1, loc2):
         lat2 = loc2.lat
         lon2 = loc2.lon
 
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    return math.sqrt((dlat * 1.113195e5) ** 2 + (dlon * 1.113195e5) ** 2)
+    return distance_m(lat1, lon1, lat2, lon2)
@@ -1,9 +1,17 @@
 # queue_manager.py
 from collections import deque
-import math
+from spatial_index import SpatialGrid
+from route_planner import (
+    to_local_xy,
+    plan_route,
+    two_opt,
+    cheapest_insertion,
+    path_length
+)
 from config import (
     MIN_BATCH_POINTS,
-    MIN_DISTANCE_BETWEEN_TARGETS_M
+    MIN_DISTANCE_BETWEEN_TARGETS_M,
+    ROUTE_OPTIMIZATION
 )
 
 
@@ -12,6 +20,14 @@ class QueueManager:
         self.queue = deque()
         self.seen_ids = set()
         self.current_target = None
+
+        # Every target ever accepted (pending, in flight and sprayed),
+        # for the MIN_DISTANCE_BETWEEN_TARGETS_M duplicate check
+        self.accepted = SpatialGrid(MIN_DISTANCE_BETWEEN_TARGETS_M)
+
+        # Where the planned route starts (vehicle position at the last pop).
+        # None until the first pop -> queue is still in arrival order.
+        self.route_start = None
         
     def size(self):
         return len(self.queue)
@@ -33,17 +49,21 @@ class QueueManager:
             return False
 
         # ---- Distance duplicate check ----
-        for existing in self.queue:
-            dist = self._distance_m(existing, packet)
-            print(f"📏 Distance to existing target: {dist:.2f} m")
-
-            if dist < MIN_DISTANCE_BETWEEN_TARGETS_M:
-                print("❌ Rejected: too close to existing target")
-                return False
+        dist = self.accepted.nearest_within(
+            packet["lat"], packet["lon"], MIN_DISTANCE_BETWEEN_TARGETS_M
+        )
+        if dist is not None:
+            print(f"❌ Rejected: too close to existing target ({dist:.2f} m)")
+            return False
 
         # Passed all checks
-        self.queue.append(packet)
         self.seen_ids.add(pkt_id)
+        self.accepted.insert(packet["lat"], packet["lon"])
+
+        if ROUTE_OPTIMIZATION and self.route_start is not None:
+            self._insert_into_route(packet)
+        else:
+            self.queue.append(packet)
         
         print(f"✅ Accepted packet ID {pkt_id}")
         return True
@@ -57,13 +77,21 @@ class QueueManager:
     # --------------------------------------------------
     # GET NEXT TARGET
     # --------------------------------------------------
-    def pop_next_target(self):
+    def pop_next_target(self, current_location=None):
+        """
+        current_location: anything with .lat/.lon (the vehicle's
+        global_relative_frame). When given, the pending targets are
+        re-ordered into a short route starting there before popping.
+        """
         if self.current_target is not None:
             return None
 
         if not self.queue:
             return None
 
+        if ROUTE_OPTIMIZATION and current_location is not None:
+            self._optimize_route(current_location.lat, current_location.lon)
+
         self.current_target = self.queue.popleft()
         return self.current_target
 
@@ -90,16 +118,47 @@ class QueueManager:
 #        return len(self.queue)
 
     # --------------------------------------------------
-    # DISTANCE CALCULATION (meters)
+    # ROUTE PLANNING
     # --------------------------------------------------
-    def _distance_m(self, p1, p2):
+    def _optimize_route(self, lat, lon):
+        targets = list(self.queue)
+        start_xy, xy = self._project(lat, lon, targets)
+
+        if self.route_start is None:
+            # First plan: build from scratch
+            order = plan_route(start_xy, xy)
+        else:
+            # Already a good route, just repair it from the new start
+            order = two_opt(start_xy, xy, range(len(targets)))
+
+        self.queue = deque(targets[i] for i in order)
+        self.route_start = (lat, lon)
+
+        print(f"🗺️  Route: {len(order)} targets, {path_length(start_xy, xy, order):.1f} m")
+
+    def _insert_into_route(self, packet):
         """
-        Fast distance approximation for short ranges
+        Mid-mission arrival: cheapest insertion into the current route
+        only (linear). The 2-opt repair runs once at the next pop, from the
+        live position, however many targets arrived in between.
         """
-        dlat = p1["lat"] - p2["lat"]
-        dlon = p1["lon"] - p2["lon"]
+        # The drone continues from the target it is flying to now
+        if self.current_target is not None:
+            start = (self.current_target["lat"], self.current_target["lon"])
+        else:
+            start = self.route_start
+
+        targets = list(self.queue) + [packet]
+        start_xy, xy = self._project(start[0], start[1], targets)
+
+        order = cheapest_insertion(start_xy, xy, list(range(len(targets) - 1)), len(targets) - 1)
+
+        self.queue = deque(targets[i] for i in order)
 
-        return math.sqrt(
-            (dlat * 1.113195e5) ** 2 +
-            (dlon * 1.113195e5) ** 2
+    def _project(self, lat, lon, targets):
+        xy = to_local_xy(
+            [t["lat"] for t in targets],
+            [t["lon"] for t in targets],
+            lat, lon
         )
+        return (0.0, 0.0), xy
@@ -0,0 +1,119 @@
+# route_planner.py
+# Visit order for spray targets: open path starting at the drone, free end.
+# Nearest-neighbour construction + 2-opt improvement, and cheapest
+# insertion for targets that arrive mid-mission.
+import numpy as np
+
+from geodesy import LocalFrame
+
+# 2-opt passes over the whole route per optimisation call
+MAX_2OPT_PASSES = 10
+
+
+# --------------------------------------------------
+# LOCAL METRIC COORDINATES
+# --------------------------------------------------
+def to_local_xy(lats, lons, ref_lat, ref_lon):
+    """
+    (n, 2) array of x = east, y = north meters around ref_lat/ref_lon.
+    """
+    east, north = LocalFrame(ref_lat, ref_lon).to_en(
+        np.asarray(lats, dtype=np.float64),
+        np.asarray(lons, dtype=np.float64)
+    )
+    return np.column_stack([east, north])
+
+
+def _dist(a, b):
+    return np.hypot(a[..., 0] - b[..., 0], a[..., 1] - b[..., 1])
+
+
+def path_length(start_xy, xy, order):
+    if len(order) == 0:
+        return 0.0
+    pts = np.vstack([start_xy, xy[order]])
+    return float(_dist(pts[:-1], pts[1:]).sum())
+
+
+# --------------------------------------------------
+# CONSTRUCTION
+# --------------------------------------------------
+def nearest_neighbour_order(start_xy, xy):
+    n = len(xy)
+    order = []
+    visited = np.zeros(n, dtype=bool)
+    here = np.asarray(start_xy, dtype=np.float64)
+
+    for _ in range(n):
+        d = _dist(xy, here)
+        d[visited] = np.inf
+        k = int(np.argmin(d))
+        order.append(k)
+        visited[k] = True
+        here = xy[k]
+
+    return order
+
+
+def cheapest_insertion(start_xy, xy, order, new_idx):
+    """
+    Inserts target new_idx into order where it adds the least distance.
+    """
+    q = xy[new_idx]
+    pts = np.vstack([start_xy, xy[order]]) if order else np.asarray([start_xy])
+
+    # Between pts[k] and pts[k+1] ...
+    cost = _dist(pts[:-1], q) + _dist(q, pts[1:]) - _dist(pts[:-1], pts[1:])
+    # ... or after the last one
+    cost = np.append(cost, _dist(pts[-1], q))
+
+    k = int(np.argmin(cost))
+    return order[:k] + [new_idx] + order[k:]
+
+
+# --------------------------------------------------
+# IMPROVEMENT
+# --------------------------------------------------
+def two_opt(start_xy, xy, order, max_passes=MAX_2OPT_PASSES):
+    """
+    Open-path 2-opt with a fixed start. Reverses target segments
+    [i..j] while that shortens the route. Vectorised over j.
+    """
+    order = list(order)
+    n = len(order)
+    if n < 2:
+        return order
+
+    for _ in range(max_passes):
+        improved = False
+        pts = np.vstack([start_xy, xy[order]])    # pts[0] = start
+
+        for i in range(1, n + 1):
+            a = pts[i - 1]
+            b = pts[i]
+            js = np.arange(i, n + 1)
+            c = pts[js]
+
+            # Edge after the segment (none when the segment ends the route)
+            nxt = np.minimum(js + 1, n)
+            d = pts[nxt]
+            has_next = js < n
+
+            delta = _dist(a, c) - _dist(a, b)
+            delta += np.where(has_next, _dist(b, d) - _dist(c, d), 0.0)
+
+            best = int(np.argmin(delta))
+            if delta[best] < -1e-6:
+                j = int(js[best])
+                order[i - 1:j] = order[i - 1:j][::-1]
+                pts[i:j + 1] = pts[i:j + 1][::-1]
+                improved = True
+
+        if not improved:
+            break
+
+    return order
+
+
+def plan_route(start_xy, xy):
+    return two_opt(start_xy, xy, nearest_neighbour_order(start_xy, xy))
@@ -9,11 +9,15 @@ from config import (
     VISION_TIMEOUT_SEC
 )
 
+# Failed GPS checks are printed at most this often (the monitor runs at 10 Hz)
+GPS_WARN_INTERVAL_SEC = 2.0
+
 
 class SafetyChecks:
     def __init__(self, vehicle):
         self.vehicle = vehicle
         self.last_vision_time = time.time()
+        self.last_gps_warn = 0.0
 
     # --------------------------------------------------
     # BATTERY CHECK
@@ -27,10 +31,14 @@ class SafetyChecks:
     # --------------------------------------------------
     # ATTITUDE CHECK
     # --------------------------------------------------
-    def attitude_ok(self):
-        roll = abs(self.vehicle.attitude.roll * 57.3)   # rad → deg
-        pitch = abs(self.vehicle.attitude.pitch * 57.3)
-        return roll <= MAX_ROLL_DEG and pitch <= MAX_PITCH_DEG
+    def attitude_ok(self, max_roll_deg=MAX_ROLL_DEG, max_pitch_deg=MAX_PITCH_DEG):
+        att = self.vehicle.attitude
+        if att is None or att.roll is None or att.pitch is None:
+            return False    # no attitude telemetry counts as a failed check
+
+        roll = abs(att.roll * 57.3)   # rad → deg
+        pitch = abs(att.pitch * 57.3)
+        return roll <= max_roll_deg and pitch <= max_pitch_deg
 
 #    # --------------------------------------------------
 #    # GPS CHECK
@@ -45,7 +53,12 @@ class SafetyChecks:
     def gps_ok(self):
         # Access the GPS info
         gps = self.vehicle.gps_0
-        
+
+        # No fix -> DroneKit reports None fields: a failed check, not an error
+        if gps is None or None in (gps.fix_type, gps.eph, gps.satellites_visible):
+            self._gps_warn("❌ GPS Fail: no GPS data")
+            return False
+
         # 1. Check for 3D Fix (3) or DGPS/RTK (4, 5, 6)
         fix_ok = gps.fix_type >= 3
         
@@ -57,17 +70,25 @@ class SafetyChecks:
         sats_ok = gps.satellites_visible >= 7
         
         if not fix_ok:
-            print(f"❌ GPS Fail: Fix type {gps.fix_type}")
-        if not hdop_ok:
-            print(f"❌ GPS Fail: HDOP {gps.eph/100.0}m (Too high)")
-            
+            self._gps_warn(f"❌ GPS Fail: Fix type {gps.fix_type}")
+        elif not hdop_ok:
+            self._gps_warn(f"❌ GPS Fail: HDOP {gps.eph/100.0}m (Too high)")
+
         return fix_ok and hdop_ok and sats_ok
 
+    def _gps_warn(self, msg):
+        now = time.monotonic()
+        if now - self.last_gps_warn >= GPS_WARN_INTERVAL_SEC:
+            self.last_gps_warn = now
+            print(msg)
+
     # --------------------------------------------------
     # ALTITUDE CHECK
     # --------------------------------------------------
     def altitude_ok(self):
         alt = self.vehicle.location.global_relative_frame.alt
+        if alt is None:
+            return True     # no position: the GPS check (with grace) handles it
         return alt <= MAX_ALTITUDE_M
 
     # --------------------------------------------------
@@ -0,0 +1,165 @@
+# safety_monitor.py
+import threading
+import time
+
+from config import (
+    SAFETY_MONITOR_PERIOD_SEC,
+    GPS_GRACE_SEC,
+    ATTITUDE_GRACE_SEC,
+    MAX_FLIGHT_TILT_DEG
+)
+
+# Check errors (telemetry not populated yet) are tolerated this long after
+# start(); later, an error is a fault like any failed check
+STARTUP_TOLERANCE_SEC = 5.0
+ERROR_WARN_INTERVAL_SEC = 1.0
+
+
+class SafetyMonitor:
+    """
+    Runs SafetyChecks at a fixed rate on its own thread and latches the
+    first fault. Long-running phases pass has_fault as their abort
+    predicate (or wait on fault_event), so a fault stops them within one
+    monitor period instead of at the end of the phase.
+
+    DroneKit attributes are already cached from the telemetry stream, so
+    each check is a cheap read, not a round trip to the autopilot.
+    """
+
+    def __init__(self, safety_checks, on_fault=None, period_sec=SAFETY_MONITOR_PERIOD_SEC,
+                 precision_phase=None, airborne=None):
+        self.safety = safety_checks
+        self.on_fault = on_fault
+        self.period_sec = period_sec
+
+        # precision_phase() -> True while the spray tilt limits apply
+        # (SPRAY; alignment nudges tilt the airframe themselves);
+        # MAX_FLIGHT_TILT_DEG otherwise
+        self.precision_phase = precision_phase
+
+        # airborne() -> False while disarmed / on the ground: no GPS fix
+        # there is not a fault (None = always checked)
+        self.airborne = airborne
+
+        self.fault_event = threading.Event()
+        self.fault = None            # reason of the first fault
+
+        # Vision is only expected to heartbeat while aligning
+        self.vision_required = False
+
+        self.gps_bad_since = None
+        self.attitude_bad_since = None
+
+        self.running = False
+        self.thread = None
+
+    # --------------------------------------------------
+    # START / STOP
+    # --------------------------------------------------
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    # --------------------------------------------------
+    # SHARED FAULT STATE
+    # --------------------------------------------------
+    def has_fault(self):
+        return self.fault_event.is_set()
+
+    def require_vision(self, required):
+        if required:
+            # Fresh heartbeat so the previous phase's gap doesn't count
+            self.safety.update_vision_heartbeat()
+        self.vision_required = required
+
+    def _raise_fault(self, reason):
+        if self.fault_event.is_set():
+            return
+        self.fault = reason
+        self.fault_event.set()
+        print(f"🚨 Safety fault: {reason}")
+
+        if self.on_fault:
+            try:
+                self.on_fault(reason)
+            except Exception as e:
+                print(f"⚠️ Fault handler error: {e}")
+
+    # --------------------------------------------------
+    # MONITOR LOOP
+    # --------------------------------------------------
+    def _loop(self):
+        next_tick = time.monotonic()
+        tolerate_until = next_tick + STARTUP_TOLERANCE_SEC
+        last_warn = 0.0
+
+        while self.running and not self.fault_event.is_set():
+            try:
+                reason = self.evaluate()
+            except Exception as e:
+                now = time.monotonic()
+                if now >= tolerate_until:
+                    reason = f"Safety check error: {e}"
+                else:
+                    # Telemetry not populated yet -> try next tick
+                    if now - last_warn >= ERROR_WARN_INTERVAL_SEC:
+                        last_warn = now
+                        print(f"⚠️ Safety check error: {e}")
+                    reason = None
+
+            if reason:
+                self._raise_fault(reason)
+                break
+
+            next_tick += self.period_sec
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+
+    def evaluate(self):
+        """
+        One pass over all checks. Returns a fault reason or None.
+        """
+        now = time.monotonic()
+
+        # ---- GPS (with grace period, in flight only) ----
+        if self.airborne is not None and not self.airborne():
+            self.gps_bad_since = None
+        elif self.safety.gps_ok():
+            self.gps_bad_since = None
+        else:
+            if self.gps_bad_since is None:
+                self.gps_bad_since = now
+            if (now - self.gps_bad_since) >= GPS_GRACE_SEC:
+                return "GPS lost beyond grace period"
+
+        # ---- Attitude (sustained tilt only, gusts are normal) ----
+        if self.precision_phase is not None and self.precision_phase():
+            attitude_ok = self.safety.attitude_ok()
+        else:
+            attitude_ok = self.safety.attitude_ok(MAX_FLIGHT_TILT_DEG, MAX_FLIGHT_TILT_DEG)
+
+        if attitude_ok:
+            self.attitude_bad_since = None
+        else:
+            if self.attitude_bad_since is None:
+                self.attitude_bad_since = now
+            if (now - self.attitude_bad_since) >= ATTITUDE_GRACE_SEC:
+                return "Tilt limit exceeded"
+
+        # ---- Altitude ----
+        if not self.safety.altitude_ok():
+            return "Altitude limit exceeded"
+
+        # ---- Vision heartbeat (while aligning) ----
+        if self.vision_required and not self.safety.vision_ok():
+            return "Vision heartbeat lost"
+
+        return None
@@ -0,0 +1,67 @@
+# spatial_index.py
+import math
+
+from geodesy import LocalFrame
+
+# Cell size floor: MIN_DISTANCE_BETWEEN_TARGETS_M = 0 (dedup off) would
+# otherwise divide by zero
+MIN_CELL_SIZE_M = 0.1
+
+
+class SpatialGrid:
+    """
+    Uniform grid over local metric coordinates (x = east, y = north),
+    anchored at the first inserted point. A "is anything within r meters"
+    query only looks at the cells around the point, so it stays constant
+    time no matter how many targets are stored.
+    """
+
+    def __init__(self, cell_size_m):
+        self.cell_size = max(float(cell_size_m), MIN_CELL_SIZE_M)
+        self.frame = None       # local projection, anchored at the first point
+        self.cells = {}         # (ix, iy) -> [(x, y), ...]
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    # --------------------------------------------------
+    # LOCAL PROJECTION
+    # --------------------------------------------------
+    def _to_xy(self, lat, lon):
+        if self.frame is None:
+            self.frame = LocalFrame(lat, lon)
+        return self.frame.to_en(lat, lon)
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    # --------------------------------------------------
+    # INSERT / QUERY
+    # --------------------------------------------------
+    def insert(self, lat, lon):
+        x, y = self._to_xy(lat, lon)
+        self.cells.setdefault(self._cell(x, y), []).append((x, y))
+        self.count += 1
+
+    def nearest_within(self, lat, lon, radius_m):
+        """
+        Distance (m) to the closest stored point within radius_m,
+        or None if there is none.
+        """
+        if self.count == 0:
+            return None
+
+        x, y = self._to_xy(lat, lon)
+        cx, cy = self._cell(x, y)
+        reach = int(math.ceil(radius_m / self.cell_size))
+
+        best = None
+        for ix in range(cx - reach, cx + reach + 1):
+            for iy in range(cy - reach, cy + reach + 1):
+                for px, py in self.cells.get((ix, iy), ()):
+                    d = math.hypot(px - x, py - y)
+                    if d < radius_m and (best is None or d < best):
+                        best = d
+
+        return best
@@ -1,7 +1,7 @@
 # spray_controller.py
 import time
 from gpiozero import OutputDevice
-from config import SPRAY_GPIO_PIN
+from config import SPRAY_GPIO_PIN, SPRAY_STABILIZE_SEC, SPRAY_DRIP_SEC
 
 
 class SprayController:
@@ -26,33 +26,47 @@ class SprayController:
         self.spraying = False
         print("🛑 Spray OFF")
 
-    def spray_for(self, duration_sec):
+    def spray_for(self, duration_sec, abort_event=None):
         
         """
         Blocking spray sequence:
-        1. Wait 3s (Stabilize water)
+        1. Wait SPRAY_STABILIZE_SEC (Stabilize water)
         2. Spray ON
         3. Wait duration
         4. Spray OFF
-        5. Wait 3s (Prevent dripping while moving)
-        """
-        STABILIZE_TIME = 3.0  # Seconds to wait before spraying
-        DRIP_TIME = 3.0       # Time to wait after spray to clear nozzle
+        5. Wait SPRAY_DRIP_SEC (Prevent dripping while moving)
 
+        If abort_event (threading.Event) is set, the sequence stops at once
+        with the spray OFF and returns False.
+        """
 
         # 1. Pre-Spray Stabilization
-        print(f"⚖️  Stabilizing drone for {STABILIZE_TIME}s before spray...")
-        time.sleep(STABILIZE_TIME)
+        print(f"⚖️  Stabilizing drone for {SPRAY_STABILIZE_SEC}s before spray...")
+        if self._wait(SPRAY_STABILIZE_SEC, abort_event):
+            return False
 
         # 2. Spray Action
         print(f"🏁 Stabilization complete. Starting spray.")
         self.spray_on()
-        time.sleep(duration_sec)
+        aborted = self._wait(duration_sec, abort_event)
 
         # 3. Stop Spray
         self.spray_off()
+        if aborted:
+            return False
 
         # 4. Post-Spray Wait (Prevent dripping)
-        print(f"⏳ Waiting {DRIP_TIME}s for drips to clear...")
-        time.sleep(DRIP_TIME)
+        print(f"⏳ Waiting {SPRAY_DRIP_SEC}s for drips to clear...")
+        if self._wait(SPRAY_DRIP_SEC, abort_event):
+            return False
         print("✅ Spray sequence complete. Ready to move.")
+        return True
+
+    def _wait(self, seconds, abort_event):
+        """
+        Sleeps, or returns True early if abort_event gets set.
+        """
+        if abort_event is None:
+            time.sleep(seconds)
+            return False
+        return abort_event.wait(seconds)
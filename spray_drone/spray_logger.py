@@ -1,40 +1,52 @@
 # spray_logger.py
-import csv
-import os
 import time
 
-
-SPRAY_LOG_PATH = "/home/pi/logs/spray_log.csv"
+from log_writer import LogWriter
+from config import LOG_FLUSH_EVERY_ROWS, LOG_FLUSH_INTERVAL_SEC, LOG_FSYNC
 
 
-def ensure_log_file():
-    os.makedirs(os.path.dirname(SPRAY_LOG_PATH), exist_ok=True)
+SPRAY_LOG_PATH = "/home/pi/logs/spray_log.csv"
 
-    if not os.path.exists(SPRAY_LOG_PATH):
-        with open(SPRAY_LOG_PATH, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                "id",
-                "lat",
-                "lon",
-                "alt",
-                "spray_duration",
-                "timestamp",
-                "status"
-            ])
+SPRAY_LOG_HEADER = [
+    "id",
+    "lat",
+    "lon",
+    "alt",
+    "spray_duration",
+    "timestamp",
+    "status"
+]
+
+_writer = None
+
+
+def _get_writer():
+    # Opened on first use, then kept open by the writer thread
+    global _writer
+    if _writer is None:
+        _writer = LogWriter(
+            SPRAY_LOG_PATH,
+            header=SPRAY_LOG_HEADER,
+            flush_every=LOG_FLUSH_EVERY_ROWS,
+            flush_interval_sec=LOG_FLUSH_INTERVAL_SEC,
+            fsync=LOG_FSYNC
+        )
+    return _writer
 
 
 def log_spray(target, spray_duration, status="sprayed"):
-    ensure_log_file()
-
-    with open(SPRAY_LOG_PATH, "a", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            target.get("id"),
-            target.get("lat"),
-            target.get("lon"),
-            target.get("alt"),
-            spray_duration,
-            int(time.time()),
-            status
-        ])
+    # Queued for the writer thread, returns immediately
+    _get_writer().write_row([
+        target.get("id"),
+        target.get("lat"),
+        target.get("lon"),
+        target.get("alt"),
+        spray_duration,
+        int(time.time()),
+        status
+    ])
+
+
+def close_spray_log():
+    if _writer is not None:
+        _writer.close()
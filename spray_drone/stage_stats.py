@@ -0,0 +1,140 @@
+# stage_stats.py
+# Per-stage latency statistics for the main loops, served as JSON on
+# http://127.0.0.1:<port>/ (plain-text table on /text).
+#
+# Recording is lock-free: each stage is written only by the loop thread
+# (list item stores under the GIL), the HTTP thread reads snapshots and
+# tolerates a sample being mid-update.
+#
+# Same file in det_yellow_send_gps_to_gcs/ and spray_drone/ — keep in sync.
+import bisect
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Fixed log-spaced histogram buckets, 10 us .. 100 s
+BUCKET_EDGES_MS = list(np.round(np.logspace(-2, 5, 71), 4))
+
+# Samples kept for the rolling percentiles
+ROLLING_SAMPLES = 1024
+
+
+class StageHistogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_EDGES_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.recent = [0.0] * ROLLING_SAMPLES
+
+    def record(self, ms):
+        self.counts[bisect.bisect(BUCKET_EDGES_MS, ms)] += 1
+        self.recent[self.total % ROLLING_SAMPLES] = ms
+        self.total += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def summary(self):
+        total = self.total
+        recent = np.array(self.recent[:min(total, ROLLING_SAMPLES)])
+        p50, p95, p99 = np.percentile(recent, [50, 95, 99]) if len(recent) else (0.0, 0.0, 0.0)
+
+        return {
+            "count": total,
+            "mean_ms": self.sum_ms / total if total else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            # all-time histogram: upper edge (ms) -> count, "inf" = overflow
+            "buckets": {
+                (str(BUCKET_EDGES_MS[i]) if i < len(BUCKET_EDGES_MS) else "inf"): n
+                for i, n in enumerate(list(self.counts)) if n
+            },
+        }
+
+
+class StageStats:
+    def __init__(self):
+        self.stages = {}
+        self.server = None
+
+    def record(self, stage, ms):
+        hist = self.stages.get(stage)
+        if hist is None:
+            hist = self.stages[stage] = StageHistogram()
+        hist.record(ms)
+
+    def lap(self):
+        """
+        Lap timer for a loop: lap("detect") records the time since the
+        previous lap() call (or reset()) under "detect".
+        """
+        return _Lap(self)
+
+    def snapshot(self):
+        return {name: hist.summary() for name, hist in list(self.stages.items())}
+
+    def text(self):
+        lines = [f"{'stage':<20}{'count':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)"]
+        for name, s in sorted(self.snapshot().items()):
+            lines.append(
+                f"{name:<20}{s['count']:>8}{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}"
+                f"{s['p99_ms']:>9.2f}{s['max_ms']:>9.2f}"
+            )
+        return "\n".join(lines) + "\n"
+
+    # --------------------------------------------------
+    # LOCAL HTTP ENDPOINT
+    # --------------------------------------------------
+    def serve(self, port, host="127.0.0.1"):
+        stats = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/text"):
+                    body, kind = stats.text().encode(), "text/plain"
+                else:
+                    body, kind = json.dumps(stats.snapshot(), indent=1).encode(), "application/json"
+                self.send_response(200)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass    # keep the console for the mission prints
+
+        try:
+            self.server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"⚠️ Stage stats endpoint not started: {e}")
+            return
+
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"📊 Stage stats on http://{host}:{port}/")
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class _Lap:
+    def __init__(self, stats):
+        self.stats = stats
+        self.last = time.perf_counter()
+
+    def reset(self):
+        self.last = time.perf_counter()
+
+    def __call__(self, stage):
+        now = time.perf_counter()
+        self.stats.record(stage, (now - self.last) * 1000)
+        self.last = now
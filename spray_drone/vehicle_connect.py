@@ -0,0 +1,37 @@
+# vehicle_connect.py
+# DroneKit connection that doesn't block on the parameter download.
+#
+# connect(..., wait_ready=True) waits for the full parameter table, which
+# is most of the boot-to-ready time over a 57600-baud link. Here only the
+# attributes the entry point actually uses are waited for; DroneKit keeps
+# downloading parameters in the background (it always starts the fetch
+# during connect). Nothing in the mission reads parameters; anything that
+# does later should use vehicle.parameters.get(name, wait_ready=False)
+# rather than vehicle.parameters[name], which blocks on the download.
+#
+# Same file in det_yellow_send_gps_to_gcs/ and spray_drone/ — keep in sync.
+import time
+
+from dronekit import connect
+
+# DroneKit's default ready set minus "parameters"
+READY_ATTRS = ("gps_0", "armed", "mode", "attitude")
+
+
+def connect_vehicle(connection_string, baud=57600, ready_attrs=READY_ATTRS, timeout=60):
+    """
+    Returns a DroneKit vehicle once ready_attrs have been received.
+    """
+    print("🔌 Connecting to vehicle...")
+    start = time.monotonic()
+
+    vehicle = connect(
+        connection_string, baud=baud, heartbeat_timeout=timeout, wait_ready=False
+    )
+    vehicle.wait_ready(*ready_attrs, timeout=timeout)
+
+    print(
+        f"✅ Vehicle connected in {time.monotonic() - start:.1f}s "
+        f"(parameter download in background)"
+    )
+    return vehicle